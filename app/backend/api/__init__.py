@@ -4,6 +4,7 @@ from api.posts import posts_bp
 from api.feed import feed_bp
 from api.jobs import jobs_bp
 from api.messaging import messaging_bp
+from api.transfer import transfer_bp
 
 __all__ = [
     'auth_bp',
@@ -11,5 +12,6 @@ __all__ = [
     'posts_bp',
     'feed_bp',
     'jobs_bp',
-    'messaging_bp'
+    'messaging_bp',
+    'transfer_bp'
 ] 
\ No newline at end of file
@@ -1,16 +1,25 @@
-from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
-from flask_jwt_extended import create_access_token
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import create_access_token, jwt_required
 from models.user import User
-from extensions import db
+from extensions import db, login_misses, password_hasher, identities, limiter
+from services.passwords import HasherBusy
+from services.identity import identity_claims
+from services.rate_limit import config_limit, ip_key, login_username_key
 
 auth_bp = Blueprint('auth', __name__)
 
+def unknown_login_key(username):
+    return f'login:unknown:{username}'
+
+def hasher_busy():
+    return jsonify({'error': 'Too many login attempts, please retry.'}), 503, {'Retry-After': '1'}
+
 @auth_bp.route('/test', methods=['GET'])
 def test_auth():
     return jsonify({'message': 'Auth blueprint is working!'})
 
 @auth_bp.route('/signup', methods=['POST'])
+@limiter.limit(config_limit('SIGNUP_RATE_LIMIT'), key_func=ip_key)
 def signup():
     data = request.get_json()
     username = data.get('username')
@@ -20,40 +29,59 @@ def signup():
         return jsonify({'error': 'All fields are required.'}), 400
     if User.query.filter((User.username == username) | (User.email == email)).first():
         return jsonify({'error': 'Username or email already exists.'}), 400
-    hashed_pw = generate_password_hash(password)
+    try:
+        hashed_pw = password_hasher.hash(password)
+    except HasherBusy:
+        return hasher_busy()
     user = User(username=username, email=email, password_hash=hashed_pw)
     db.session.add(user)
     db.session.commit()
+    # Drop any cached "no such user" so the first login goes through on every worker
+    login_misses.invalidate(unknown_login_key(username))
     return jsonify({'message': 'User created successfully.'}), 201
 
 @auth_bp.route('/login', methods=['POST'])
+@limiter.limit(config_limit('LOGIN_RATE_LIMIT'), key_func=ip_key)
+@limiter.limit(config_limit('LOGIN_USERNAME_RATE_LIMIT'), key_func=login_username_key)
 def login():
-    print("/api/login route hit")
-    data = request.get_json()
-    print("Data received:", data)
+    data = request.get_json(silent=True)
     username = data.get('username') if data else None
     password = data.get('password') if data else None
-    print("Username:", username)
     if not username or not password:
-        print("Missing username or password")
         return jsonify({'error': 'Username and password required.'}), 400
+    # Unknown usernames are answered from cache; no lookup and no hashing
+    key = unknown_login_key(username)
+    if login_misses.get(key):
+        return jsonify({'error': 'Invalid credentials.'}), 401
+    version = login_misses.version(key)
+    user = User.query.with_entities(User.id, User.username, User.avatar, User.password_hash).filter_by(username=username).first()
+    if not user:
+        # Not stored if a signup for this name invalidated the key during the lookup
+        login_misses.set(key, True, ttl=current_app.config['LOGIN_NEGATIVE_CACHE_TTL'], version=version)
+        return jsonify({'error': 'Invalid credentials.'}), 401
     try:
-        user = User.query.filter_by(username=username).first()
-        print("User found:", user)
-        if not user:
-            hashed_pw = generate_password_hash(password)
-            user = User(username=username, email=f'{username}@example.com', password_hash=hashed_pw)
-            db.session.add(user)
-            db.session.commit()
-            print("New user created:", user)
-        elif not check_password_hash(user.password_hash, password):
-            print("Invalid credentials for user:", username)
+        if not password_hasher.verify(user.password_hash, password):
             return jsonify({'error': 'Invalid credentials.'}), 401
-        access_token = create_access_token(identity=str(user.id))
-        print("Access token created for user:", user.id)
-        return jsonify({'token': access_token, 'username': user.username}), 200
-    except Exception as e:
-        print("Exception in /api/login:", e)
-        import traceback
-        traceback.print_exc()
-        return jsonify({'error': 'Internal server error'}), 500 
\ No newline at end of file
+    except HasherBusy:
+        return hasher_busy()
+    if password_hasher.needs_rehash(user.password_hash):
+        # Upgrade to the configured parameters while the plaintext is at hand; a busy pool just defers it
+        try:
+            new_hash = password_hasher.hash(password)
+        except HasherBusy:
+            new_hash = None
+        if new_hash:
+            User.query.filter_by(id=user.id, password_hash=user.password_hash) \
+                .update({User.password_hash: new_hash}, synchronize_session=False)
+            db.session.commit()
+    # username/avatar ride in the token so read-only handlers can skip the user lookup
+    access_token = create_access_token(identity=str(user.id), additional_claims=identity_claims(user))
+    return jsonify({'token': access_token, 'username': user.username}), 200
+
+@auth_bp.route('/me', methods=['GET'])
+@jwt_required()
+def me():
+    identity = identities.current(fresh=request.args.get('fresh') == 'true')
+    if identity is None:
+        return jsonify({'error': 'User not found'}), 404
+    return jsonify(identity._asdict()), 200
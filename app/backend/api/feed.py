@@ -1,8 +1,62 @@
-from flask import Blueprint
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.exc import IntegrityError
 from models.post import Post
 from models.user import User
-from extensions import db
+from models.follow import Follow
+from extensions import db, identities
+from services import feed as feed_service
+from api.posts import POST_SCHEMA
+from utils.serialization import json_response
+from utils.pagination import per_page_arg
 
 feed_bp = Blueprint('feed', __name__)
- 
-# Routes will be implemented here 
\ No newline at end of file
+
+@feed_bp.route('/feed', methods=['GET'])
+@jwt_required()
+def get_feed():
+    user_id = int(get_jwt_identity())
+    per_page = per_page_arg(request.args, 20)
+    before = request.args.get('before', type=int)
+    ids = feed_service.feed_post_ids(user_id, before=before, limit=per_page)
+    # Primary-key lookups only; ids of deleted posts, and of posts made private since they were pushed, drop out
+    visible = Post.public_post.is_(True) | (Post.user_id == user_id)
+    rows = {row.id: row for row in POST_SCHEMA.load(Post.query.filter(Post.id.in_(ids), visible)).all()} if ids else {}
+    posts_data = POST_SCHEMA.dump_many([rows[post_id] for post_id in ids if post_id in rows])
+    next_before = ids[-1] if len(ids) == per_page else None
+    return json_response({'posts': posts_data, 'next_before': next_before})
+
+@feed_bp.route('/users/<int:followee_id>/follow', methods=['POST'])
+@jwt_required()
+def follow_user(followee_id):
+    user_id = int(get_jwt_identity())
+    if followee_id == user_id:
+        return jsonify({'error': 'You cannot follow yourself.'}), 400
+    if not identities.get(followee_id):
+        return jsonify({'error': 'User not found'}), 404
+    if db.session.get(Follow, (user_id, followee_id)):
+        return jsonify({'message': 'Already following.'}), 200
+    try:
+        db.session.add(Follow(follower_id=user_id, followee_id=followee_id))
+        db.session.flush()
+    except IntegrityError:
+        # A concurrent request followed first; its count bump is the only one
+        db.session.rollback()
+        return jsonify({'message': 'Already following.'}), 200
+    User.query.filter_by(id=followee_id).update({User.follower_count: User.follower_count + 1})
+    feed_service.drop_timeline(user_id)
+    db.session.commit()
+    return jsonify({'message': 'Followed.'}), 201
+
+@feed_bp.route('/users/<int:followee_id>/follow', methods=['DELETE'])
+@jwt_required()
+def unfollow_user(followee_id):
+    user_id = int(get_jwt_identity())
+    follow = db.session.get(Follow, (user_id, followee_id))
+    if not follow:
+        return jsonify({'error': 'Not following.'}), 404
+    db.session.delete(follow)
+    User.query.filter_by(id=followee_id).update({User.follower_count: User.follower_count - 1})
+    feed_service.drop_timeline(user_id)
+    db.session.commit()
+    return jsonify({'message': 'Unfollowed.'}), 200
@@ -1,8 +1,77 @@
-from flask import Blueprint
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.job import Job
 from models.user import User
 from extensions import db
+from services.job_index import get_job_index
+from services.search import tokenize
+from api.profile import bump_profile_version, invalidate_profile
+from utils.pagination import keyset_page, per_page_arg, encode_cursor, decode_cursor, InvalidCursor
+from datetime import datetime
 
 jobs_bp = Blueprint('jobs', __name__)
- 
-# Routes will be implemented here 
\ No newline at end of file
+
+def serialize_job(job):
+    return {
+        'id': job.id,
+        'title': job.title,
+        'company': job.company,
+        'location': job.location,
+        'description': job.description,
+        'posted_at': job.posted_at.isoformat(),
+        'user_id': job.user_id
+    }
+
+@jobs_bp.route('/jobs', methods=['GET'])
+@jwt_required()
+def search_jobs():
+    q = request.args.get('q', '').strip()
+    location = request.args.get('location', '').strip()
+    company = request.args.get('company', '').strip()
+    after = request.args.get('after') or None
+    per_page = per_page_arg(request.args, 20)
+    filters = {'location': location, 'company': company}
+    index = get_job_index()
+    try:
+        # A q with no word tokens (e.g. "---") is no text filter at all
+        if tokenize(q):
+            # Free text: match ids from the title index, page them newest first
+            after_key = decode_cursor(after, is_datetime=True) if after else None
+            keys = index.page(index.candidates(q, filters), after=after_key, per_page=per_page)
+            page_keys = keys[:per_page]
+            rows = {job.id: job for job in Job.query.filter(Job.id.in_([k[1] for k in page_keys])).all()} if page_keys else {}
+            jobs = [rows[job_id] for _, job_id in page_keys if job_id in rows]
+            next_cursor = encode_cursor(*page_keys[-1]) if len(keys) > per_page else None
+        else:
+            query = Job.query
+            if location:
+                query = query.filter(Job.location == location)
+            if company:
+                query = query.filter(Job.company == company)
+            jobs, next_cursor = keyset_page(query, Job.posted_at, Job.id, after=after, per_page=per_page)
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor.'}), 400
+    response = {'jobs': [serialize_job(job) for job in jobs], 'next_cursor': next_cursor}
+    # Facets only change with the filters, so later pages skip them
+    if not after:
+        response['facets'] = index.facet_counts(q, filters)
+    return jsonify(response), 200
+
+@jobs_bp.route('/jobs', methods=['POST'])
+@jwt_required()
+def create_job():
+    user_id = int(get_jwt_identity())
+    data = request.get_json() or {}
+    title = (data.get('title') or '').strip()
+    company = (data.get('company') or '').strip()
+    if not title or not company:
+        return jsonify({'error': 'Title and company are required.'}), 400
+    job = Job(title=title, company=company, location=(data.get('location') or '').strip() or None,
+              description=data.get('description'), posted_at=datetime.utcnow(), user_id=user_id)
+    db.session.add(job)
+    bump_profile_version(user_id)
+    db.session.commit()
+    invalidate_profile(user_id)
+    # Facet index update on insert; other workers catch up by id
+    get_job_index().add(job.id, job.title, job.company, job.location, job.posted_at)
+    return jsonify(serialize_job(job)), 201
@@ -1,9 +1,167 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.message import Message
-from models.user import User
-from extensions import db
+from models.conversation import Conversation
+from extensions import db, message_bus, identities
+from utils.pagination import keyset_page, per_page_arg, InvalidCursor
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime
+import json
+import time
 
 messaging_bp = Blueprint('messaging', __name__)
- 
-# Routes will be implemented here 
\ No newline at end of file
+
+MAX_BATCH = 100
+
+def serialize_message(message):
+    return {
+        'id': message.id,
+        'conversation_id': message.conversation_id,
+        'sender_id': message.sender_id,
+        'receiver_id': message.receiver_id,
+        'content': message.content,
+        'timestamp': message.timestamp.isoformat()
+    }
+
+def get_or_create_conversation(user_id, other_id):
+    user_a, user_b = Conversation.pair(user_id, other_id)
+    conversation = Conversation.query.filter_by(user_a_id=user_a, user_b_id=user_b).first()
+    if conversation:
+        return conversation
+    try:
+        with db.session.begin_nested():
+            conversation = Conversation(user_a_id=user_a, user_b_id=user_b)
+            db.session.add(conversation)
+    except IntegrityError:
+        conversation = Conversation.query.filter_by(user_a_id=user_a, user_b_id=user_b).first()
+    return conversation
+
+def new_messages_for(user_id, since):
+    rows = Message.query.filter(Message.receiver_id == user_id, Message.id > since) \
+        .order_by(Message.id).limit(MAX_BATCH).all()
+    return [serialize_message(m) for m in rows]
+
+def wait_for_messages(user_id, since, timeout):
+    """Return messages for user_id newer than `since`, waiting up to `timeout` seconds.
+
+    The in-process bus is only a wakeup: results always come from the
+    database, in id order, so a lower id published late (another thread, or
+    another worker, which is only seen by the re-check every
+    MESSAGING_POLL_SLICE seconds) is never skipped over.
+    The DB connection is returned to the pool while waiting.
+    """
+    poll_slice = current_app.config.get('MESSAGING_POLL_SLICE', 2.0)
+    deadline = time.monotonic() + timeout
+    with message_bus.subscribe(user_id) as subscription:
+        messages = new_messages_for(user_id, since)
+        while not messages:
+            db.session.close()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            subscription.get(min(poll_slice, remaining))
+            messages = new_messages_for(user_id, since)
+    return messages
+
+@messaging_bp.route('/conversations', methods=['GET'])
+@jwt_required()
+def list_conversations():
+    user_id = int(get_jwt_identity())
+    per_page = per_page_arg(request.args, 20)
+    query = Conversation.query.filter((Conversation.user_a_id == user_id) | (Conversation.user_b_id == user_id))
+    try:
+        conversations, next_cursor = keyset_page(query, Conversation.updated_at, Conversation.id,
+                                                 after=request.args.get('after') or None, per_page=per_page)
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor.'}), 400
+    # Two batched lookups instead of one per conversation
+    last_ids = [c.last_message_id for c in conversations if c.last_message_id]
+    last_messages = {m.id: m for m in Message.query.filter(Message.id.in_(last_ids)).all()} if last_ids else {}
+    other_ids = {c.other_user_id(user_id) for c in conversations}
+    users = identities.get_many(other_ids) if other_ids else {}
+    data = []
+    for conversation in conversations:
+        other = users.get(conversation.other_user_id(user_id))
+        last = last_messages.get(conversation.last_message_id)
+        data.append({
+            'id': conversation.id,
+            'other_user': {'id': other.id, 'username': other.username, 'avatar': other.avatar} if other else None,
+            'last_message': serialize_message(last) if last else None,
+            'updated_at': conversation.updated_at.isoformat()
+        })
+    return jsonify({'conversations': data, 'next_cursor': next_cursor}), 200
+
+@messaging_bp.route('/conversations/<int:conversation_id>/messages', methods=['GET'])
+@jwt_required()
+def get_conversation_messages(conversation_id):
+    user_id = int(get_jwt_identity())
+    conversation = db.session.get(Conversation, conversation_id)
+    if not conversation or user_id not in (conversation.user_a_id, conversation.user_b_id):
+        return jsonify({'error': 'Conversation not found.'}), 404
+    per_page = per_page_arg(request.args, 30)
+    query = Message.query.filter_by(conversation_id=conversation_id)
+    try:
+        messages, next_cursor = keyset_page(query, Message.timestamp, Message.id,
+                                            after=request.args.get('after') or None, per_page=per_page)
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor.'}), 400
+    return jsonify({'messages': [serialize_message(m) for m in messages], 'next_cursor': next_cursor}), 200
+
+@messaging_bp.route('/messages', methods=['POST'])
+@jwt_required()
+def send_message():
+    user_id = int(get_jwt_identity())
+    data = request.get_json() or {}
+    receiver_id = data.get('receiver_id')
+    content = (data.get('content') or '').strip()
+    if not receiver_id or not content:
+        return jsonify({'error': 'Receiver and content are required.'}), 400
+    try:
+        receiver_id = int(receiver_id)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'receiver_id must be a user id.'}), 400
+    if receiver_id == user_id:
+        return jsonify({'error': 'You cannot message yourself.'}), 400
+    if not identities.get(receiver_id):
+        return jsonify({'error': 'User not found'}), 404
+    conversation = get_or_create_conversation(user_id, receiver_id)
+    message = Message(conversation_id=conversation.id, sender_id=user_id, receiver_id=receiver_id,
+                      content=content, timestamp=datetime.utcnow())
+    db.session.add(message)
+    db.session.flush()
+    conversation.last_message_id = message.id
+    conversation.updated_at = message.timestamp
+    db.session.commit()
+    payload = serialize_message(message)
+    message_bus.publish(receiver_id, payload)
+    return jsonify(payload), 201
+
+@messaging_bp.route('/messages/poll', methods=['GET'])
+@jwt_required()
+def poll_messages():
+    user_id = int(get_jwt_identity())
+    since = request.args.get('since', 0, type=int)
+    max_timeout = current_app.config.get('MESSAGING_LONGPOLL_TIMEOUT', 25)
+    timeout = min(request.args.get('timeout', max_timeout, type=float), max_timeout)
+    messages = wait_for_messages(user_id, since, timeout)
+    return jsonify({'messages': messages, 'since': messages[-1]['id'] if messages else since}), 200
+
+@messaging_bp.route('/messages/stream', methods=['GET'])
+@jwt_required()
+def stream_messages():
+    user_id = int(get_jwt_identity())
+    since = request.headers.get('Last-Event-ID', type=int) or request.args.get('since', 0, type=int)
+    keepalive = current_app.config.get('MESSAGING_LONGPOLL_TIMEOUT', 25)
+
+    def events(since):
+        while True:
+            messages = wait_for_messages(user_id, since, keepalive)
+            if not messages:
+                yield ': keepalive\n\n'
+                continue
+            for message in messages:
+                yield f"id: {message['id']}\nevent: message\ndata: {json.dumps(message)}\n\n"
+            since = messages[-1]['id']
+
+    return Response(stream_with_context(events(since)), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
@@ -1,59 +1,101 @@
+from datetime import timezone
 from flask import Blueprint, request, jsonify, current_app, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from werkzeug.utils import secure_filename
-import os
+from sqlalchemy.exc import IntegrityError
 from models.post import Post
+from models.like import PostLike
 from models.user import User
-from extensions import db
-from datetime import datetime
-from collections import Counter
-import threading
-from typing import Optional, List, Dict
+from models.tag import Tag, post_tags
+from extensions import db, cache, counters, upload_pool, limiter
+from services.uploads import verify_image, UploadError, IMAGE_KINDS
+from services.media_store import get_media_store, MEDIA_URL_PREFIX
+from services.derivatives import generate_derivatives
+from utils.pagination import keyset_page, per_page_arg, InvalidCursor
+from utils.serialization import Schema, split_csv, json_response
+from services.search import get_search_backend
+from services.rate_limit import config_limit, is_not_search
+from services.http_cache import conditional, version_time
+from services import post_stats
+from services.post_stats import POSTS_CACHE_KEY, CATEGORIES_CACHE_KEY, TAGS_CACHE_KEY, invalidate_post_caches
+from services import feed as feed_service
+from api.profile import bump_profile_version, invalidate_profile
 
 posts_bp = Blueprint('posts', __name__)
 
-# Simple in-memory cache for categories and tags
-_cache: Dict[str, Optional[List[str]]] = {'categories': None, 'tags': None}
-_cache_lock = threading.Lock()
+# sort name -> (keyset column, descending)
+SORT_KEYS = {
+    'newest': (Post.created_at, True),
+    'oldest': (Post.created_at, False),
+    'likes': (Post.likes_count, True),
+    'views': (Post.views_count, True),
+}
 
 def allowed_file(filename):
     allowed = current_app.config['ALLOWED_EXTENSIONS']
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in allowed
 
+def post_validators(key, newest):
+    """Weak ETag and Last-Modified for a response derived from the posts table.
+
+    `newest` is post_stats.newest_post(). The version of cache `key` covers
+    edits, deletes and count changes that leave it unchanged; the newest post
+    covers writes this worker's channel never saw (local channel restarts,
+    another process's import).
+    """
+    version = cache.version(key)
+    newest_id, newest_at = newest
+    modified = version_time(key, version)
+    if newest_at is not None:
+        newest_at = newest_at.replace(tzinfo=timezone.utc, microsecond=0)
+        modified = max(modified, newest_at)
+    stamp = int(newest_at.timestamp()) if newest_at is not None else 0
+    return f"{current_app.config['HTTP_CACHE_VERSION']}-{version}-{newest_id or 0}-{stamp}", modified
+
+def _cached_validators(key):
+    # Categories and tags come from the cache, so their newest-post marker does too
+    return lambda: post_validators(key, cache.get_or_set(POSTS_CACHE_KEY, post_stats.newest_post))
+
+POST_SCHEMA = Schema(
+    id=Post.id,
+    user_id=Post.user_id,
+    title=Post.title,
+    content=Post.content,
+    media_url=Post.media_url,
+    allow_comments=Post.allow_comments,
+    public_post=Post.public_post,
+    created_at=Post.created_at,
+    category=Post.category,
+    tags=(Post.tags, split_csv),
+    likes_count=Post.likes_count,
+    views_count=Post.views_count,
+)
+
+serialize_post = POST_SCHEMA.dump
+
 @posts_bp.route('/posts/categories', methods=['GET'])
+@conditional(_cached_validators(CATEGORIES_CACHE_KEY), cache_control='public, no-cache')
 def get_categories():
-    with _cache_lock:
-        if _cache['categories'] is not None:
-            return jsonify({'categories': _cache['categories']}), 200
-    categories = db.session.query(Post.category).filter(Post.category.isnot(None)).distinct().all()
-    categories = [c[0] for c in categories if c[0]]
-    with _cache_lock:
-        _cache['categories'] = categories
+    # Read from the incrementally maintained category counters, no DISTINCT scan
+    categories = cache.get_or_set(CATEGORIES_CACHE_KEY, post_stats.categories)
     return jsonify({'categories': categories}), 200
 
 @posts_bp.route('/posts/popular-tags', methods=['GET'])
+@conditional(_cached_validators(TAGS_CACHE_KEY), cache_control='public, no-cache')
 def get_popular_tags():
-    with _cache_lock:
-        if _cache['tags'] is not None:
-            return jsonify({'tags': _cache['tags']}), 200
-    all_tags = db.session.query(Post.tags).filter(Post.tags.isnot(None)).all()
-    tag_counter = Counter()
-    for tag_str in all_tags:
-        if tag_str[0]:
-            tag_list = [t.strip() for t in tag_str[0].split(',') if t.strip()]
-            tag_counter.update(tag_list)
-    popular_tags = [tag for tag, _ in tag_counter.most_common(20)]
-    with _cache_lock:
-        _cache['tags'] = popular_tags
+    # Top-k off the Tag.post_count index; counts are kept current on every post write
+    popular_tags = cache.get_or_set(TAGS_CACHE_KEY, post_stats.popular_tags)
     return jsonify({'tags': popular_tags}), 200
 
 @posts_bp.route('/posts', methods=['GET'])
+@limiter.limit(config_limit('SEARCH_RATE_LIMIT'), exempt_when=is_not_search, override_defaults=False)
 @jwt_required()
+# Read per request, in the request's own session: on a replica the validators must match what it returns
+@conditional(lambda: post_validators(POSTS_CACHE_KEY, post_stats.newest_post()), cache_control='private, no-cache')
 def get_posts():
     user_id = get_jwt_identity()
     # Query params
-    page = int(request.args.get('page', 1))
-    per_page = int(request.args.get('per_page', 10))
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = per_page_arg(request.args, 10)
     search = request.args.get('search', '').strip()
     category = request.args.get('category', '').strip()
     visibility = request.args.get('visibility', '').strip()
@@ -69,14 +111,28 @@ def get_posts():
     # Category filter
     if category:
         query = query.filter(Post.category == category)
-    # Tag filter (simple contains for now)
+    # Tag filter: exact match through the post_tags index
     if tag:
-        query = query.filter(Post.tags.like(f'%{tag}%'))
-    # Search (title/content)
+        query = query.join(post_tags, post_tags.c.post_id == Post.id).join(Tag, Tag.id == post_tags.c.tag_id) \
+            .filter(Tag.name == tag.lower())
+    # Search (title/content) through the configured full-text backend
+    rank = None
     if search:
-        query = query.filter((Post.title.ilike(f'%{search}%')) | (Post.content.ilike(f'%{search}%')))
+        query, rank = get_search_backend().apply(query, search, with_rank=(sort == 'relevance'))
+    # Only the serialized columns are selected; rows never become Post instances
+    query = POST_SCHEMA.load(query)
+    # Cursor mode: keyset pagination on (sort key, id), no OFFSET scan and no COUNT(*)
+    if 'after' in request.args or request.args.get('pagination') == 'cursor':
+        sort_col, descending = SORT_KEYS.get(sort, SORT_KEYS['newest'])
+        try:
+            posts, next_cursor = keyset_page(query, sort_col, Post.id, after=request.args.get('after') or None, per_page=per_page, descending=descending)
+        except InvalidCursor:
+            return jsonify({'error': 'Invalid cursor.'}), 400
+        return json_response({'posts': POST_SCHEMA.dump_many(posts), 'next_cursor': next_cursor})
     # Sorting
-    if sort == 'oldest':
+    if sort == 'relevance' and rank is not None:
+        query = query.order_by(rank.desc(), Post.id.desc())
+    elif sort == 'oldest':
         query = query.order_by(Post.created_at.asc())
     elif sort == 'likes':
         query = query.order_by(Post.likes_count.desc())
@@ -84,28 +140,12 @@ def get_posts():
         query = query.order_by(Post.views_count.desc())
     else:
         query = query.order_by(Post.created_at.desc())
-    # Pagination
-    paginated = query.paginate(page=page, per_page=per_page, error_out=False)
-    posts = paginated.items
-    posts_data = []
-    for post in posts:
-        posts_data.append({
-            'id': post.id,
-            'user_id': post.user_id,
-            'title': post.title,
-            'content': post.content,
-            'media_url': post.media_url,
-            'allow_comments': post.allow_comments,
-            'public_post': post.public_post,
-            'created_at': post.created_at.isoformat(),
-            'category': post.category,
-            'tags': post.tags.split(',') if post.tags else [],
-            'likes_count': post.likes_count,
-            'views_count': post.views_count
-        })
-    return jsonify({'posts': posts_data}), 200
+    # Pagination (the response carries no total, so skip the COUNT query)
+    paginated = query.paginate(page=page, per_page=per_page, error_out=False, count=False)
+    return json_response({'posts': POST_SCHEMA.dump_many(paginated.items)})
 
 @posts_bp.route('/posts', methods=['POST'])
+@limiter.limit(config_limit('UPLOAD_RATE_LIMIT'), override_defaults=False)
 @jwt_required()
 def create_post():
     user_id = get_jwt_identity()
@@ -113,6 +153,8 @@ def create_post():
     content = request.form.get('content', '').strip()
     allow_comments = request.form.get('allow_comments', 'true').lower() == 'true'
     public_post = request.form.get('public_post', 'true').lower() == 'true'
+    category = request.form.get('category', '').strip() or None
+    tags = request.form.get('tags', '')
     if not title:
         return jsonify({'error': 'Title is required.'}), 400
     if not content:
@@ -120,32 +162,142 @@ def create_post():
 
     file = request.files.get('media')
     media_url = None
+    blob = None
+    unverified = False
     if file:
         if not allowed_file(file.filename):
             return jsonify({'error': 'Invalid file type.'}), 400
         if file.content_length and file.content_length > current_app.config['MAX_CONTENT_LENGTH']:
             return jsonify({'error': 'File too large.'}), 400
-        filename = secure_filename(f"{user_id}_{int(datetime.utcnow().timestamp())}_{file.filename}")
-        upload_folder = current_app.config['UPLOAD_FOLDER']
-        os.makedirs(upload_folder, exist_ok=True)
-        file_path = os.path.join(upload_folder, filename)
-        file.save(file_path)
-        media_url = f"/uploads/posts/{filename}"
-
-    post = Post(user_id=user_id, title=title, content=content, media_url=media_url, allow_comments=allow_comments, public_post=public_post)
+        store = get_media_store()
+        try:
+            blob, unverified = store.put(file.stream, current_app.config['ALLOWED_EXTENSIONS'],
+                                      current_app.config['MAX_CONTENT_LENGTH'])
+        except UploadError as e:
+            return jsonify({'error': str(e)}), 400
+        media_url = store.url(blob)
+
+    post = Post(user_id=user_id, title=title, content=content, media_url=media_url, allow_comments=allow_comments, public_post=public_post, category=category)
+    post.set_tags(tags)
     db.session.add(post)
+    db.session.flush()
+    post_stats.record_post_change(new_tags=post.tag_set, new_category=post.category)
+    bump_profile_version(user_id)
+    db.session.commit()
+    get_search_backend().index_post(post)
+    invalidate_post_caches()
+    invalidate_profile(user_id)
+    feed_service.fan_out(post)
+    if unverified and blob.ext in IMAGE_KINDS:
+        upload_pool.submit(verify_post_media, post.id, blob.filename)
+    return json_response(serialize_post(post), 201)
+
+def verify_post_media(post_id, filename):
+    # Runs on the upload pool after the response; undecodable images are deleted and unlinked from the post
+    store = get_media_store()
+    path = store.path(filename)
+    sha256 = filename.split('.', 1)[0]
+    if verify_image(path):
+        store.mark_verified(sha256)
+        db.session.commit()
+        generate_derivatives(path, sha256)
+        return
+    store.reject(sha256)
+    media_url = f'{MEDIA_URL_PREFIX}{filename}'
+    if Post.query.filter_by(id=post_id, media_url=media_url).update({Post.media_url: None}):
+        store.release_url(media_url)
+    db.session.commit()
+    invalidate_post_caches()
+
+@posts_bp.route('/posts/<int:post_id>', methods=['PUT'])
+@jwt_required()
+def update_post(post_id):
+    user_id = int(get_jwt_identity())
+    post = db.session.get(Post, post_id)
+    if not post:
+        return jsonify({'error': 'Post not found.'}), 404
+    if post.user_id != user_id:
+        return jsonify({'error': 'Not allowed.'}), 403
+    data = request.get_json() or {}
+    for field in ['title', 'content']:
+        if field in data:
+            value = (data[field] or '').strip()
+            if not value:
+                return jsonify({'error': f'{field.capitalize()} is required.'}), 400
+            setattr(post, field, value)
+    was_public = post.public_post
+    for field in ['allow_comments', 'public_post']:
+        if field in data:
+            setattr(post, field, bool(data[field]))
+    if was_public and not post.public_post:
+        feed_service.retract(post)
+    old_tags, old_category = list(post.tag_set), post.category
+    if 'category' in data:
+        post.category = (data['category'] or '').strip() or None
+    if 'tags' in data:
+        post.set_tags(data['tags'])
+    db.session.flush()
+    post_stats.record_post_change(old_tags, old_category, post.tag_set, post.category)
+    if 'title' in data:
+        bump_profile_version(user_id)
+    db.session.commit()
+    get_search_backend().update_post(post)
+    invalidate_post_caches()
+    if 'title' in data:
+        invalidate_profile(user_id)
+    return json_response(serialize_post(post))
+
+@posts_bp.route('/posts/<int:post_id>', methods=['DELETE'])
+@jwt_required()
+def delete_post(post_id):
+    user_id = int(get_jwt_identity())
+    post = db.session.get(Post, post_id)
+    if not post:
+        return jsonify({'error': 'Post not found.'}), 404
+    if post.user_id != user_id:
+        return jsonify({'error': 'Not allowed.'}), 403
+    post_stats.record_post_change(old_tags=post.tag_set, old_category=post.category)
+    get_media_store().release_url(post.media_url)
+    PostLike.query.filter_by(post_id=post_id).delete(synchronize_session=False)
+    db.session.delete(post)
+    bump_profile_version(user_id)
+    db.session.commit()
+    get_search_backend().remove_post(post_id)
+    invalidate_post_caches()
+    invalidate_profile(user_id)
+    return jsonify({'message': 'Post deleted.'}), 200
+
+@posts_bp.route('/posts/<int:post_id>/view', methods=['POST'])
+@jwt_required()
+def view_post(post_id):
+    # Buffered; lands in views_count on the next counter flush
+    counters.incr(post_id, views=1)
+    return jsonify({'message': 'View recorded.'}), 202
+
+@posts_bp.route('/posts/<int:post_id>/like', methods=['POST'])
+@jwt_required()
+def like_post(post_id):
+    user_id = int(get_jwt_identity())
+    if not db.session.query(Post.id).filter_by(id=post_id).first():
+        return jsonify({'error': 'Post not found.'}), 404
+    try:
+        db.session.add(PostLike(user_id=user_id, post_id=post_id))
+        db.session.commit()
+    except IntegrityError:
+        # Already liked (possibly by a concurrent request): the count must not move again
+        db.session.rollback()
+        return jsonify({'message': 'Already liked.'}), 200
+    # The like row is the record; the count is buffered like views
+    counters.incr(post_id, likes=1)
+    return jsonify({'message': 'Like recorded.'}), 202
+
+@posts_bp.route('/posts/<int:post_id>/like', methods=['DELETE'])
+@jwt_required()
+def unlike_post(post_id):
+    user_id = int(get_jwt_identity())
+    removed = PostLike.query.filter_by(user_id=user_id, post_id=post_id).delete(synchronize_session=False)
     db.session.commit()
-    # Invalidate category/tag cache
-    with _cache_lock:
-        _cache['categories'] = None
-        _cache['tags'] = None
-    return jsonify({
-        'id': post.id,
-        'user_id': post.user_id,
-        'title': post.title,
-        'content': post.content,
-        'media_url': post.media_url,
-        'allow_comments': post.allow_comments,
-        'public_post': post.public_post,
-        'created_at': post.created_at.isoformat()
-    }), 201 
\ No newline at end of file
+    if not removed:
+        return jsonify({'error': 'Not liked.'}), 404
+    counters.incr(post_id, likes=-1)
+    return jsonify({'message': 'Like removed.'}), 202
@@ -1,14 +1,73 @@
-from flask import Blueprint, request, jsonify, current_app, send_from_directory
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models.user import User
-from extensions import db
+from models.user import User, location_key
+from models.skill import Skill, Language, user_skills, user_languages, split_names
+from models.post import Post
+from models.job import Job
+from extensions import db, cache, upload_pool, identities, limiter
+from services.uploads import verify_image, UploadError, IMAGE_KINDS
+from services.media_store import get_media_store
+from services.derivatives import send_media, generate_derivatives
+from utils.pagination import keyset_page, per_page_arg, InvalidCursor
+from services.rate_limit import config_limit
+from utils.serialization import Schema, dumps, json_response
 import os
-from PIL import Image
-import time
-from werkzeug.utils import secure_filename
 
 profile_bp = Blueprint('profile', __name__)
 
+PROFILE_SCHEMA = Schema(
+    id=User.id,
+    username=User.username,
+    email=User.email,
+    title=User.title,
+    bio=User.bio,
+    skills=User.skills,
+    avatar=User.avatar,
+    location=User.location,
+    phone=User.phone,
+    languages=User.languages,
+    connections=User.connections,
+    mutualConnections=User.mutual_connections,
+)
+
+PERSON_SCHEMA = Schema(
+    id=User.id,
+    username=User.username,
+    title=User.title,
+    avatar=User.avatar,
+    location=User.location,
+    skills=User.skills,
+    languages=User.languages,
+    follower_count=User.follower_count,
+)
+
+def profile_cache_key(user_id):
+    return f'profile:{int(user_id)}'
+
+def profile_etag(user_id, version):
+    return f'profile-{int(user_id)}-{version}'
+
+def bump_profile_version(*user_ids):
+    # Part of the caller's transaction; call invalidate_profile() after the commit
+    User.query.filter(User.id.in_([int(user_id) for user_id in user_ids])) \
+        .update({User.profile_version: User.profile_version + 1}, synchronize_session=False)
+
+def invalidate_profile(*user_ids):
+    cache.invalidate(*(profile_cache_key(user_id) for user_id in user_ids))
+
+def load_activity(user_id, limit):
+    # One bounded query per source off the (user_id, date, id) indexes, merged newest first
+    posts = Post.query.with_entities(Post.id, Post.title, Post.created_at) \
+        .filter(Post.user_id == user_id).order_by(Post.created_at.desc(), Post.id.desc()).limit(limit).all()
+    jobs = Job.query.with_entities(Job.id, Job.title, Job.company, Job.posted_at) \
+        .filter(Job.user_id == user_id).order_by(Job.posted_at.desc(), Job.id.desc()).limit(limit).all()
+    # {type, content, date}: the shape the profile page's ActivityItem renders
+    activity = [{'type': 'post', 'id': row.id, 'content': row.title, 'date': row.created_at} for row in posts]
+    activity += [{'type': 'job', 'id': row.id, 'content': f'{row.title} at {row.company}' if row.company else row.title,
+                  'date': row.posted_at} for row in jobs]
+    activity.sort(key=lambda item: item['date'], reverse=True)
+    return activity[:limit]
+
 def allowed_file(filename):
     allowed = current_app.config['ALLOWED_EXTENSIONS']
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in allowed
@@ -16,31 +75,32 @@ def allowed_file(filename):
 @profile_bp.route('/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
-    import sys
-    print('Authorization header:', request.headers.get('Authorization'), file=sys.stderr)
     user_id = get_jwt_identity()
-    print('JWT user_id:', user_id, file=sys.stderr)
-    user = User.query.get(int(user_id))
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
-    profile_data = {
-        'id': user.id,
-        'username': user.username,
-        'email': user.email,
-        'title': user.title,
-        'bio': user.bio,
-        'skills': user.skills,
-        'avatar': user.avatar,
-        'location': user.location,
-        'phone': user.phone,
-        'languages': user.languages,
-        'connections': user.connections,
-        'mutualConnections': user.mutual_connections
-    }
-    # Return as { user: {...}, activity: [] } to match frontend
-    return jsonify({'user': profile_data, 'activity': []}), 200
+    key = profile_cache_key(user_id)
+    cached = cache.get(key)
+    if cached is None:
+        version = cache.version(key)
+        user = PROFILE_SCHEMA.load(User.query.filter_by(id=int(user_id))).add_columns(User.profile_version).first()
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        activity = load_activity(user.id, current_app.config['PROFILE_ACTIVITY_LIMIT'])
+        # Cached already encoded, so hits skip serialization entirely
+        # Return as { user: {...}, activity: [...] } to match frontend
+        body = dumps({'user': PROFILE_SCHEMA.dump(user), 'activity': activity})
+        cached = {'etag': profile_etag(user.id, user.profile_version), 'body': body}
+        cache.set(key, cached, version=version)
+    # A warm cache answers conditional GETs without touching the database. Weak comparison (RFC 9110
+    # 13.1.2): a compressed response carries the same tag as W/"..."
+    if request.if_none_match.contains_weak(cached['etag']):
+        response = current_app.response_class(status=304, mimetype='application/json')
+    else:
+        response = current_app.response_class(cached['body'], mimetype='application/json')
+    response.set_etag(cached['etag'])
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 @profile_bp.route('/profile/image', methods=['POST'])
+@limiter.limit(config_limit('UPLOAD_RATE_LIMIT'), override_defaults=False)
 @jwt_required()
 def upload_profile_image():
     if 'image' not in request.files:
@@ -49,42 +109,52 @@ def upload_profile_image():
     if not file or not isinstance(file.filename, str) or file.filename.strip() == '':
         return jsonify({'error': 'No selected file'}), 400
     if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        ext = filename.rsplit('.', 1)[1].lower()
-        # Use timestamp for uniqueness
-        new_filename = f"profile_{int(time.time())}.{ext}"
-        # Use uploads/profile/ for profile images
-        upload_folder = os.path.join(os.path.dirname(current_app.root_path), 'uploads', 'profile')
-        os.makedirs(upload_folder, exist_ok=True)
-        file_path = os.path.join(upload_folder, new_filename)
-        file.save(file_path)
-        # Validate file type using Pillow
-        try:
-            with Image.open(file_path) as img:
-                img.verify()
-                ext = img.format.lower() if img.format else None
-            if not ext or ext not in current_app.config['ALLOWED_EXTENSIONS']:
-                os.remove(file_path)
-                return jsonify({'error': 'Invalid image type'}), 400
-        except Exception:
-            os.remove(file_path)
-            return jsonify({'error': 'Invalid image type'}), 400
-        # Optionally: image compression/resizing can be added here
-        # Update user avatar
         user_id = get_jwt_identity()
         user = User.query.get(int(user_id))
         if not user:
             return jsonify({'error': 'User not found'}), 404
-        user.avatar = f"/api/profile/image/{new_filename}"
+        # Content-addressed: re-uploading the same image reuses the stored file
+        store = get_media_store()
+        allowed = IMAGE_KINDS & current_app.config['ALLOWED_EXTENSIONS']
+        try:
+            blob, unverified = store.put(file.stream, allowed, current_app.config['MAX_CONTENT_LENGTH'])
+        except UploadError:
+            return jsonify({'error': 'Invalid image type'}), 400
+        store.release_url(user.avatar)
+        user.avatar = store.url(blob)
+        bump_profile_version(user.id)
         db.session.commit()
+        invalidate_profile(user.id)
+        identities.invalidate(user.id)
+        if unverified:
+            # Full Pillow decode happens off the request thread
+            upload_pool.submit(verify_profile_image, user.id, blob.filename, user.avatar)
         return jsonify({'image_url': user.avatar}), 200
     else:
         return jsonify({'error': 'Invalid file type or size'}), 400
 
+def verify_profile_image(user_id, filename, avatar_url):
+    # Runs on the upload pool; a file that passed the magic-byte check but does not decode is deleted and dropped
+    store = get_media_store()
+    path = store.path(filename)
+    sha256 = filename.split('.', 1)[0]
+    if verify_image(path):
+        store.mark_verified(sha256)
+        db.session.commit()
+        generate_derivatives(path, sha256)
+        return
+    store.reject(sha256)
+    if User.query.filter_by(id=user_id, avatar=avatar_url).update({User.avatar: None}):
+        store.release_url(avatar_url)
+        bump_profile_version(user_id)
+    db.session.commit()
+    invalidate_profile(user_id)
+    identities.invalidate(user_id)
+
 @profile_bp.route('/profile/image/<filename>', methods=['GET'])
 def serve_profile_image(filename):
     upload_folder = os.path.join(os.path.dirname(current_app.root_path), 'uploads', 'profile')
-    return send_from_directory(upload_folder, filename)
+    return send_media(upload_folder, filename)
 
 @profile_bp.route('/profile', methods=['PUT'])
 @jwt_required()
@@ -94,24 +164,50 @@ def update_profile():
     if not user:
         return jsonify({'error': 'User not found'}), 404
     data = request.get_json()
-    # Simple validation and partial update
-    for field in ['title', 'bio', 'skills', 'avatar', 'location', 'phone', 'languages', 'connections', 'mutual_connections']:
+    # Accept the key the profile payload uses as well
+    if 'mutualConnections' in data:
+        data.setdefault('mutual_connections', data['mutualConnections'])
+    # Simple validation and partial update. The avatar only changes through /profile/image: it holds a
+    # media store reference, and a client-supplied URL could point at someone else's blob
+    for field in ['title', 'bio', 'location', 'phone', 'connections', 'mutual_connections']:
         if field in data:
             setattr(user, field, data[field])
+    # Skills and languages go through the normalized link tables
+    if 'skills' in data:
+        user.set_skills(data['skills'])
+    if 'languages' in data:
+        user.set_languages(data['languages'])
+    bump_profile_version(user.id)
     db.session.commit()
+    invalidate_profile(user.id)
+    identities.invalidate(user.id)
     # Return updated profile (excluding password_hash)
-    profile_data = {
-        'id': user.id,
-        'username': user.username,
-        'email': user.email,
-        'title': user.title,
-        'bio': user.bio,
-        'skills': user.skills,
-        'avatar': user.avatar,
-        'location': user.location,
-        'phone': user.phone,
-        'languages': user.languages,
-        'connections': user.connections,
-        'mutual_connections': user.mutual_connections
-    }
-    return jsonify(profile_data), 200 
\ No newline at end of file
+    return json_response(PROFILE_SCHEMA.dump(user))
+
+def linked_to(link_table, link_column, model, name):
+    # Users holding one skill/language: an index range on (link_id, user_id)
+    return User.id.in_(db.select(link_table.c.user_id).where(
+        link_column == db.select(model.id).where(model.name == name.lower()).scalar_subquery()))
+
+@profile_bp.route('/people', methods=['GET'])
+@jwt_required()
+def search_people():
+    skills = split_names(request.args.get('skill', ''))
+    languages = split_names(request.args.get('language', ''))
+    location = location_key(request.args.get('location'))
+    per_page = per_page_arg(request.args, 20)
+    query = PERSON_SCHEMA.load(User.query)
+    # Every listed skill/language must match
+    for name in skills:
+        query = query.filter(linked_to(user_skills, user_skills.c.skill_id, Skill, name))
+    for name in languages:
+        query = query.filter(linked_to(user_languages, user_languages.c.language_id, Language, name))
+    if location:
+        # Prefix match on the lowercased key: "san francisco" finds "San Francisco, CA"
+        query = query.filter(User.location_key >= location, User.location_key < location + '\uffff')
+    try:
+        users, next_cursor = keyset_page(query, User.follower_count, User.id, after=request.args.get('after') or None,
+                                         per_page=per_page)
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor.'}), 400
+    return json_response({'people': PERSON_SCHEMA.dump_many(users), 'next_cursor': next_cursor})
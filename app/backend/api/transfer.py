@@ -0,0 +1,214 @@
+import io
+from datetime import datetime
+from types import SimpleNamespace
+from flask import Blueprint, request, jsonify, current_app, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from werkzeug.wsgi import get_input_stream
+from models.post import Post
+from models.tag import post_tags, normalize_tags, get_or_create_tags
+from models.user import User
+from extensions import db, limiter
+from utils.serialization import dumps, loads
+from services.search import get_search_backend
+from services.rate_limit import config_limit
+from services import post_stats
+from services.post_stats import invalidate_post_caches
+from services import feed as feed_service
+from api.posts import POST_SCHEMA
+from api.profile import bump_profile_version, invalidate_profile
+
+transfer_bp = Blueprint('transfer', __name__)
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+# Line errors echoed back in the import summary; the count covers all of them
+MAX_REPORTED_ERRORS = 100
+
+
+def _flag(record, key):
+    value = record.get(key, True)
+    if isinstance(value, str):
+        return value.strip().lower() == 'true'
+    return bool(value)
+
+
+def _count(record, key):
+    value = record.get(key) or 0
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise ValueError(f'{key} must be a non-negative integer.')
+    return value
+
+
+def post_fields(record, owner_id=None):
+    """Validate one import record (the export format) into Post column values.
+
+    `id` is ignored and new ids are assigned. `user_id`, `created_at`,
+    `likes_count` and `views_count` are kept only when no owner is given
+    (CLI restores); API imports are dated now and start at zero so they
+    cannot be pinned to the top of the newest/likes/views sort orders.
+    `media_url` is dropped: media files are reference counted
+    by the store and do not travel with the NDJSON.
+    """
+    if not isinstance(record, dict):
+        raise ValueError('Each line must be a JSON object.')
+    title = str(record.get('title') or '').strip()
+    content = str(record.get('content') or '').strip()
+    if not title:
+        raise ValueError('Title is required.')
+    if not content:
+        raise ValueError('Content is required.')
+    restore = owner_id is None
+    user_id = record.get('user_id') if restore else owner_id
+    if not isinstance(user_id, int) or isinstance(user_id, bool):
+        raise ValueError('user_id is required.')
+    created_at = record.get('created_at') if restore else None
+    if created_at:
+        try:
+            created_at = datetime.fromisoformat(str(created_at))
+        except ValueError:
+            raise ValueError('created_at must be an ISO 8601 datetime.')
+        if created_at.tzinfo is not None:
+            created_at = created_at.replace(tzinfo=None) - created_at.utcoffset()
+    return {
+        'user_id': user_id,
+        'title': title[:200],
+        'content': content,
+        'allow_comments': _flag(record, 'allow_comments'),
+        'public_post': _flag(record, 'public_post'),
+        'category': (str(record.get('category') or '').strip()[:100] or None),
+        'tags': normalize_tags(record.get('tags')),
+        'created_at': created_at or datetime.utcnow(),
+        'likes_count': _count(record, 'likes_count') if restore else 0,
+        'views_count': _count(record, 'views_count') if restore else 0,
+    }
+
+
+def _insert_posts(rows):
+    """Insert column dicts as posts and return their ids in the same order."""
+    if db.engine.dialect.insert_executemany_returning_sort_by_parameter_order:
+        # SQLite/PostgreSQL: multi-row INSERT ... RETURNING. Core, not ORM bulk insert, which splits
+        # rows into groups by their None-valued keys and runs an INSERT per group
+        table = Post.__table__
+        return db.session.scalars(table.insert().returning(table.c.id, sort_by_parameter_order=True), rows).all()
+    # No RETURNING (MySQL): the ORM inserts row by row and reads each lastrowid
+    posts = [Post(**row) for row in rows]
+    db.session.add_all(posts)
+    db.session.flush()
+    return [post.id for post in posts]
+
+
+def _write_batch(batch, summary):
+    """Insert one chunk in its own transaction; caches, search and feeds are updated once for it."""
+    owners = {fields['user_id'] for _, fields in batch}
+    known = {row[0] for row in db.session.query(User.id).filter(User.id.in_(owners))}
+    rows, tag_names = [], []
+    for line_no, fields in batch:
+        if fields['user_id'] in known:
+            names = fields.pop('tags')
+            fields['tags'] = ','.join(names)[:300] or None
+            rows.append(fields)
+            tag_names.append(names)
+        else:
+            _fail(summary, line_no, 'Unknown user_id.')
+    if not rows:
+        return
+    try:
+        tags = get_or_create_tags(sorted({name for names in tag_names for name in names}))
+        db.session.flush()
+        tag_ids = {tag.name: tag.id for tag in tags}
+        ids = _insert_posts(rows)
+        links = [{'post_id': post_id, 'tag_id': tag_ids[name]} for post_id, names in zip(ids, tag_names) for name in names]
+        if links:
+            db.session.execute(post_tags.insert(), links)
+        post_stats.record_posts_added([link['tag_id'] for link in links], [row['category'] for row in rows])
+        bump_profile_version(*known)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception('Post import batch failed')
+        summary['failed'] += len(rows)
+        summary['errors'].append({'line': batch[0][0], 'error': f'Batch of {len(rows)} rolled back: {e.__class__.__name__}'})
+        return
+    created = [SimpleNamespace(id=post_id, **row) for post_id, row in zip(ids, rows)]
+    search = get_search_backend()
+    for post in created:
+        search.index_post(post)
+    invalidate_post_caches()
+    invalidate_profile(*known)
+    feed_service.fan_out_many(created)
+    summary['imported'] += len(created)
+    summary['batches'] += 1
+
+
+def _fail(summary, line_no, error):
+    summary['failed'] += 1
+    if len(summary['errors']) < MAX_REPORTED_ERRORS:
+        summary['errors'].append({'line': line_no, 'error': error})
+
+
+def import_ndjson(lines, owner_id=None, batch_size=500):
+    """Parse NDJSON lines incrementally and insert them `batch_size` posts per transaction.
+
+    Bad lines are skipped and reported with their line number; the rest
+    of the stream is still imported. Returns the summary dict.
+    """
+    summary = {'imported': 0, 'failed': 0, 'batches': 0, 'errors': []}
+    batch = []
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            batch.append((line_no, post_fields(loads(line), owner_id)))
+        except ValueError as e:
+            _fail(summary, line_no, str(e))
+            continue
+        if len(batch) >= batch_size:
+            _write_batch(batch, summary)
+            batch = []
+    if batch:
+        _write_batch(batch, summary)
+    return summary
+
+
+def export_ndjson(user_id=None, after_id=None, chunk_size=1000):
+    """NDJSON lines (bytes) in id order, fetched `chunk_size` rows at a time.
+
+    yield_per streams from a server-side cursor where the driver has one, so
+    memory stays flat regardless of table size. `after_id` resumes an
+    interrupted export.
+    """
+    query = POST_SCHEMA.load(Post.query)
+    if user_id is not None:
+        query = query.filter(Post.user_id == user_id)
+    if after_id is not None:
+        query = query.filter(Post.id > after_id)
+    result = db.session.execute(query.order_by(Post.id).statement.execution_options(yield_per=chunk_size))
+    for rows in result.partitions():
+        lines = []
+        for item in POST_SCHEMA.dump_many(rows):
+            line = dumps(item)
+            lines.append(line.encode() if isinstance(line, str) else line)
+        lines.append(b'')
+        yield b'\n'.join(lines)
+
+
+@transfer_bp.route('/posts/import', methods=['POST'])
+@limiter.limit(config_limit('UPLOAD_RATE_LIMIT'), override_defaults=False)
+@jwt_required()
+def import_posts():
+    user_id = int(get_jwt_identity())
+    # Read the body line by line as it arrives, under its own size cap instead of MAX_CONTENT_LENGTH
+    stream = io.BufferedReader(get_input_stream(
+        request.environ, max_content_length=current_app.config['POST_IMPORT_MAX_BYTES']))
+    summary = import_ndjson(stream, owner_id=user_id, batch_size=current_app.config['POST_IMPORT_BATCH_SIZE'])
+    return jsonify(summary), 200
+
+@transfer_bp.route('/posts/export', methods=['GET'])
+@jwt_required()
+def export_posts():
+    user_id = int(get_jwt_identity())
+    try:
+        after_id = int(request.args['after']) if request.args.get('after') else None
+    except ValueError:
+        return jsonify({'error': 'after must be a post id.'}), 400
+    lines = export_ndjson(user_id, after_id, current_app.config['POST_EXPORT_CHUNK_SIZE'])
+    return current_app.response_class(stream_with_context(lines), mimetype=NDJSON_MIMETYPE)
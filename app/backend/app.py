@@ -1,95 +1,212 @@
-from flask import Flask
-from flask_cors import CORS
-from config import Config
-from extensions import db, jwt
-from api import auth_bp, profile_bp, posts_bp, feed_bp, jobs_bp, messaging_bp
-from flask_jwt_extended.exceptions import NoAuthorizationError, InvalidHeaderError, WrongTokenError, RevokedTokenError, FreshTokenRequired, CSRFError
-from flask_jwt_extended import exceptions as jwt_exceptions
-from flask import jsonify
-from flask import send_from_directory
 import os
+from flask import Flask, jsonify
+from config import Config
 
 # Allow CORS from environment variable or default
 ALLOWED_ORIGINS = os.getenv('ALLOWED_ORIGINS', 'http://localhost:5173,http://127.0.0.1:5173,http://localhost:5174,http://127.0.0.1:5174,https://your-frontend-url.onrender.com').split(',')
 
-# --- WSGI app instance for Gunicorn ---
-app = Flask(__name__)
-app.config.from_object(Config)
-
-# Ensure upload directories exist
-uploads_root = os.path.join(os.path.dirname(app.root_path), 'uploads')
-os.makedirs(os.path.join(uploads_root, 'profile'), exist_ok=True)
-os.makedirs(os.path.join(uploads_root, 'posts'), exist_ok=True)
-
-db.init_app(app)
-jwt.init_app(app)
-
-# Initialize tables if they do not exist (TEMPORARY for deployment)
-with app.app_context():
-    db.create_all()
-
-CORS(
-    app,
-    origins=ALLOWED_ORIGINS,
-    supports_credentials=True,
-    allow_headers=["Content-Type", "Authorization", "X-Requested-With"],
-    methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    max_age=3600
-)
-
-# Add a homepage route
-@app.route('/')
-def home():
-    return 'Backend is running!'
-
-# Add a test route
-@app.route('/test')
-def test():
-    return jsonify({'message': 'Flask app is working!'})
-
-app.register_blueprint(auth_bp, url_prefix="/api")
-app.register_blueprint(profile_bp, url_prefix="/api")
-app.register_blueprint(posts_bp, url_prefix="/api")
-app.register_blueprint(feed_bp, url_prefix="/api")
-app.register_blueprint(jobs_bp, url_prefix="/api")
-app.register_blueprint(messaging_bp, url_prefix="/api")
-
-# Debug: Print all registered routes
-print("=== Registered Routes ===")
-for rule in app.url_map.iter_rules():
-    print(f"{rule.endpoint}: {rule.rule}")
-print("========================")
-
-# Serve uploaded post media
-@app.route('/uploads/posts/<path:filename>')
-def uploaded_file(filename):
-    upload_folder = app.config['UPLOAD_FOLDER']
-    return send_from_directory(upload_folder, filename)
-
-# Register JWT error handlers for clear error messages and CORS
-@app.errorhandler(jwt_exceptions.NoAuthorizationError)
-def handle_no_auth_error(e):
-    return jsonify({'error': 'Missing or invalid authorization token.'}), 401
-
-@app.errorhandler(jwt_exceptions.InvalidHeaderError)
-def handle_invalid_header(e):
-    return jsonify({'error': 'Invalid authorization header.'}), 422
-
-@app.errorhandler(jwt_exceptions.WrongTokenError)
-def handle_wrong_token(e):
-    return jsonify({'error': 'Wrong token type.'}), 422
-
-@app.errorhandler(jwt_exceptions.RevokedTokenError)
-def handle_revoked_token(e):
-    return jsonify({'error': 'Token has been revoked.'}), 401
-
-@app.errorhandler(jwt_exceptions.FreshTokenRequired)
-def handle_fresh_token_required(e):
-    return jsonify({'error': 'Fresh token required.'}), 401
-
-@app.errorhandler(jwt_exceptions.CSRFError)
-def handle_csrf_error(e):
-    return jsonify({'error': 'CSRF token missing or invalid.'}), 401
-
-
 
+def create_app(config_object=Config, **overrides):
+    """Build the Flask app.
+
+    Importing this module is cheap: blueprints, models and extension
+    backends are imported here, and Pillow only when an image is processed.
+    The only database access is prepare_schema()'s marker check, and only
+    when SCHEMA_AUTO_CREATE is on.
+    """
+    from flask_cors import CORS
+    from extensions import (db, jwt, cache, login_misses, counters, upload_pool, password_hasher, identities, limiter,
+                            admission, pool_metrics, request_metrics, replica_router, compression)
+    from api import auth_bp, profile_bp, posts_bp, feed_bp, jobs_bp, messaging_bp, transfer_bp
+
+    app = Flask(__name__)
+    app.config.from_object(config_object)
+    app.config.update(overrides)
+
+    # Ensure upload directories exist
+    uploads_root = os.path.join(os.path.dirname(app.root_path), 'uploads')
+    os.makedirs(os.path.join(uploads_root, 'profile'), exist_ok=True)
+    os.makedirs(os.path.join(uploads_root, 'posts'), exist_ok=True)
+
+    # Pool class and post-fork reset must be in place before the engine is created
+    pool_metrics.init_app(app)
+    db.init_app(app)
+    jwt.init_app(app)
+    cache.init_app(app)
+    login_misses.init_app(app, name='login_misses', max_entries=app.config['LOGIN_NEGATIVE_CACHE_SIZE'])
+    counters.init_app(app)
+    upload_pool.init_app(app)
+    password_hasher.init_app(app)
+    identities.init_app(app)
+    # Before the limiter and admission so their hooks fall inside the measured time
+    request_metrics.init_app(app)
+    limiter.init_app(app)
+    admission.init_app(app)
+    replica_router.init_app(app)
+    compression.init_app(app)
+
+    CORS(
+        app,
+        origins=ALLOWED_ORIGINS,
+        supports_credentials=True,
+        allow_headers=["Content-Type", "Authorization", "X-Requested-With"],
+        methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+        max_age=3600
+    )
+
+    app.register_blueprint(auth_bp, url_prefix="/api")
+    app.register_blueprint(profile_bp, url_prefix="/api")
+    app.register_blueprint(posts_bp, url_prefix="/api")
+    app.register_blueprint(feed_bp, url_prefix="/api")
+    app.register_blueprint(jobs_bp, url_prefix="/api")
+    app.register_blueprint(messaging_bp, url_prefix="/api")
+    app.register_blueprint(transfer_bp, url_prefix="/api")
+    register_routes(app)
+    register_error_handlers(app)
+
+    # Skip table creation when the migration marker says the schema is current
+    if app.config['SCHEMA_AUTO_CREATE']:
+        from migrations import prepare_schema
+        prepare_schema(app)
+    return app
+
+
+def register_routes(app):
+    from flask import Response
+    from extensions import db, cache, identities, limiter, admission, pool_metrics, request_metrics, replica_router
+    from services.instrumentation import metrics_auth
+
+    # Add a homepage route
+    @app.route('/')
+    def home():
+        return 'Backend is running!'
+
+    # Add a test route
+    @app.route('/test')
+    def test():
+        return jsonify({'message': 'Flask app is working!'})
+
+    # Operational endpoints: off the /api prefix and behind METRICS_TOKEN
+    # Identity cache hit rates (token claims / request memo / process cache / DB)
+    @app.route('/metrics/identity')
+    @metrics_auth
+    def identity_metrics():
+        return jsonify(identities.stats())
+
+    @app.route('/metrics/db-pool')
+    @metrics_auth
+    def db_pool_metrics():
+        return jsonify(pool_metrics.stats(db.engines.items()))
+
+    @app.route('/metrics/db-routing')
+    @metrics_auth
+    def db_routing_metrics():
+        return jsonify(replica_router.stats())
+
+    @app.route('/metrics/admission')
+    @metrics_auth
+    def admission_metrics():
+        return jsonify(admission.stats())
+
+    # Most recent slow requests, with a cProfile listing when the request was sampled
+    @app.route('/metrics/slow')
+    @metrics_auth
+    def slow_requests():
+        return jsonify({'threshold_ms': request_metrics.slow_threshold * 1000,
+                        'requests': request_metrics.slow_samples()})
+
+    # Prometheus scrape endpoint (per worker process)
+    @app.route('/metrics')
+    @limiter.exempt
+    @metrics_auth
+    def metrics():
+        return Response(request_metrics.exposition(
+            collector_families(db, cache, identities, admission, pool_metrics, replica_router)),
+                        mimetype='text/plain; version=0.0.4')
+
+    # Serve uploaded post media
+    @app.route('/uploads/posts/<path:filename>')
+    def uploaded_file(filename):
+        from services.derivatives import send_media
+        upload_folder = app.config['UPLOAD_FOLDER']
+        return send_media(upload_folder, filename)
+
+    # Serve content-addressed media (new uploads)
+    @app.route('/media/<filename>')
+    def media_file(filename):
+        from services.derivatives import send_media
+        from services.media_store import get_media_store
+        path = get_media_store().path(filename)
+        if path is None:
+            return jsonify({'error': 'Not found'}), 404
+        return send_media(os.path.dirname(path), filename, sha256=filename.split('.', 1)[0])
+
+
+def collector_families(db, cache, identities, admission, pool_metrics, replica_router):
+    """The other extensions' counters as Prometheus families (name, type, help, [(labels, value)])."""
+    admitted = admission.stats()
+    pool = pool_metrics.stats(db.engines.items())
+    cached = cache.stats()
+    identity = identities.stats()
+    routing = replica_router.stats()
+    return [
+        ('admission_in_flight', 'gauge', 'Requests holding an admission slot.', [({}, admitted['in_flight'])]),
+        ('admission_admitted_total', 'counter', 'Requests admitted.', [({}, admitted['admitted'])]),
+        ('admission_shed_total', 'counter', 'Requests shed with 503.', [({}, admitted['shed'])]),
+        ('db_pool_checkouts_total', 'counter', 'Connection pool checkouts.', [({}, pool['checkouts'])]),
+        ('db_pool_timeouts_total', 'counter', 'Connection pool checkout timeouts.', [({}, pool['timeouts'])]),
+        ('db_pool_checked_out', 'gauge', 'Connections currently checked out.',
+         [({'pool': name}, p['checked_out']) for name, p in pool['pools'].items()]),
+        ('db_routed_statements_total', 'counter', 'Statements by bind (primary or replica) in routed requests.',
+         [({'bind': bind}, count) for bind, count in sorted(routing['statements'].items())]),
+        ('db_replica_pinned_requests_total', 'counter', 'Replica-eligible requests kept on the primary after a write.',
+         [({}, routing['pinned_requests'])]),
+        ('cache_hits_total', 'counter', 'Shared cache hits.', [({}, cached['hits'])]),
+        ('cache_misses_total', 'counter', 'Shared cache misses.', [({}, cached['misses'])]),
+        ('identity_lookups_total', 'counter', 'Identity lookups by where they were answered.',
+         [({'source': source}, identity[source]) for source in ('claims', 'request', 'process', 'miss')]),
+    ]
+
+
+def register_error_handlers(app):
+    from flask_jwt_extended import exceptions as jwt_exceptions
+
+    @app.errorhandler(429)
+    def handle_rate_limited(e):
+        return jsonify({'error': 'Too many requests.', 'limit': str(e.description)}), 429
+
+    # Register JWT error handlers for clear error messages and CORS
+    @app.errorhandler(jwt_exceptions.NoAuthorizationError)
+    def handle_no_auth_error(e):
+        return jsonify({'error': 'Missing or invalid authorization token.'}), 401
+
+    @app.errorhandler(jwt_exceptions.InvalidHeaderError)
+    def handle_invalid_header(e):
+        return jsonify({'error': 'Invalid authorization header.'}), 422
+
+    @app.errorhandler(jwt_exceptions.WrongTokenError)
+    def handle_wrong_token(e):
+        return jsonify({'error': 'Wrong token type.'}), 422
+
+    @app.errorhandler(jwt_exceptions.RevokedTokenError)
+    def handle_revoked_token(e):
+        return jsonify({'error': 'Token has been revoked.'}), 401
+
+    @app.errorhandler(jwt_exceptions.FreshTokenRequired)
+    def handle_fresh_token_required(e):
+        return jsonify({'error': 'Fresh token required.'}), 401
+
+    @app.errorhandler(jwt_exceptions.CSRFError)
+    def handle_csrf_error(e):
+        return jsonify({'error': 'CSRF token missing or invalid.'}), 401
+
+
+def __getattr__(name):
+    # --- WSGI app instance for Gunicorn ("app:app") and `from app import app` ---
+    # Built on first access rather than at import
+    if name == 'app':
+        instance = globals().get('_app')
+        if instance is None:
+            instance = globals()['_app'] = create_app()
+        return instance
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
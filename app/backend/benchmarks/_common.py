@@ -0,0 +1,49 @@
+import os
+import sys
+import statistics
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def load_app(db_path=None, **overrides):
+    """Build the Flask app against a throwaway SQLite database (config overrides go to create_app)."""
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix='prok-bench-'), 'bench.db')
+    os.environ.setdefault('DATABASE_URL', f'sqlite:///{db_path}')
+    from app import create_app
+    return create_app(**overrides)
+
+
+def auth_headers(app, user_id=1):
+    from flask_jwt_extended import create_access_token
+    with app.app_context():
+        token = create_access_token(identity=str(user_id))
+    return {'Authorization': f'Bearer {token}'}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def time_calls(fn, repeat=20):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'p50': statistics.median(samples),
+        'p95': percentile(samples, 95),
+        'p99': percentile(samples, 99),
+        'max': max(samples),
+    }
+
+
+def report(label, stats):
+    print(f"{label:<40} p50={stats['p50']:8.2f}ms p95={stats['p95']:8.2f}ms p99={stats['p99']:8.2f}ms")
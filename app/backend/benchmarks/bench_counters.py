@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""View-counter contention: one UPDATE per view vs the buffered CounterBuffer.
+
+Usage: python benchmarks/bench_counters.py [--threads 8] [--views 2000] [--hot-posts 5]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._common import load_app
+
+
+def seed(app, hot_posts):
+    from extensions import db
+    from models.post import Post
+    from models.user import User
+    with app.app_context():
+        db.session.add(User(id=1, username='bench', email='bench@example.com', password_hash='x'))
+        db.session.add_all([Post(id=i, user_id=1, title='Hot', content='Post') for i in range(1, hot_posts + 1)])
+        db.session.commit()
+
+
+def hammer(threads, views, hot_posts, bump):
+    def worker(offset):
+        for i in range(views):
+            bump((i + offset) % hot_posts + 1)
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return time.perf_counter() - start
+
+
+def total_views(app):
+    from extensions import db
+    from models.post import Post
+    with app.app_context():
+        return db.session.query(db.func.sum(Post.views_count)).scalar() or 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--views', type=int, default=2000, help='views per thread')
+    parser.add_argument('--hot-posts', type=int, default=5)
+    args = parser.parse_args()
+
+    app = load_app()
+    seed(app, args.hot_posts)
+    from extensions import db, counters
+    from models.post import Post
+    expected = args.threads * args.views
+
+    def direct(post_id):
+        with app.app_context():
+            Post.query.filter_by(id=post_id).update({Post.views_count: Post.views_count + 1})
+            db.session.commit()
+
+    elapsed = hammer(args.threads, args.views, args.hot_posts, direct)
+    print(f'direct UPDATE per view: {expected / elapsed:10.0f} views/s ({elapsed:.2f}s, total={total_views(app)})')
+
+    counters.interval = 0.5
+    elapsed = hammer(args.threads, args.views, args.hot_posts, lambda post_id: counters.incr(post_id, views=1))
+    counters.flush()
+    print(f'buffered CounterBuffer:  {expected / elapsed:10.0f} views/s ({elapsed:.2f}s, total={total_views(app)})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""Throughput and latency percentiles for the main endpoints, with baseline comparison.
+
+Seeds a throwaway SQLite database with seed.py (or uses --database, e.g. one
+seeded earlier at a larger volume), then drives each scenario from
+--concurrency threads through the Flask test client: post pages (newest,
+category, tag, cursor), the profile of random seeded users, login, and
+post/avatar uploads of small unique PNGs. Rate limiting is off so only
+the handlers are measured. --save writes the results as a JSON baseline;
+--compare reports the change against one and exits 1 when a scenario's
+p95 or throughput regressed by more than --tolerance.
+Usage: python benchmarks/bench_endpoints.py [--users 2000 --posts 50000] [--requests 300]
+       [--scenarios posts,profile,login,upload] [--save base.json | --compare base.json]
+"""
+import argparse
+import io
+import json
+import os
+import random
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zlib
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks._common import percentile
+
+PASSWORD = 'password123'
+
+
+def tiny_png(rng):
+    # 8x8 RGB with random pixels: valid, and unique so content-addressed storage cannot dedupe it
+    raw = b''.join(b'\x00' + bytes(rng.getrandbits(8) for _ in range(24)) for _ in range(8))
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', 8, 8, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw)) + chunk(b'IEND', b''))
+
+
+class Scenarios:
+    """Each scenario is a function (client, rng) -> response; the status decides success."""
+
+    def __init__(self, app, user_ids):
+        from flask_jwt_extended import create_access_token
+        from seed import CATEGORIES, TAGS
+        self.user_ids = user_ids
+        self.categories = CATEGORIES
+        self.tags = TAGS[:20]
+        with app.app_context():
+            self.tokens = {uid: {'Authorization': f'Bearer {create_access_token(identity=str(uid))}'}
+                           for uid in random.Random(0).sample(range(user_ids[0], user_ids[1] + 1),
+                                                              min(200, user_ids[1] - user_ids[0] + 1))}
+
+    def headers(self, rng):
+        return self.tokens[rng.choice(list(self.tokens))]
+
+    def posts(self, client, rng):
+        choice = rng.random()
+        if choice < 0.4:
+            url = f'/api/posts?page={rng.randint(1, 5)}&per_page=20'
+        elif choice < 0.6:
+            url = f'/api/posts?per_page=20&category={rng.choice(self.categories)}'
+        elif choice < 0.8:
+            url = f'/api/posts?per_page=20&tag={rng.choice(self.tags)}'
+        else:
+            url = '/api/posts?per_page=20&pagination=cursor'
+        return client.get(url, headers=self.headers(rng))
+
+    def profile(self, client, rng):
+        return client.get('/api/profile', headers=self.headers(rng))
+
+    def login(self, client, rng):
+        user_id = rng.randint(*self.user_ids)
+        return client.post('/api/login', json={'username': f'seed{user_id}', 'password': PASSWORD})
+
+    def upload(self, client, rng):
+        if rng.random() < 0.5:
+            return client.post('/api/profile/image', headers=self.headers(rng),
+                               data={'image': (io.BytesIO(tiny_png(rng)), 'avatar.png')})
+        return client.post('/api/posts', headers=self.headers(rng), data={
+            'title': 'Benchmark upload', 'content': 'lorem ipsum', 'category': rng.choice(self.categories),
+            'tags': ','.join(rng.sample(self.tags, 2)), 'media': (io.BytesIO(tiny_png(rng)), 'post.png')})
+
+
+def drive(app, fn, requests, concurrency):
+    samples, failures = [], []
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def worker(index):
+        client = app.test_client()
+        rng = random.Random(index)
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    return
+            start = time.perf_counter()
+            response = fn(client, rng)
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                samples.append(elapsed)
+                if response.status_code >= 400:
+                    failures.append(response.status_code)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    return {
+        'requests': len(samples),
+        'errors': len(failures),
+        'throughput': round(len(samples) / wall, 2),
+        'p50': round(percentile(samples, 50), 3),
+        'p95': round(percentile(samples, 95), 3),
+        'p99': round(percentile(samples, 99), 3),
+        'max': round(max(samples), 3),
+    }
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    print(f"\n{'scenario':<10} {'p50':>16} {'p95':>16} {'throughput':>18}")
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+
+        def change(key):
+            return (current[key] - base[key]) / base[key] if base[key] else 0.0
+        print(f"{name:<10} {current['p50']:8.2f}ms {change('p50'):+6.1%} {current['p95']:8.2f}ms {change('p95'):+6.1%} "
+              f"{current['throughput']:8.1f}/s {change('throughput'):+6.1%}")
+        if change('p95') > tolerance or change('throughput') < -tolerance:
+            regressions.append(name)
+    if regressions:
+        print(f"Regressed beyond {tolerance:.0%}: {', '.join(regressions)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--database', help='existing database URL (seeded with seed.py); default: seed a temp SQLite file')
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--posts', type=int, default=50000)
+    parser.add_argument('--requests', type=int, default=300, help='requests per scenario')
+    parser.add_argument('--login-requests', type=int, default=30, help='login is dominated by password hashing')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--scenarios', default='posts,profile,login,upload')
+    parser.add_argument('--save', help='write results to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.10)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='prok-endpoints-')
+    if args.database:
+        os.environ['DATABASE_URL'] = args.database
+    from benchmarks._common import load_app
+    app = load_app(os.path.join(workdir, 'bench.db'), RATELIMIT_ENABLED=False,
+                   MEDIA_STORE_FOLDER=os.path.join(workdir, 'media'),
+                   DERIVATIVES_FOLDER=os.path.join(workdir, 'derivatives'))
+    from extensions import db
+    from models.user import User
+    from seed import seed
+    with app.app_context():
+        if args.database:
+            user_ids = db.session.query(db.func.min(User.id), db.func.max(User.id)) \
+                .filter(User.username.like('seed%')).one()
+            if user_ids[0] is None:
+                raise SystemExit('No seeded users in that database; run seed.py first.')
+        else:
+            print(f'Seeding {args.users} users and {args.posts} posts...')
+            user_ids = seed(users=args.users, posts=args.posts, password=PASSWORD, log=lambda line: None)
+    scenarios = Scenarios(app, user_ids)
+
+    results = {}
+    for name in args.scenarios.split(','):
+        fn = getattr(scenarios, name)
+        requests = args.login_requests if name == 'login' else args.requests
+        drive(app, fn, min(20, requests), args.concurrency)  # warm caches and pools
+        results[name] = stats = drive(app, fn, requests, args.concurrency)
+        print(f"{name:<10} {stats['requests']:>5} req {stats['errors']:>3} err {stats['throughput']:8.1f}/s "
+              f"p50={stats['p50']:8.2f}ms p95={stats['p95']:8.2f}ms p99={stats['p99']:8.2f}ms max={stats['max']:8.2f}ms")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f'Saved baseline to {args.save}')
+    if args.compare:
+        with open(args.compare) as f:
+            if compare(results, json.load(f), args.tolerance):
+                sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Home feed: precomputed timelines vs the naive follow-join query.
+
+Usage: python benchmarks/bench_feed.py [--users 2000] [--follows 20] [--posts 200000]
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._common import load_app, time_calls, report
+
+
+def seed(app, users, follows, posts, rng):
+    from extensions import db
+    from models.follow import Follow
+    from models.post import Post
+    from models.user import User
+    with app.app_context():
+        db.session.execute(User.__table__.insert(), [
+            {'id': i, 'username': f'user{i}', 'email': f'user{i}@example.com', 'password_hash': 'x',
+             'connections': 0, 'mutual_connections': 0, 'follower_count': 0}
+            for i in range(1, users + 1)])
+        edges = set()
+        for follower in range(1, users + 1):
+            for followee in rng.sample(range(1, users + 1), follows):
+                if followee != follower:
+                    edges.add((follower, followee))
+        db.session.execute(Follow.__table__.insert(), [
+            {'follower_id': a, 'followee_id': b, 'created_at': datetime(2024, 1, 1)} for a, b in edges])
+        start = datetime(2024, 1, 1)
+        for offset in range(0, posts, 50000):
+            db.session.execute(Post.__table__.insert(), [{
+                'user_id': rng.randint(1, users), 'title': 'Post', 'content': 'Body',
+                'created_at': start + timedelta(seconds=offset + i), 'allow_comments': True,
+                'public_post': True, 'likes_count': 0, 'views_count': 0,
+            } for i in range(min(50000, posts - offset))])
+        db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--follows', type=int, default=20)
+    parser.add_argument('--posts', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    app = load_app()
+    seed(app, args.users, args.follows, args.posts, rng)
+
+    from models.follow import Follow
+    from models.post import Post
+    from services import feed as feed_service
+    with app.app_context():
+        def naive():
+            uid = rng.randint(1, args.users)
+            Post.query.join(Follow, Follow.followee_id == Post.user_id) \
+                .filter(Follow.follower_id == uid).order_by(Post.created_at.desc()).limit(20).all()
+
+        def timeline():
+            uid = rng.randint(1, args.users)
+            ids = feed_service.feed_post_ids(uid, limit=20)
+            Post.query.filter(Post.id.in_(ids)).all()
+
+        # Warm every timeline once (the fan-out-on-write steady state)
+        for uid in range(1, args.users + 1):
+            feed_service.feed_post_ids(uid, limit=20)
+        report('naive join', time_calls(naive, args.repeat))
+        report('precomputed timeline', time_calls(timeline, args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Bytes on the wire and latency of the post list endpoints: full, compressed and revalidated (304).
+
+Seeds a throwaway SQLite database, then for each endpoint reports the body
+size per Accept-Encoding (br only when the brotli package is installed) and
+the latency of a full 200 against an If-None-Match revalidation.
+Usage: python benchmarks/bench_http_cache.py [--posts 5000] [--per-page 50] [--repeat 100]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks._common import load_app, auth_headers, time_calls, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--per-page', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+
+    app = load_app(os.path.join(tempfile.mkdtemp(prefix='prok-bench-'), 'bench.db'), RATELIMIT_ENABLED=False)
+    from seed import seed
+    from services.http_cache import brotli
+    with app.app_context():
+        seed(users=50, posts=args.posts, log=lambda *a: None)
+    client = app.test_client()
+    headers = auth_headers(app)
+    encodings = ['identity', 'gzip'] + (['br'] if brotli is not None else [])
+
+    for url in (f'/api/posts?per_page={args.per_page}', '/api/posts/categories', '/api/posts/popular-tags'):
+        sizes = []
+        for encoding in encodings:
+            response = client.get(url, headers=dict(headers, **{'Accept-Encoding': encoding}))
+            sizes.append(f"{response.headers.get('Content-Encoding', 'identity')}={len(response.data)}B")
+        print(f"{url}: {' '.join(sizes)}")
+        etag = client.get(url, headers=headers).headers['ETag']
+        report('  200 full', time_calls(lambda: client.get(url, headers=headers), args.repeat))
+        report('  200 gzip', time_calls(
+            lambda: client.get(url, headers=dict(headers, **{'Accept-Encoding': 'gzip'})), args.repeat))
+        revalidate = dict(headers, **{'If-None-Match': etag})
+        assert client.get(url, headers=revalidate).status_code == 304
+        report('  304 revalidated', time_calls(lambda: client.get(url, headers=revalidate), args.repeat))
+
+
+if __name__ == '__main__':
+    main()
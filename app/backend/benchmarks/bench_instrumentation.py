@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Overhead of request instrumentation on a cheap endpoint and a query-heavy one.
+
+Each mode runs in its own interpreter (the SQLAlchemy listeners are
+process-wide): METRICS_ENABLED off, on, and on with every request profiled
+(METRICS_PROFILE_SAMPLE_RATE=1) to show what sampling costs when enabled.
+Usage: python benchmarks/bench_instrumentation.py [--posts 2000] [--repeat 500]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks._common import time_calls, report
+
+MODES = (
+    ('metrics off', {'METRICS_ENABLED': 'false'}),
+    ('metrics on', {'METRICS_ENABLED': 'true'}),
+    ('metrics on, profile every request', {'METRICS_ENABLED': 'true', 'METRICS_PROFILE_SAMPLE_RATE': '1'}),
+)
+PATHS = ('/test', '/api/posts?per_page=20')
+
+
+def child(posts, repeat):
+    from benchmarks._common import load_app, auth_headers
+    app = load_app()
+    from extensions import db
+    from models.post import Post
+    from models.user import User
+    with app.app_context():
+        db.session.add(User(id=1, username='bench', email='bench@example.com', password_hash='x'))
+        db.session.execute(Post.__table__.insert(), [{
+            'user_id': 1, 'title': f'Post {i}', 'content': f'lorem ipsum {i}', 'allow_comments': True,
+            'public_post': True, 'likes_count': 0, 'views_count': 0,
+        } for i in range(posts)])
+        db.session.commit()
+    client = app.test_client()
+    headers = auth_headers(app)
+    results = {}
+    for path in PATHS:
+        for _ in range(20):
+            client.get(path, headers=headers)
+        results[path] = time_calls(lambda: client.get(path, headers=headers), repeat)
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--posts', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+    if args.child:
+        child(args.posts, args.repeat)
+        return
+    for label, env in MODES:
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', '--posts', str(args.posts),
+                              '--repeat', str(args.repeat)],
+                             cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+                             env=dict(os.environ, RATELIMIT_ENABLED='false', CACHE_BACKEND='local',
+                                      METRICS_SLOW_REQUEST_MS='100000', **env))
+        for path, stats in json.loads(out.stdout.strip().splitlines()[-1]).items():
+            report(f'{label}: {path}', stats)
+
+
+if __name__ == '__main__':
+    main()
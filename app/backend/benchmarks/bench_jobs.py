@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Job search with facets: facet index + keyset vs LIKE + GROUP BY per request.
+
+Usage: python benchmarks/bench_jobs.py [--jobs 500000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._common import load_app, auth_headers, time_calls, report
+
+ROLES = ['Python Developer', 'Data Engineer', 'Frontend Engineer', 'Product Manager', 'DevOps Engineer',
+         'Backend Developer', 'QA Analyst', 'Designer', 'Sales Lead', 'Support Specialist']
+LEVELS = ['Junior', 'Senior', 'Staff', 'Lead', 'Principal', '']
+CITIES = [f'City {i}' for i in range(200)]
+COMPANIES = [f'Company {i}' for i in range(5000)]
+QUERIES = [
+    {},
+    {'location': 'City 7'},
+    {'q': 'python'},
+    {'q': 'senior engineer', 'location': 'City 3'},
+    {'q': 'dev', 'company': 'Company 42'},
+]
+
+
+def seed(app, total, rng):
+    from extensions import db
+    from models.job import Job
+    from models.user import User
+    with app.app_context():
+        db.session.add(User(id=1, username='bench', email='bench@example.com', password_hash='x'))
+        db.session.commit()
+        start = datetime(2024, 1, 1)
+        for offset in range(0, total, 50000):
+            db.session.execute(Job.__table__.insert(), [{
+                'title': f'{rng.choice(LEVELS)} {rng.choice(ROLES)}'.strip(),
+                'company': rng.choice(COMPANIES),
+                'location': rng.choice(CITIES),
+                'description': 'Benchmark job',
+                'posted_at': start + timedelta(seconds=offset + i),
+                'user_id': 1,
+            } for i in range(min(50000, total - offset))])
+            db.session.commit()
+
+
+def naive(params):
+    from extensions import db
+    from models.job import Job
+    query = Job.query
+    for term in params.get('q', '').split():
+        query = query.filter(Job.title.ilike(f'%{term}%'))
+    for facet in ('location', 'company'):
+        if params.get(facet):
+            query = query.filter(getattr(Job, facet) == params[facet])
+    query.order_by(Job.posted_at.desc()).limit(20).all()
+    for facet in ('location', 'company'):
+        column = getattr(Job, facet)
+        facet_query = query.with_entities(column, db.func.count()).group_by(column)
+        facet_query.order_by(db.func.count().desc()).limit(20).all()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--jobs', type=int, default=500000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    app = load_app()
+    seed(app, args.jobs, random.Random(3))
+    client = app.test_client()
+    headers = auth_headers(app)
+    from urllib.parse import urlencode
+    from services.job_index import get_job_index
+    with app.app_context():
+        start = time.perf_counter()
+        get_job_index()
+        print(f'facet index build: {time.perf_counter() - start:.1f}s for {args.jobs} jobs')
+        for params in QUERIES:
+            label = urlencode(params) or '(no filters)'
+            report(f'naive    {label}', time_calls(lambda: naive(params), args.repeat))
+            report(f'indexed  {label}', time_calls(
+                lambda: client.get(f'/api/jobs?{urlencode(params)}', headers=headers), args.repeat))
+
+
+if __name__ == '__main__':
+    main()
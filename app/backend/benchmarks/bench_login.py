@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Login throughput under concurrent clients.
+
+Seeds users with one shared password hash (seeding stays fast), then drives
+/api/login from N client threads for three cases: valid credentials, wrong
+password, and unknown usernames (served by the negative cache). Also runs
+valid logins against users stored with an older hash method, which pay one
+rehash each. Reports logins/s, latency percentiles and how many requests
+were shed with 503.
+Usage: python benchmarks/bench_login.py [--threads 16] [--requests 100] [--method pbkdf2:sha256:600000]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._common import load_app, percentile
+
+PASSWORD = 'correct horse battery staple'
+
+
+def seed(app, users, method, legacy_method):
+    from werkzeug.security import generate_password_hash
+    from extensions import db
+    from models.user import User
+    current = generate_password_hash(PASSWORD, method)
+    legacy = generate_password_hash(PASSWORD, legacy_method)
+    with app.app_context():
+        db.session.execute(User.__table__.insert(), [{
+            'id': i, 'username': f'user{i}', 'email': f'user{i}@example.com',
+            'password_hash': legacy if i > users else current, 'follower_count': 0, 'profile_version': 0,
+        } for i in range(1, users * 2 + 1)])
+        db.session.commit()
+
+
+def drive(app, threads, total, make_body):
+    latencies, statuses = [], Counter()
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def worker():
+        client = app.test_client()
+        while True:
+            with lock:
+                n = next(counter, None)
+            if n is None:
+                return
+            start = time.perf_counter()
+            status = client.post('/api/login', json=make_body(n)).status_code
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] += 1
+
+    start = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return total / (time.perf_counter() - start), latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--method', default=None, help='PASSWORD_HASH_METHOD (default: config)')
+    parser.add_argument('--legacy-method', default='pbkdf2:sha256:260000')
+    args = parser.parse_args()
+
+    app = load_app()
+    from extensions import db, password_hasher
+    if args.method:
+        app.config['PASSWORD_HASH_METHOD'] = args.method
+        password_hasher.init_app(app)
+    with app.app_context():
+        db.create_all()
+    seed(app, args.users, password_hasher.method, args.legacy_method)
+    print(f'method={password_hasher.method} hash workers={password_hasher.max_workers} '
+          f'max pending={password_hasher.max_pending} client threads={args.threads}')
+
+    users = args.users
+    cases = [
+        ('valid', lambda n: {'username': f'user{n % users + 1}', 'password': PASSWORD}),
+        ('wrong password', lambda n: {'username': f'user{n % users + 1}', 'password': 'nope'}),
+        ('unknown username', lambda n: {'username': f'ghost{n % 50}', 'password': PASSWORD}),
+        ('valid + rehash', lambda n: {'username': f'user{users + n % users + 1}', 'password': PASSWORD}),
+    ]
+    for label, make_body in cases:
+        rate, latencies, statuses = drive(app, args.threads, args.requests, make_body)
+        print(f'{label:<18} {rate:8.1f} req/s p50={percentile(latencies, 50):8.2f}ms '
+              f'p99={percentile(latencies, 99):8.2f}ms statuses={dict(sorted(statuses.items()))}')
+
+
+if __name__ == '__main__':
+    main()
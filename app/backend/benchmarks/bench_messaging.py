@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Message delivery latency through long-poll while thousands of connections sit idle.
+
+Idle clients long-poll as users with no incoming mail; one receiver long-polls
+in a loop while a sender posts messages. Latency is send start -> poll return.
+Usage: python benchmarks/bench_messaging.py [--idle 2000] [--messages 50]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._common import load_app, auth_headers, percentile
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--idle', type=int, default=2000)
+    parser.add_argument('--messages', type=int, default=50)
+    args = parser.parse_args()
+
+    threading.stack_size(256 * 1024)
+    app = load_app()
+    app.config['MESSAGING_POLL_SLICE'] = 30
+    from extensions import db, message_bus
+    from models.user import User
+    with app.app_context():
+        db.session.execute(User.__table__.insert(), [
+            {'id': i, 'username': f'user{i}', 'email': f'user{i}@example.com', 'password_hash': 'x',
+             'connections': 0, 'mutual_connections': 0, 'follower_count': 0}
+            for i in range(1, args.idle + 3)])
+        db.session.commit()
+
+    stop = threading.Event()
+
+    def idle_client(user_id):
+        client = app.test_client()
+        headers = auth_headers(app, user_id)
+        while not stop.is_set():
+            client.get('/api/messages/poll?since=0&timeout=20', headers=headers)
+
+    idle = [threading.Thread(target=idle_client, args=(uid,), daemon=True) for uid in range(3, args.idle + 3)]
+    for t in idle:
+        t.start()
+    while message_bus.subscriber_count() < args.idle:
+        time.sleep(0.1)
+    print(f'{message_bus.subscriber_count()} idle long-poll connections')
+
+    sender, receiver = app.test_client(), app.test_client()
+    sender_headers, receiver_headers = auth_headers(app, 1), auth_headers(app, 2)
+    latencies = []
+    since = 0
+    for i in range(args.messages):
+        result = {}
+
+        def poll():
+            r = receiver.get(f'/api/messages/poll?since={since}&timeout=10', headers=receiver_headers)
+            result['done'] = time.perf_counter()
+            result['messages'] = r.get_json()['messages']
+        waiter = threading.Thread(target=poll)
+        waiter.start()
+        while message_bus.subscriber_count() < args.idle + 1:
+            time.sleep(0.001)
+        start = time.perf_counter()
+        sender.post('/api/messages', json={'receiver_id': 2, 'content': f'message {i}'}, headers=sender_headers)
+        waiter.join()
+        latencies.append((result['done'] - start) * 1000)
+        since = result['messages'][-1]['id']
+    stop.set()
+    print(f'delivery latency over {args.messages} messages: p50={percentile(latencies, 50):.2f}ms '
+          f'p95={percentile(latencies, 95):.2f}ms p99={percentile(latencies, 99):.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
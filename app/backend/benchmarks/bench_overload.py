@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Overload test: latency of admitted requests with and without admission control.
+
+Starts the app in a child process (threaded werkzeug server, LIKE search over
+seeded posts so every request costs real CPU), measures its capacity, then
+offers `--overload` times that rate open-loop for `--seconds`. Run once with
+admission off and once with ADMISSION_MAX_CONCURRENCY set; without it every
+request queues and p99 grows with the backlog, with it the excess is shed
+with 503 and p99 of the 200s stays near the service time.
+Rate limiting is disabled in the server so only admission control is measured.
+Usage: python benchmarks/bench_overload.py [--posts 20000] [--overload 2] [--seconds 10]
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks._common import percentile
+
+QUERY = '/api/posts?search=needle&per_page=10'
+
+
+def serve(port, posts):
+    from benchmarks._common import load_app, auth_headers
+    app = load_app()
+    from extensions import db
+    from models.post import Post
+    from models.user import User
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(id=1, username='bench', email='bench@example.com', password_hash='x'))
+        db.session.execute(Post.__table__.insert(), [{
+            'user_id': 1, 'title': f'Post {i}', 'content': f'lorem ipsum {i} ' * 30 + ('needle' if i % 500 == 0 else ''),
+            'allow_comments': True, 'public_post': True, 'likes_count': 0, 'views_count': 0,
+        } for i in range(posts)])
+        db.session.commit()
+    from werkzeug.serving import make_server
+    server = make_server('127.0.0.1', port, app, threaded=True)
+    # The parent reads the token from stdout once the server is ready
+    print(json.dumps(auth_headers(app)), flush=True)
+    server.serve_forever()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(posts, admission, queue_wait):
+    port = free_port()
+    env = dict(os.environ,
+               DATABASE_URL=f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='prok-overload-'), 'bench.db')}",
+               SEARCH_BACKEND='like', RATELIMIT_ENABLED='false', CACHE_BACKEND='local',
+               ADMISSION_MAX_CONCURRENCY=str(admission), ADMISSION_MAX_QUEUE_WAIT=str(queue_wait))
+    proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', str(port), '--posts', str(posts)],
+                            cwd=BACKEND_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    while True:
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError('server exited before becoming ready')
+        if line.startswith('{'):
+            return proc, port, json.loads(line)
+
+
+def request(port, headers):
+    start = time.perf_counter()
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    try:
+        conn.request('GET', QUERY, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        status = response.status
+    except OSError:
+        status = 'error'
+    finally:
+        conn.close()
+    return status, (time.perf_counter() - start) * 1000
+
+
+def open_loop(port, headers, rate, seconds):
+    results = []
+    lock = threading.Lock()
+
+    def fire():
+        outcome = request(port, headers)
+        with lock:
+            results.append(outcome)
+
+    interval = 1.0 / rate
+    with ThreadPoolExecutor(max_workers=256) as pool:
+        start = time.perf_counter()
+        for n in range(int(rate * seconds)):
+            delay = start + n * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(fire)
+    return results
+
+
+def run(label, args, admission):
+    proc, port, headers = start_server(args.posts, admission, args.queue_wait)
+    try:
+        for _ in range(5):
+            request(port, headers)
+        service = [request(port, headers)[1] for _ in range(20)]
+        capacity = 1000.0 / (sum(service) / len(service))
+        rate = capacity * args.overload
+        results = open_loop(port, headers, rate, args.seconds)
+    finally:
+        proc.terminate()
+        proc.wait()
+    ok = [ms for status, ms in results if status == 200]
+    statuses = Counter(status for status, _ in results)
+    print(f'{label:<22} capacity~{capacity:6.1f}/s offered {rate:6.1f}/s '
+          f'200s p50={percentile(ok, 50) if ok else 0:8.1f}ms p99={percentile(ok, 99) if ok else 0:8.1f}ms '
+          f'goodput={len(ok) / args.seconds:6.1f}/s statuses={dict(statuses)}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--posts', type=int, default=20000)
+    parser.add_argument('--overload', type=float, default=2.0, help='offered load as a multiple of capacity')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--concurrency', type=int, default=4, help='ADMISSION_MAX_CONCURRENCY for the second run')
+    parser.add_argument('--queue-wait', type=float, default=0.25, help='ADMISSION_MAX_QUEUE_WAIT for the second run')
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve, args.posts)
+        return
+    run('admission off', args, 0)
+    run(f'admission {args.concurrency}', args, args.concurrency)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""People search: scan-and-split over comma-separated columns vs the normalized indexes.
+
+The naive side loads every user and splits skills/location in Python, which is
+what a search over the old string columns amounts to. The indexed side is the
+/api/people query (skill link table + location_key range).
+Usage: python benchmarks/bench_people.py [--users 100000]
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._common import load_app, auth_headers, time_calls, report
+
+SKILLS = [f'skill{i}' for i in range(2000)] + ['Python', 'React', 'Go', 'Kubernetes']
+LANGUAGES = ['English', 'German', 'French', 'Spanish', 'Hindi', 'Portuguese']
+CITIES = [f'City {i}' for i in range(500)] + ['San Francisco, CA', 'San Jose, CA', 'Berlin']
+QUERIES = [('Python', None), ('Kubernetes', 'berlin'), (None, 'san'), ('skill42', 'city 7')]
+
+
+def seed(app, total, rng):
+    from extensions import db
+    from models.user import User, location_key
+    from models.skill import Skill, Language, user_skills, user_languages
+    with app.app_context():
+        db.session.execute(Skill.__table__.insert(), [{'name': s.lower()} for s in SKILLS])
+        db.session.execute(Language.__table__.insert(), [{'name': s.lower()} for s in LANGUAGES])
+        skill_ids = {s: i for i, s in enumerate(SKILLS, 1)}
+        language_ids = {s: i for i, s in enumerate(LANGUAGES, 1)}
+        for start in range(0, total, 20000):
+            users, skill_links, language_links = [], [], []
+            for user_id in range(start + 1, min(total, start + 20000) + 1):
+                skills = rng.sample(SKILLS, 4)
+                languages = rng.sample(LANGUAGES, 2)
+                city = rng.choice(CITIES)
+                users.append({'id': user_id, 'username': f'user{user_id}', 'email': f'user{user_id}@example.com',
+                              'password_hash': 'x', 'skills': ', '.join(skills), 'languages': ', '.join(languages),
+                              'location': city, 'location_key': location_key(city),
+                              'follower_count': rng.randint(0, 1000), 'profile_version': 0})
+                skill_links += [{'user_id': user_id, 'skill_id': skill_ids[s]} for s in skills]
+                language_links += [{'user_id': user_id, 'language_id': language_ids[s]} for s in languages]
+            db.session.execute(User.__table__.insert(), users)
+            db.session.execute(user_skills.insert(), skill_links)
+            db.session.execute(user_languages.insert(), language_links)
+            db.session.commit()
+
+
+def naive_search(skill, location):
+    from models.user import User
+    rows = User.query.with_entities(User.id, User.skills, User.location, User.follower_count).all()
+    matches = [row for row in rows
+               if (not skill or skill.lower() in [s.strip().lower() for s in (row.skills or '').split(',')])
+               and (not location or (row.location or '').lower().startswith(location))]
+    return sorted(matches, key=lambda row: (row.follower_count, row.id), reverse=True)[:20]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    app = load_app()
+    from extensions import db
+    with app.app_context():
+        db.create_all()
+    seed(app, args.users, random.Random(42))
+    client = app.test_client()
+    headers = auth_headers(app)
+    for skill, location in QUERIES:
+        label = '&'.join(f'{k}={v}' for k, v in (('skill', skill), ('location', location)) if v)
+        with app.app_context():
+            report(f'naive    {label}', time_calls(lambda: naive_search(skill, location), args.repeat))
+        params = {k: v for k, v in (('skill', skill), ('location', location)) if v}
+        report(f'indexed  {label}', time_calls(lambda: client.get('/api/people', query_string=params, headers=headers), args.repeat))
+
+
+if __name__ == '__main__':
+    main()
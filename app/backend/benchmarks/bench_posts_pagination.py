@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Offset vs keyset pagination on GET /api/posts.
+
+Seeds a SQLite posts table and times page 1 .. page 10,000 in both modes.
+Usage: python benchmarks/bench_posts_pagination.py [--posts 100000] [--per-page 10]
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._common import load_app, auth_headers, time_calls, report
+
+
+def seed(app, total):
+    from extensions import db
+    from models.user import User
+    from models.post import Post
+    with app.app_context():
+        if not db.session.get(User, 1):
+            db.session.add(User(id=1, username='bench', email='bench@example.com', password_hash='x'))
+            db.session.commit()
+        start = datetime(2024, 1, 1)
+        rows = [{
+            'user_id': 1,
+            'title': f'Post {i}',
+            'content': 'Benchmark content',
+            'created_at': start + timedelta(seconds=i),
+            'allow_comments': True,
+            'public_post': True,
+            'likes_count': i % 500,
+            'views_count': i % 5000,
+        } for i in range(total)]
+        db.session.execute(Post.__table__.insert(), rows)
+        db.session.commit()
+
+
+def cursor_for_page(app, page, per_page):
+    # The cursor a client would hold after walking to `page` (newest first)
+    from models.post import Post
+    from utils.pagination import encode_cursor
+    if page <= 1:
+        return ''
+    with app.app_context():
+        last = Post.query.order_by(Post.created_at.desc(), Post.id.desc()).offset((page - 1) * per_page - 1).first()
+        return encode_cursor(last.created_at, last.id)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--per-page', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = load_app()
+    seed(app, args.posts)
+    client = app.test_client()
+    headers = auth_headers(app)
+    last_page = args.posts // args.per_page
+    for page in [p for p in (1, 10, 100, 1000, 10000) if p <= last_page]:
+        report(f'offset page={page}', time_calls(
+            lambda: client.get(f'/api/posts?page={page}&per_page={args.per_page}', headers=headers), args.repeat))
+        after = cursor_for_page(app, page, args.per_page)
+        report(f'cursor page={page}', time_calls(
+            lambda: client.get(f'/api/posts?after={after}&per_page={args.per_page}', headers=headers), args.repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Search latency vs post count: ILIKE scan against the full-text backend.
+
+Each size is seeded into a fresh SQLite file, so the full-text side runs the
+in-process inverted index (the SQLite fallback). Query terms are planted in a
+fixed number of posts, so result size stays constant while the table grows.
+Usage: python benchmarks/bench_search.py [--sizes 10000,100000,1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._common import time_calls, report
+
+WORDS = [f'word{i}' for i in range(50000)]
+PLANTED = ['python', 'flask', 'react', 'kubernetes', 'hiring', 'remote']
+QUERIES = ['python', 'flask react', 'kube', 'hiring remote', 'word4242']
+
+
+def seed(app, total, rng, matches=500):
+    from extensions import db
+    from models.post import Post
+    from models.user import User
+    with app.app_context():
+        db.session.add(User(id=1, username='bench', email='bench@example.com', password_hash='x'))
+        db.session.commit()
+        for start in range(0, total, 50000):
+            rows = [{
+                'user_id': 1,
+                'title': ' '.join(rng.choices(WORDS, k=5)),
+                'content': ' '.join(rng.choices(WORDS, k=40) + rng.sample(PLANTED, 2) * (rng.random() < matches / total)),
+                'allow_comments': True,
+                'public_post': True,
+                'likes_count': 0,
+                'views_count': 0,
+            } for _ in range(min(50000, total - start))]
+            db.session.execute(Post.__table__.insert(), rows)
+            db.session.commit()
+
+
+def run(app, total, repeat):
+    from models.post import Post
+    from services.search import LikeSearchBackend, InMemorySearchBackend
+    with app.app_context():
+        memory = InMemorySearchBackend()
+        start = time.perf_counter()
+        memory.search('warmup')
+        print(f'n={total}: index build {time.perf_counter() - start:.1f}s')
+        for name, backend in (('like', LikeSearchBackend()), ('memory', memory)):
+            def search():
+                for q in QUERIES:
+                    query, _ = backend.apply(Post.query, q)
+                    query.order_by(Post.created_at.desc()).limit(10).all()
+            report(f'n={total} {name} ({len(QUERIES)} queries)', time_calls(search, repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--matches', type=int, default=500, help='posts per planted query term')
+    args = parser.parse_args()
+
+    from flask import Flask
+    from extensions import db
+    import models.post, models.user  # noqa: F401 register tables
+    rng = random.Random(42)
+    for total in [int(s) for s in args.sizes.split(',')]:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'search.db')}"
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+        seed(app, total, rng, args.matches)
+        run(app, total, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
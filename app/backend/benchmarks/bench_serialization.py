@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Per-row serialization cost for a 100-post page.
+
+Compares the old path (hydrate Post objects, build each dict by hand,
+isoformat + split per row, jsonify) with the shared schema: column-only
+load, dump_many, and the stdlib or orjson encoder. Load, serialize and
+encode are timed separately so each stage's share is visible.
+Usage: python benchmarks/bench_serialization.py [--rows 100] [--repeat 200]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._common import load_app
+
+
+def legacy_serialize(post):
+    return {
+        'id': post.id,
+        'user_id': post.user_id,
+        'title': post.title,
+        'content': post.content,
+        'media_url': post.media_url,
+        'allow_comments': post.allow_comments,
+        'public_post': post.public_post,
+        'created_at': post.created_at.isoformat(),
+        'category': post.category,
+        'tags': post.tags.split(',') if post.tags else [],
+        'likes_count': post.likes_count,
+        'views_count': post.views_count
+    }
+
+
+def seed(app, rows):
+    from extensions import db
+    from models.post import Post
+    from models.user import User
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.add(User(id=1, username='bench', email='bench@example.com', password_hash='x'))
+        db.session.execute(Post.__table__.insert(), [{
+            'user_id': 1, 'title': f'Post title {i}', 'content': 'Lorem ipsum dolor sit amet ' * 20,
+            'created_at': now - timedelta(minutes=i), 'allow_comments': True, 'public_post': True,
+            'category': 'engineering', 'tags': 'python,flask,sql', 'likes_count': i, 'views_count': i * 3,
+        } for i in range(rows)])
+        db.session.commit()
+
+
+def timed(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    app = load_app()
+    from flask import jsonify
+    from extensions import db
+    from models.post import Post
+    from api.posts import POST_SCHEMA
+    import utils.serialization as serialization
+    with app.app_context():
+        db.create_all()
+    seed(app, args.rows)
+
+    def query():
+        return Post.query.order_by(Post.created_at.desc()).limit(args.rows)
+
+    with app.test_request_context():
+        orm_posts = query().all()
+        rows = POST_SCHEMA.load(query()).all()
+        legacy_dicts = [legacy_serialize(p) for p in orm_posts]
+        schema_dicts = POST_SCHEMA.dump_many(rows)
+        results = [
+            ('load: ORM entities', timed(lambda: (db.session.expunge_all(), query().all()), args.repeat)),
+            ('load: schema columns', timed(lambda: POST_SCHEMA.load(query()).all(), args.repeat)),
+            ('serialize: hand-built dicts', timed(lambda: [legacy_serialize(p) for p in orm_posts], args.repeat)),
+            ('serialize: schema dump_many', timed(lambda: POST_SCHEMA.dump_many(rows), args.repeat)),
+            ('encode: jsonify', timed(lambda: jsonify({'posts': legacy_dicts}), args.repeat)),
+        ]
+        app.config['FAST_JSON'] = False
+        results.append(('encode: stdlib json', timed(lambda: serialization.json_response({'posts': schema_dicts}), args.repeat)))
+        if serialization.orjson is not None:
+            app.config['FAST_JSON'] = True
+            results.append(('encode: orjson', timed(lambda: serialization.json_response({'posts': schema_dicts}), args.repeat)))
+    for label, ms in results:
+        print(f'{label:<32} {ms:8.3f}ms/page {ms * 1000 / args.rows:8.2f}us/row')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Cold-start cost: import, app factory and first request, each in a fresh interpreter.
+
+Every sample runs a new `python` process against a new SQLite file, so
+nothing is shared between samples: `import app` alone, `create_app()`
+(extensions, blueprints, schema preparation) and the first GET /test.
+Use `--importtime` to list the modules that dominate `python -X importtime`.
+Usage: python benchmarks/bench_startup.py [--runs 10] [--importtime 15]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks._common import percentile
+
+STAGES = (
+    ('import app', 'import app'),
+    ('import app + create_app()', 'import app; app.create_app()'),
+    ('create_app() + first request', 'import app; app.create_app().test_client().get("/test")'),
+)
+
+TIMER = 'import time; _t = time.perf_counter(); {code}; print((time.perf_counter() - _t) * 1000)'
+
+
+def fresh_env():
+    db_path = os.path.join(tempfile.mkdtemp(prefix='prok-startup-'), 'bench.db')
+    return dict(os.environ, DATABASE_URL=f'sqlite:///{db_path}')
+
+
+def run_once(code):
+    out = subprocess.run([sys.executable, '-c', TIMER.format(code=code)], cwd=BACKEND_DIR,
+                         env=fresh_env(), capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def import_offenders(top):
+    out = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app; app.create_app()'],
+                         cwd=BACKEND_DIR, env=fresh_env(), capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = line.split('|')
+        if len(parts) != 3 or not parts[0].strip().split(':')[-1].strip().isdigit():
+            continue
+        rows.append((int(parts[1]), int(parts[0].split(':')[-1]), parts[2].rstrip()))
+    print(f'\nTop {top} imports by cumulative time')
+    for cumulative, own, name in sorted(rows, reverse=True)[:top]:
+        print(f'{cumulative / 1000:8.1f}ms cumulative {own / 1000:7.1f}ms self  {name}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--importtime', type=int, default=0, help='show the N slowest imports')
+    args = parser.parse_args()
+    for label, code in STAGES:
+        samples = [run_once(code) for _ in range(args.runs)]
+        print(f'{label:<32} p50={percentile(samples, 50):8.1f}ms p95={percentile(samples, 95):8.1f}ms '
+              f'min={min(samples):8.1f}ms')
+    if args.importtime:
+        import_offenders(args.importtime)
+
+
+if __name__ == '__main__':
+    main()
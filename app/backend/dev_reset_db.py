@@ -20,11 +20,11 @@ with app.app_context():
         password_hash=generate_password_hash("password123"),
         title="Software Developer",
         bio="This is a test user for development purposes.",
-        skills="Python, JavaScript, React",
         location="San Francisco, CA",
-        phone="+1-555-0123",
-        languages="English, Spanish"
+        phone="+1-555-0123"
     )
+    test_user.set_skills("Python, JavaScript, React")
+    test_user.set_languages("English, Spanish")
     db.session.add(test_user)
     db.session.commit()
 
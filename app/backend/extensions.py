@@ -1,5 +1,32 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
+from flask_limiter import Limiter
+from services.cache import Cache
+from services.counters import CounterBuffer
+from services.uploads import ProcessingPool
+from services.pubsub import MessageBus
+from services.passwords import PasswordHasher
+from services.identity import IdentityCache
+from services.rate_limit import user_or_ip_key
+from services.admission import AdmissionController
+from services.db_pool import pool_metrics
+from services.instrumentation import RequestMetrics
+from services.db_routing import RoutingSession, router as replica_router
+from services.http_cache import ResponseCompression
 
-db = SQLAlchemy()
-jwt = JWTManager() 
\ No newline at end of file
+# Reads of replica-routed requests go to a replica bind, everything else to the primary
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+jwt = JWTManager()
+cache = Cache()
+# Unknown login usernames; separate so a username spray cannot evict the shared cache's entries
+login_misses = Cache()
+counters = CounterBuffer()
+upload_pool = ProcessingPool()
+message_bus = MessageBus()
+password_hasher = PasswordHasher()
+identities = IdentityCache()
+# Registers the sqlite:// storage scheme on import; limits are keyed per user, else per IP
+limiter = Limiter(key_func=user_or_ip_key)
+admission = AdmissionController()
+request_metrics = RequestMetrics()
+compression = ResponseCompression()
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""Remove unreferenced files from the content-addressed media store.
+
+Usage: python media_gc.py [grace_seconds]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from services.media_store import get_media_store
+
+if __name__ == '__main__':
+    grace = int(sys.argv[1]) if len(sys.argv) > 1 else 3600
+    app = create_app()
+    with app.app_context():
+        removed = get_media_store().gc(grace_seconds=grace)
+    print(f"Removed {removed} unreferenced media files.")
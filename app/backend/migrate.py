@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""Apply pending schema migrations (indexes and data backfills).
+
+Usage: python migrate.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from extensions import db
+from migrations import run_migrations
+
+if __name__ == '__main__':
+    # Tables first (new models), then the recorded migrations for indexes and backfills
+    app = create_app(SCHEMA_AUTO_CREATE=False)
+    with app.app_context():
+        db.create_all()
+    applied = run_migrations(app)
+    if applied:
+        for name in applied:
+            print(f"Applied {name}")
+    else:
+        print("Schema is up to date.")
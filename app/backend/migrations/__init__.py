@@ -0,0 +1,68 @@
+import importlib
+from sqlalchemy import inspect
+from datetime import datetime
+from extensions import db
+
+# Applied migration ids; create_all() builds new tables, these cover indexes and backfills on existing ones
+schema_migrations = db.Table(
+    'schema_migrations',
+    db.Column('id', db.String(100), primary_key=True),
+    db.Column('applied_at', db.DateTime, nullable=False),
+)
+
+# Run in order; each module exposes upgrade(connection)
+MIGRATIONS = [
+    'm001_post_keyset_indexes',
+    'm002_backfill_post_tags',
+    'm003_post_fulltext_index',
+    'm004_post_stats_counters',
+    'm005_feed_timelines',
+    'm006_media_store',
+    'm007_message_conversations',
+    'm008_job_indexes',
+    'm009_profile_activity',
+    'm010_profile_store',
+    'm011_media_verification',
+    'm012_post_likes',
+]
+
+
+def pending_migrations(connection):
+    schema_migrations.create(connection, checkfirst=True)
+    applied = {row[0] for row in connection.execute(db.select(schema_migrations.c.id))}
+    return [name for name in MIGRATIONS if name not in applied]
+
+
+def prepare_schema(app):
+    """Startup schema check: one SELECT when every migration is recorded, otherwise create what is missing.
+
+    A fresh database gets create_all() plus every migration (they are cheap on
+    empty tables). An existing one with pending migrations only gets new
+    tables; its backfills are left to migrate.py. Returns the pending names.
+    """
+    with app.app_context():
+        with db.engine.begin() as connection:
+            pending = pending_migrations(connection)
+            fresh = not inspect(connection).has_table('user')
+        if not pending:
+            return []
+        db.create_all()
+    if fresh:
+        run_migrations(app)
+        return []
+    app.logger.warning('Schema migrations pending, run migrate.py: %s', ', '.join(pending))
+    return pending
+
+
+def run_migrations(app):
+    applied = []
+    with app.app_context():
+        with db.engine.begin() as connection:
+            pending = pending_migrations(connection)
+        for name in pending:
+            module = importlib.import_module(f'migrations.{name}')
+            with db.engine.begin() as connection:
+                module.upgrade(connection)
+                connection.execute(schema_migrations.insert().values(id=name, applied_at=datetime.utcnow()))
+            applied.append(name)
+    return applied
@@ -0,0 +1,7 @@
+from models.post import Post
+
+
+def upgrade(connection):
+    # create_all() does not add indexes to an existing post table
+    for index in Post.__table__.indexes:
+        index.create(connection, checkfirst=True)
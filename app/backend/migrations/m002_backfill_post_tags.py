@@ -0,0 +1,35 @@
+from sqlalchemy import select
+from models.post import Post
+from models.tag import Tag, post_tags, normalize_tags
+
+BATCH_SIZE = 1000
+
+
+def upgrade(connection):
+    Tag.__table__.create(connection, checkfirst=True)
+    post_tags.create(connection, checkfirst=True)
+    tag_ids = {name: tag_id for tag_id, name in connection.execute(select(Tag.id, Tag.name))}
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(Post.id, Post.tags)
+            .where(Post.id > last_id, Post.tags.isnot(None))
+            .order_by(Post.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        done = {post_id for (post_id,) in connection.execute(
+            select(post_tags.c.post_id.distinct()).where(post_tags.c.post_id.in_([r[0] for r in rows]))
+        )}
+        links = []
+        for post_id, tag_str in rows:
+            if post_id in done:
+                continue
+            for name in normalize_tags(tag_str):
+                if name not in tag_ids:
+                    tag_ids[name] = connection.execute(Tag.__table__.insert().values(name=name)).inserted_primary_key[0]
+                links.append({'post_id': post_id, 'tag_id': tag_ids[name]})
+        if links:
+            connection.execute(post_tags.insert(), links)
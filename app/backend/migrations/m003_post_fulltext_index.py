@@ -0,0 +1,13 @@
+from sqlalchemy import text
+
+
+def upgrade(connection):
+    dialect = connection.dialect.name
+    if dialect in ('mysql', 'mariadb'):
+        connection.execute(text('CREATE FULLTEXT INDEX ix_post_fulltext ON post (title, content)'))
+    elif dialect == 'postgresql':
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_post_fulltext ON post USING GIN "
+            "(to_tsvector('simple'::regconfig, coalesce(title, '') || ' ' || coalesce(content, '')))"
+        ))
+    # SQLite uses the in-process index from services.search
@@ -0,0 +1,27 @@
+from sqlalchemy import func, inspect, select, text
+from models.category import Category
+from models.post import Post
+from models.tag import Tag, post_tags
+
+
+def upgrade(connection):
+    columns = {column['name'] for column in inspect(connection).get_columns('tag')}
+    if 'post_count' not in columns:
+        connection.execute(text('ALTER TABLE tag ADD COLUMN post_count INTEGER NOT NULL DEFAULT 0'))
+        for index in Tag.__table__.indexes:
+            index.create(connection, checkfirst=True)
+    Category.__table__.create(connection, checkfirst=True)
+
+    # One-off backfill; afterwards the counters only move by deltas
+    counts = select(post_tags.c.tag_id, func.count().label('n')).group_by(post_tags.c.tag_id)
+    for tag_id, n in connection.execute(counts):
+        connection.execute(Tag.__table__.update().where(Tag.id == tag_id).values(post_count=n))
+    rows = connection.execute(
+        select(Post.category, func.count()).where(Post.category.isnot(None)).group_by(Post.category)
+    ).all()
+    existing = {name for (name,) in connection.execute(select(Category.name))}
+    for name, n in rows:
+        if name in existing:
+            connection.execute(Category.__table__.update().where(Category.name == name).values(post_count=n))
+        else:
+            connection.execute(Category.__table__.insert().values(name=name, post_count=n))
@@ -0,0 +1,12 @@
+from sqlalchemy import inspect, text
+from models.follow import Follow
+from models.timeline import Timeline
+
+
+def upgrade(connection):
+    columns = {column['name'] for column in inspect(connection).get_columns('user')}
+    if 'follower_count' not in columns:
+        table = connection.dialect.identifier_preparer.quote('user')
+        connection.execute(text(f'ALTER TABLE {table} ADD COLUMN follower_count INTEGER NOT NULL DEFAULT 0'))
+    Follow.__table__.create(connection, checkfirst=True)
+    Timeline.__table__.create(connection, checkfirst=True)
@@ -0,0 +1,6 @@
+from models.media import MediaBlob
+
+
+def upgrade(connection):
+    # Legacy files under uploads/posts and uploads/profile stay where they are
+    MediaBlob.__table__.create(connection, checkfirst=True)
@@ -0,0 +1,39 @@
+from sqlalchemy import func, inspect, select, text
+from models.conversation import Conversation
+from models.message import Message
+
+
+def upgrade(connection):
+    Conversation.__table__.create(connection, checkfirst=True)
+    columns = {column['name'] for column in inspect(connection).get_columns('message')}
+    if 'conversation_id' not in columns:
+        connection.execute(text('ALTER TABLE message ADD COLUMN conversation_id INTEGER NULL'))
+    for index in Message.__table__.indexes:
+        index.create(connection, checkfirst=True)
+
+    # Backfill one conversation per user pair, pointing at its latest message
+    conversations = Conversation.__table__
+    messages = Message.__table__
+    pairs = connection.execute(
+        select(messages.c.sender_id, messages.c.receiver_id, func.max(messages.c.id), func.max(messages.c.timestamp))
+        .where(messages.c.conversation_id.is_(None))
+        .group_by(messages.c.sender_id, messages.c.receiver_id)
+    ).all()
+    latest = {}
+    for sender_id, receiver_id, last_id, last_at in pairs:
+        key = Conversation.pair(sender_id, receiver_id)
+        if key not in latest or last_id > latest[key][0]:
+            latest[key] = (last_id, last_at)
+    for (user_a, user_b), (last_id, last_at) in latest.items():
+        conversation_id = connection.execute(
+            select(conversations.c.id).where(conversations.c.user_a_id == user_a, conversations.c.user_b_id == user_b)
+        ).scalar()
+        if conversation_id is None:
+            conversation_id = connection.execute(conversations.insert().values(
+                user_a_id=user_a, user_b_id=user_b, last_message_id=last_id, updated_at=last_at
+            )).inserted_primary_key[0]
+        connection.execute(messages.update().where(
+            messages.c.conversation_id.is_(None),
+            ((messages.c.sender_id == user_a) & (messages.c.receiver_id == user_b))
+            | ((messages.c.sender_id == user_b) & (messages.c.receiver_id == user_a))
+        ).values(conversation_id=conversation_id))
@@ -0,0 +1,6 @@
+from models.job import Job
+
+
+def upgrade(connection):
+    for index in Job.__table__.indexes:
+        index.create(connection, checkfirst=True)
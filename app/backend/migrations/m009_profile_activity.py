@@ -0,0 +1,12 @@
+from sqlalchemy import inspect, text
+from models.post import Post
+from models.job import Job
+
+
+def upgrade(connection):
+    columns = {column['name'] for column in inspect(connection).get_columns('user')}
+    if 'profile_version' not in columns:
+        table = connection.dialect.identifier_preparer.quote('user')
+        connection.execute(text(f'ALTER TABLE {table} ADD COLUMN profile_version INTEGER NOT NULL DEFAULT 0'))
+    for index in (*Post.__table__.indexes, *Job.__table__.indexes):
+        index.create(connection, checkfirst=True)
@@ -0,0 +1,69 @@
+from sqlalchemy import bindparam, inspect, select, text
+from models.user import User, location_key
+from models.skill import Skill, Language, user_skills, user_languages, split_names
+
+BATCH_SIZE = 1000
+PROFILE_FIELDS = ('bio', 'skills', 'location', 'phone', 'languages')
+
+
+def merge_profiles(connection):
+    # The old standalone profile table: copy anything the user row is missing, then drop it
+    if not inspect(connection).has_table('profile'):
+        return
+    users = User.__table__
+    rows = connection.execute(text('SELECT user_id, bio, skills, location, phone, languages FROM profile')).all()
+    for row in rows:
+        current = connection.execute(select(*[users.c[f] for f in PROFILE_FIELDS]).where(users.c.id == row.user_id)).first()
+        if current is None:
+            continue
+        values = {f: getattr(row, f) for f in PROFILE_FIELDS if getattr(current, f) is None and getattr(row, f) is not None}
+        if values:
+            connection.execute(users.update().where(users.c.id == row.user_id).values(**values))
+    connection.execute(text('DROP TABLE profile'))
+
+
+def backfill_links(connection, column, model, link_table, link_column):
+    ids = {name: row_id for row_id, name in connection.execute(select(model.id, model.name))}
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(User.id, column).where(User.id > last_id, column.isnot(None)).order_by(User.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        done = {user_id for (user_id,) in connection.execute(
+            select(link_table.c.user_id.distinct()).where(link_table.c.user_id.in_([r[0] for r in rows]))
+        )}
+        links = []
+        for user_id, value in rows:
+            if user_id in done:
+                continue
+            for key in dict.fromkeys(name.lower() for name in split_names(value)):
+                if key not in ids:
+                    ids[key] = connection.execute(model.__table__.insert().values(name=key)).inserted_primary_key[0]
+                links.append({'user_id': user_id, link_column: ids[key]})
+        if links:
+            connection.execute(link_table.insert(), links)
+
+
+def upgrade(connection):
+    users = User.__table__
+    columns = {column['name'] for column in inspect(connection).get_columns('user')}
+    if 'location_key' not in columns:
+        table = connection.dialect.identifier_preparer.quote('user')
+        connection.execute(text(f'ALTER TABLE {table} ADD COLUMN location_key VARCHAR(120) NULL'))
+    for index in users.indexes:
+        index.create(connection, checkfirst=True)
+    for table in (Skill.__table__, Language.__table__, user_skills, user_languages):
+        table.create(connection, checkfirst=True)
+
+    merge_profiles(connection)
+
+    rows = connection.execute(select(users.c.id, users.c.location).where(users.c.location.isnot(None))).all()
+    update = users.update().where(users.c.id == bindparam('user_id')).values(location_key=bindparam('key'))
+    for start in range(0, len(rows), BATCH_SIZE):
+        connection.execute(update, [{'user_id': user_id, 'key': location_key(location)}
+                                    for user_id, location in rows[start:start + BATCH_SIZE]])
+    backfill_links(connection, users.c.skills, Skill, user_skills, 'skill_id')
+    backfill_links(connection, users.c.languages, Language, user_languages, 'language_id')
@@ -0,0 +1,10 @@
+from sqlalchemy import inspect, text
+from models.media import MediaBlob
+
+
+def upgrade(connection):
+    # Existing blobs start unverified: the next upload of the same bytes checks them again
+    table = MediaBlob.__table__.name
+    columns = {column['name'] for column in inspect(connection).get_columns(table)}
+    if 'verified' not in columns:
+        connection.execute(text(f'ALTER TABLE {table} ADD COLUMN verified BOOLEAN NOT NULL DEFAULT FALSE'))
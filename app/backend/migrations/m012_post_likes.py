@@ -0,0 +1,6 @@
+from models.like import PostLike
+
+
+def upgrade(connection):
+    # Likes recorded before this have no rows: they stay counted, and cannot be removed
+    PostLike.__table__.create(connection, checkfirst=True)
@@ -0,0 +1,10 @@
+from extensions import db
+
+class Category(db.Model):
+    # Per-category post counter kept in step with Post.category by services.post_stats
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+    post_count = db.Column(db.Integer, default=0, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<Category {self.name}>'
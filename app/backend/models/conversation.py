@@ -0,0 +1,27 @@
+from extensions import db
+from datetime import datetime
+
+class Conversation(db.Model):
+    # One row per pair of users; user_a_id < user_b_id
+    id = db.Column(db.Integer, primary_key=True)
+    user_a_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_b_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    last_message_id = db.Column(db.Integer, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_a_id', 'user_b_id', name='uq_conversation_users'),
+        # Conversation list for either participant, most recent first
+        db.Index('ix_conversation_user_a_updated', 'user_a_id', 'updated_at'),
+        db.Index('ix_conversation_user_b_updated', 'user_b_id', 'updated_at'),
+    )
+
+    @staticmethod
+    def pair(user_id, other_id):
+        return (user_id, other_id) if user_id < other_id else (other_id, user_id)
+
+    def other_user_id(self, user_id):
+        return self.user_b_id if self.user_a_id == user_id else self.user_a_id
+
+    def __repr__(self):
+        return f'<Conversation {self.id} between {self.user_a_id} and {self.user_b_id}>'
@@ -0,0 +1,15 @@
+from extensions import db
+from datetime import datetime
+
+class Follow(db.Model):
+    follower_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    followee_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    # Fan-out looks up followers of an author
+    __table_args__ = (
+        db.Index('ix_follow_followee_id_follower_id', 'followee_id', 'follower_id'),
+    )
+
+    def __repr__(self):
+        return f'<Follow {self.follower_id} -> {self.followee_id}>'
@@ -11,5 +11,13 @@ class Job(db.Model):
 
     user = db.relationship('User', backref=db.backref('jobs', lazy=True))
 
+    # Keyset pagination by (posted_at, id), optionally narrowed to one location or company
+    __table_args__ = (
+        db.Index('ix_job_posted_at_id', 'posted_at', 'id'),
+        db.Index('ix_job_location_posted_at_id', 'location', 'posted_at', 'id'),
+        db.Index('ix_job_company_posted_at_id', 'company', 'posted_at', 'id'),
+        db.Index('ix_job_user_id_posted_at_id', 'user_id', 'posted_at', 'id'),
+    )
+
     def __repr__(self):
         return f'<Job {self.title} at {self.company}>'
@@ -0,0 +1,17 @@
+from extensions import db
+from datetime import datetime
+
+class PostLike(db.Model):
+    # One row per (user, post): a like or unlike only reaches likes_count when this state flips
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    # Deleting a post drops its likes
+    post_id = db.Column(db.Integer, db.ForeignKey('post.id', ondelete='CASCADE'), primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    # Likes of one post, for delete_post
+    __table_args__ = (
+        db.Index('ix_post_like_post_id', 'post_id'),
+    )
+
+    def __repr__(self):
+        return f'<PostLike {self.user_id} -> {self.post_id}>'
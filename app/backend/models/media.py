@@ -0,0 +1,20 @@
+from extensions import db
+from datetime import datetime
+
+class MediaBlob(db.Model):
+    # One row per stored file in the content-addressed media store
+    sha256 = db.Column(db.String(64), primary_key=True)
+    ext = db.Column(db.String(8), nullable=False)
+    size = db.Column(db.BigInteger, nullable=False)
+    ref_count = db.Column(db.Integer, default=0, nullable=False, index=True)
+    # Set once the full image decode passed; until then every upload of these bytes is checked again
+    verified = db.Column(db.Boolean, default=False, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    @property
+    def filename(self):
+        return f'{self.sha256}.{self.ext}'
+
+    def __repr__(self):
+        return f'<MediaBlob {self.filename} refs={self.ref_count}>'
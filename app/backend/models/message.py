@@ -3,6 +3,7 @@ from datetime import datetime
 
 class Message(db.Model):
     id = db.Column(db.Integer, primary_key=True)
+    conversation_id = db.Column(db.Integer, db.ForeignKey('conversation.id'), nullable=True)
     sender_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     receiver_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     content = db.Column(db.Text, nullable=False)
@@ -11,5 +12,13 @@ class Message(db.Model):
     sender = db.relationship('User', foreign_keys=[sender_id], backref=db.backref('sent_messages', lazy=True))
     receiver = db.relationship('User', foreign_keys=[receiver_id], backref=db.backref('received_messages', lazy=True))
 
+    __table_args__ = (
+        # History pages within a conversation (keyset on timestamp, id)
+        db.Index('ix_message_conversation_timestamp_id', 'conversation_id', 'timestamp', 'id'),
+        # New-message checks for long-poll/SSE delivery
+        db.Index('ix_message_receiver_id_id', 'receiver_id', 'id'),
+        db.Index('ix_message_sender_receiver_timestamp', 'sender_id', 'receiver_id', 'timestamp'),
+    )
+
     def __repr__(self):
         return f'<Message {self.id} from {self.sender_id} to {self.receiver_id}>'
@@ -1,5 +1,6 @@
 from extensions import db
 from datetime import datetime
+from models.tag import post_tags, normalize_tags, get_or_create_tags
 
 class Post(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -10,12 +11,27 @@ class Post(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     allow_comments = db.Column(db.Boolean, default=True, nullable=False)
     public_post = db.Column(db.Boolean, default=True, nullable=False)
-    category = db.Column(db.String(100), nullable=True)
-    tags = db.Column(db.String(300), nullable=True)  # Comma-separated tags
+    category = db.Column(db.String(100), nullable=True, index=True)
+    tags = db.Column(db.String(300), nullable=True)  # Comma-separated tags (denormalized copy of tag_set)
     likes_count = db.Column(db.Integer, default=0, nullable=False)
     views_count = db.Column(db.Integer, default=0, nullable=False)
 
     user = db.relationship('User', backref=db.backref('posts', lazy=True))
+    tag_set = db.relationship('Tag', secondary=post_tags, lazy=True, backref=db.backref('posts', lazy='dynamic'))
+
+    # Composite (sort key, id) indexes back the keyset pagination in get_posts
+    __table_args__ = (
+        db.Index('ix_post_created_at_id', 'created_at', 'id'),
+        db.Index('ix_post_likes_count_id', 'likes_count', 'id'),
+        db.Index('ix_post_views_count_id', 'views_count', 'id'),
+        # Recent posts by one author (profile activity)
+        db.Index('ix_post_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+    )
+
+    def set_tags(self, value):
+        names = normalize_tags(value)
+        self.tag_set = get_or_create_tags(names)
+        self.tags = ','.join(names)[:300] or None
 
     def __repr__(self):
         return f'<Post {self.id} by User {self.user_id}>'
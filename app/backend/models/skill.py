@@ -0,0 +1,62 @@
+from extensions import db
+
+# Normalized user <-> skill/language associations; (skill_id, user_id) indexes serve people search
+user_skills = db.Table(
+    'user_skills',
+    db.Column('user_id', db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('skill_id', db.Integer, db.ForeignKey('skill.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_user_skills_skill_id_user_id', 'skill_id', 'user_id'),
+)
+
+user_languages = db.Table(
+    'user_languages',
+    db.Column('user_id', db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('language_id', db.Integer, db.ForeignKey('language.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_user_languages_language_id_user_id', 'language_id', 'user_id'),
+)
+
+class Skill(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False)
+
+    def __repr__(self):
+        return f'<Skill {self.name}>'
+
+class Language(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False)
+
+    def __repr__(self):
+        return f'<Language {self.name}>'
+
+
+def split_names(value):
+    """Split a comma-separated string (or list) into unique display names, compared case-insensitively."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    names, seen = [], set()
+    for raw in value:
+        name = raw.strip()[:50]
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            names.append(name)
+    return names
+
+
+def get_or_create(model, names):
+    """Rows of Skill/Language for the given display names; stored lowercased."""
+    keys = list(dict.fromkeys(name.lower() for name in names))
+    if not keys:
+        return []
+    existing = {row.name: row for row in model.query.filter(model.name.in_(keys)).all()}
+    rows = []
+    for key in keys:
+        row = existing.get(key)
+        if row is None:
+            row = model(name=key)
+            db.session.add(row)
+            existing[key] = row
+        rows.append(row)
+    return rows
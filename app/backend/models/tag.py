@@ -0,0 +1,47 @@
+from extensions import db
+
+# Normalized post <-> tag association; (tag_id, post_id) index serves the tag filter
+post_tags = db.Table(
+    'post_tags',
+    db.Column('post_id', db.Integer, db.ForeignKey('post.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tag.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_post_tags_tag_id_post_id', 'tag_id', 'post_id'),
+)
+
+class Tag(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False)
+    # Maintained incrementally by services.post_stats
+    post_count = db.Column(db.Integer, default=0, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<Tag {self.name}>'
+
+
+def normalize_tags(value):
+    """Split a comma-separated tag string (or list) into unique, lowercased names."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    names = []
+    for raw in value:
+        name = raw.strip().lower()[:50]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def get_or_create_tags(names):
+    if not names:
+        return []
+    existing = {tag.name: tag for tag in Tag.query.filter(Tag.name.in_(names)).all()}
+    tags = []
+    for name in names:
+        tag = existing.get(name)
+        if tag is None:
+            tag = Tag(name=name, post_count=0)
+            db.session.add(tag)
+            existing[name] = tag
+        tags.append(tag)
+    return tags
@@ -0,0 +1,33 @@
+import struct
+from extensions import db
+from datetime import datetime
+
+class Timeline(db.Model):
+    # Precomputed home feed: newest-first post ids packed as big-endian uint32
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    post_ids = db.Column(db.LargeBinary, nullable=False, default=b'')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    @staticmethod
+    def pack(ids):
+        return struct.pack(f'>{len(ids)}I', *ids)
+
+    @staticmethod
+    def unpack(blob):
+        blob = blob or b''
+        return list(struct.unpack(f'>{len(blob) // 4}I', blob))
+
+    def ids(self):
+        return self.unpack(self.post_ids)
+
+    def push(self, post_id, cap):
+        self.post_ids = (self.pack([post_id]) + (self.post_ids or b''))[:cap * 4]
+
+    def discard(self, post_id):
+        ids = self.ids()
+        if post_id in ids:
+            ids.remove(post_id)
+            self.post_ids = self.pack(ids)
+
+    def __repr__(self):
+        return f'<Timeline for User {self.user_id}>'
@@ -1,4 +1,6 @@
 from extensions import db
+from sqlalchemy.orm import validates
+from models.skill import Skill, Language, user_skills, user_languages, split_names, get_or_create
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -8,13 +10,42 @@ class User(db.Model):
     # Profile fields
     title = db.Column(db.String(120), nullable=True)
     bio = db.Column(db.String(300), nullable=True)
-    skills = db.Column(db.String(300), nullable=True)  # Comma-separated
+    skills = db.Column(db.String(300), nullable=True)  # Comma-separated (denormalized copy of skill_set)
     avatar = db.Column(db.String(300), nullable=True)
     location = db.Column(db.String(120), nullable=True)
+    # Lowercased location; equality and prefix lookups for people search run off its index
+    location_key = db.Column(db.String(120), nullable=True, index=True)
     phone = db.Column(db.String(32), nullable=True)
-    languages = db.Column(db.String(120), nullable=True)  # Comma-separated
+    languages = db.Column(db.String(120), nullable=True)  # Comma-separated (denormalized copy of language_set)
     connections = db.Column(db.Integer, default=0)
     mutual_connections = db.Column(db.Integer, default=0)
+    # Maintained on follow/unfollow; decides fan-out-on-write vs fan-out-on-read
+    follower_count = db.Column(db.Integer, default=0, nullable=False)
+    # Bumped on every change the profile page shows; the profile ETag is derived from it
+    profile_version = db.Column(db.Integer, default=0, nullable=False)
+
+    skill_set = db.relationship('Skill', secondary=user_skills, lazy=True, backref=db.backref('users', lazy='dynamic'))
+    language_set = db.relationship('Language', secondary=user_languages, lazy=True,
+                                   backref=db.backref('users', lazy='dynamic'))
+
+    @validates('location')
+    def _set_location_key(self, key, value):
+        self.location_key = location_key(value)
+        return value
+
+    def set_skills(self, value):
+        names = split_names(value)
+        self.skill_set = get_or_create(Skill, names)
+        self.skills = ', '.join(names)[:300] or None
+
+    def set_languages(self, value):
+        names = split_names(value)
+        self.language_set = get_or_create(Language, names)
+        self.languages = ', '.join(names)[:120] or None
 
     def __repr__(self):
         return f'<User {self.username}>'
+
+
+def location_key(value):
+    return (value or '').strip().lower()[:120] or None
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""Bulk-load synthetic users, posts, jobs and messages for load testing.
+
+Rows are generated deterministically from --seed and appended after the
+highest existing ids, in batches of --batch rows: one executemany per batch,
+or COPY ... FROM STDIN on PostgreSQL (psycopg2). Tag, category, skill and
+language rows and their post_count counters are written in the same pass,
+so the database is consistent without any recount. Every seeded user's
+password is --password, hashed once with PASSWORD_HASH_METHOD.
+Targets DATABASE_URL like the app.
+Usage: python seed.py --users 100000 --posts 1000000 --jobs 50000 --messages 500000
+"""
+import argparse
+import csv
+import io
+import itertools
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, func, text
+
+WORDS = ('data', 'cloud', 'team', 'design', 'product', 'launch', 'growth', 'remote', 'hiring', 'career',
+         'python', 'react', 'api', 'scale', 'latency', 'mentor', 'startup', 'review', 'release', 'roadmap',
+         'metrics', 'security', 'mobile', 'research', 'community', 'open', 'source', 'platform', 'ux', 'ml')
+CATEGORIES = ('Technology', 'Career', 'Design', 'Business', 'Marketing', 'Engineering', 'Data Science',
+              'Product', 'Leadership', 'Education', 'Health', 'Finance')
+SKILLS = ('Python', 'JavaScript', 'TypeScript', 'React', 'SQL', 'Go', 'Rust', 'Java', 'Kotlin', 'Swift',
+          'Docker', 'Kubernetes', 'AWS', 'GCP', 'Figma', 'Machine Learning', 'Data Analysis', 'Marketing',
+          'Sales', 'Project Management')
+LANGUAGES = ('English', 'Spanish', 'French', 'German', 'Portuguese', 'Hindi', 'Mandarin', 'Japanese', 'Arabic')
+LOCATIONS = ('San Francisco, CA', 'New York, NY', 'Austin, TX', 'Seattle, WA', 'London, UK', 'Berlin, Germany',
+             'Bangalore, India', 'Toronto, Canada', 'Lagos, Nigeria', 'Sydney, Australia', 'Remote')
+COMPANIES = ('Acme', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Stark Industries', 'Wayne Enterprises',
+             'Soylent', 'Tyrell', 'Cyberdyne', 'Vandelay', 'Wonka')
+JOB_TITLES = ('Software Engineer', 'Senior Backend Engineer', 'Frontend Developer', 'Data Scientist',
+              'Product Manager', 'Designer', 'DevOps Engineer', 'Engineering Manager', 'QA Engineer')
+# Tag vocabulary with a long tail: popular-tags and tag filters see a realistic skew
+TAGS = tuple(f'{a}-{b}' if a != b else a for a, b in itertools.product(WORDS, WORDS[:10]))
+TAG_CUM_WEIGHTS = tuple(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(TAGS))))
+HISTORY_DAYS = 365
+TEXT_POOL = 1024
+
+
+def _texts(rng, low, high):
+    # Bodies are drawn from a pool; joining fresh word lists per row dominated the generation time
+    return [' '.join(rng.choices(WORDS, k=rng.randint(low, high))) for _ in range(TEXT_POOL)]
+
+
+def bulk_insert(table, rows, batch):
+    """Insert an iterable of row dicts, committing every `batch` rows. Returns the row count."""
+    from extensions import db
+    rows = iter(rows)
+    total = 0
+    while True:
+        chunk = list(itertools.islice(rows, batch))
+        if not chunk:
+            return total
+        if db.engine.dialect.name == 'postgresql' and db.engine.driver == 'psycopg2':
+            _copy(table, chunk)
+        else:
+            db.session.execute(table.insert(), chunk)
+        db.session.commit()
+        total += len(chunk)
+
+
+def _copy(table, chunk):
+    from extensions import db
+    columns = list(chunk[0])
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in chunk:
+        # Empty unquoted fields are NULL in COPY's csv format
+        writer.writerow(['' if row[c] is None else row[c] for c in columns])
+    buf.seek(0)
+    preparer = db.engine.dialect.identifier_preparer
+    cursor = db.session.connection().connection.cursor()
+    cursor.copy_expert(f"COPY {preparer.format_table(table)} ({', '.join(preparer.quote(c) for c in columns)}) "
+                       f"FROM STDIN WITH (FORMAT csv)", buf)
+
+
+def _sync_sequence(table):
+    # Rows were inserted with explicit ids; move the serial past them
+    from extensions import db
+    if db.engine.dialect.name == 'postgresql':
+        name = db.engine.dialect.identifier_preparer.format_table(table)
+        db.session.execute(text(f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), "
+                                f"(SELECT COALESCE(MAX(id), 1) FROM {name}))"))
+        db.session.commit()
+
+
+def _next_id(model):
+    from extensions import db
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def _name_ids(model, names):
+    """Ids for lookup rows by name, inserting the missing ones (names as given; unique by name)."""
+    from extensions import db
+    existing = dict(db.session.query(model.name, model.id).filter(model.name.in_(names)).all())
+    missing = [{'name': name} for name in names if name not in existing]
+    if missing:
+        if hasattr(model, 'post_count'):
+            missing = [dict(row, post_count=0) for row in missing]
+        db.session.execute(model.__table__.insert(), missing)
+        db.session.commit()
+        existing = dict(db.session.query(model.name, model.id).filter(model.name.in_(names)).all())
+    return existing
+
+
+def _add_counts(model, counts):
+    from extensions import db
+    if not counts:
+        return
+    table = model.__table__
+    db.session.execute(table.update().where(table.c.id == bindparam('_id'))
+                       .values(post_count=table.c.post_count + bindparam('_delta')),
+                       [{'_id': key, '_delta': delta} for key, delta in counts.items()])
+    db.session.commit()
+
+
+def _timestamps(count, now):
+    # Evenly spread over the history window, oldest first, so ids and timestamps rise together
+    start = now - timedelta(days=HISTORY_DAYS)
+    step = HISTORY_DAYS * 86400.0 / max(count, 1)
+    return (start + timedelta(seconds=i * step) for i in range(count))
+
+
+def _author(rng, user_ids):
+    # Skewed toward the first seeded users, so a few authors are prolific
+    lo, hi = user_ids
+    return lo + int((hi - lo) * rng.random() ** 2)
+
+
+def seed_users(rng, count, batch, password_hash):
+    from models.skill import Skill, Language, user_skills, user_languages
+    from models.user import User, location_key
+    first = _next_id(User)
+    skill_ids = _name_ids(Skill, [name.lower() for name in SKILLS])
+    language_ids = _name_ids(Language, [name.lower() for name in LANGUAGES])
+    bios = _texts(rng, 8, 16)
+    skills, languages = {}, {}
+
+    def users():
+        for user_id in range(first, first + count):
+            location = rng.choice(LOCATIONS)
+            skills[user_id] = rng.sample(SKILLS, rng.randint(1, 4))
+            languages[user_id] = rng.sample(LANGUAGES, rng.randint(1, 2))
+            yield {
+                'id': user_id, 'username': f'seed{user_id}', 'email': f'seed{user_id}@example.com',
+                'password_hash': password_hash, 'title': rng.choice(JOB_TITLES),
+                'bio': rng.choice(bios), 'skills': ', '.join(skills[user_id]),
+                'avatar': None, 'location': location, 'location_key': location_key(location), 'phone': None,
+                'languages': ', '.join(languages[user_id]), 'connections': rng.randint(0, 500),
+                'mutual_connections': 0, 'follower_count': 0, 'profile_version': 0,
+            }
+
+    def links(source, ids, column):
+        # Drains the names recorded while the users were generated
+        for user_id in list(source):
+            for name in source.pop(user_id):
+                yield {'user_id': user_id, column: ids[name.lower()]}
+
+    inserted = 0
+    users_iter = users()
+    while True:
+        done = bulk_insert(User.__table__, itertools.islice(users_iter, batch), batch)
+        if not done:
+            break
+        inserted += done
+        bulk_insert(user_skills, links(skills, skill_ids, 'skill_id'), batch)
+        bulk_insert(user_languages, links(languages, language_ids, 'language_id'), batch)
+    _sync_sequence(User.__table__)
+    return (first, first + inserted - 1) if inserted else None
+
+
+def seed_posts(rng, count, batch, user_ids, now):
+    from models.category import Category
+    from models.post import Post
+    from models.tag import Tag, post_tags
+    first = _next_id(Post)
+    tag_ids = _name_ids(Tag, list(TAGS))
+    category_ids = _name_ids(Category, list(CATEGORIES))
+    titles, bodies = _texts(rng, 4, 8), _texts(rng, 20, 80)
+    tag_counts, category_counts = Counter(), Counter()
+    links = []
+
+    def posts():
+        for post_id, created_at in zip(range(first, first + count), _timestamps(count, now)):
+            tags = list(dict.fromkeys(rng.choices(TAGS, cum_weights=TAG_CUM_WEIGHTS, k=rng.randint(0, 4))))
+            category = rng.choice(CATEGORIES) if rng.random() < 0.8 else None
+            tag_counts.update(tag_ids[name] for name in tags)
+            if category:
+                category_counts[category_ids[category]] += 1
+            links.extend({'post_id': post_id, 'tag_id': tag_ids[name]} for name in tags)
+            yield {
+                'id': post_id, 'user_id': _author(rng, user_ids), 'title': rng.choice(titles).capitalize(),
+                'content': rng.choice(bodies), 'media_url': None,
+                'created_at': created_at, 'allow_comments': True, 'public_post': rng.random() < 0.9,
+                'category': category, 'tags': ','.join(tags) or None,
+                'likes_count': min(int(rng.paretovariate(1.5)) - 1, 100000),
+                'views_count': min(int(rng.paretovariate(1.2) * 10), 1000000),
+            }
+
+    inserted = 0
+    posts_iter = posts()
+    while True:
+        done = bulk_insert(Post.__table__, itertools.islice(posts_iter, batch), batch)
+        if not done:
+            break
+        inserted += done
+        bulk_insert(post_tags, links, batch)
+        links.clear()
+    _sync_sequence(Post.__table__)
+    _add_counts(Tag, tag_counts)
+    _add_counts(Category, category_counts)
+    return inserted
+
+
+def seed_jobs(rng, count, batch, user_ids, now):
+    from models.job import Job
+    first = _next_id(Job)
+    descriptions = _texts(rng, 30, 60)
+    rows = ({
+        'id': job_id, 'title': rng.choice(JOB_TITLES), 'company': rng.choice(COMPANIES),
+        'location': rng.choice(LOCATIONS), 'description': rng.choice(descriptions),
+        'posted_at': posted_at, 'user_id': _author(rng, user_ids),
+    } for job_id, posted_at in zip(range(first, first + count), _timestamps(count, now)))
+    inserted = bulk_insert(Job.__table__, rows, batch)
+    _sync_sequence(Job.__table__)
+    return inserted
+
+
+def seed_messages(rng, count, batch, user_ids, now, per_conversation=20):
+    from extensions import db
+    from models.conversation import Conversation
+    from models.message import Message
+    lo, hi = user_ids
+    wanted = min(max(1, count // per_conversation), (hi - lo + 1) * (hi - lo) // 2)
+    existing = set(db.session.query(Conversation.user_a_id, Conversation.user_b_id)
+                   .filter(Conversation.user_a_id >= lo).all())
+    pairs = set()
+    while len(pairs) < wanted:
+        a, b = rng.randint(lo, hi), rng.randint(lo, hi)
+        if a != b and Conversation.pair(a, b) not in existing:
+            pairs.add(Conversation.pair(a, b))
+    first_conversation = _next_id(Conversation)
+    conversations = list(zip(range(first_conversation, first_conversation + len(pairs)), sorted(pairs)))
+    start = now - timedelta(days=HISTORY_DAYS)
+    bulk_insert(Conversation.__table__, ({'id': cid, 'user_a_id': a, 'user_b_id': b, 'last_message_id': None,
+                                          'updated_at': start} for cid, (a, b) in conversations), batch)
+    _sync_sequence(Conversation.__table__)
+
+    first = _next_id(Message)
+    bodies = _texts(rng, 3, 25)
+    last = {}
+
+    def messages():
+        for message_id, timestamp in zip(range(first, first + count), _timestamps(count, now)):
+            cid, (a, b) = rng.choice(conversations)
+            sender, receiver = (a, b) if rng.random() < 0.5 else (b, a)
+            last[cid] = (message_id, timestamp)
+            yield {'id': message_id, 'conversation_id': cid, 'sender_id': sender, 'receiver_id': receiver,
+                   'content': rng.choice(bodies), 'timestamp': timestamp}
+
+    inserted = bulk_insert(Message.__table__, messages(), batch)
+    _sync_sequence(Message.__table__)
+    table = Conversation.__table__
+    updates = ({'_id': cid, '_last': message_id, '_at': timestamp} for cid, (message_id, timestamp) in last.items())
+    while True:
+        chunk = list(itertools.islice(updates, batch))
+        if not chunk:
+            break
+        db.session.execute(table.update().where(table.c.id == bindparam('_id'))
+                           .values(last_message_id=bindparam('_last'), updated_at=bindparam('_at')), chunk)
+        db.session.commit()
+    return inserted
+
+
+def seed(users=0, posts=0, jobs=0, messages=0, batch=5000, password='password123', rng_seed=42, log=print):
+    """Generate and insert the requested volumes. Needs an app context; returns the seeded user id range."""
+    from extensions import db, password_hasher
+    from models.user import User
+    rng = random.Random(rng_seed)
+    now = datetime.utcnow()
+    if db.engine.dialect.name == 'sqlite':
+        # Bulk load only: a crash mid-seed can lose the last batches, not corrupt committed data
+        db.session.execute(text('PRAGMA synchronous=OFF'))
+
+    def timed(label, fn, *args):
+        started = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - started
+        rows = result if isinstance(result, int) else (result[1] - result[0] + 1 if result else 0)
+        log(f'{label:<10} {rows:>10} rows in {elapsed:7.1f}s ({rows / elapsed if elapsed else 0:,.0f} rows/s)')
+        return result
+
+    user_ids = timed('users', seed_users, rng, users, batch, password_hasher.hash(password)) if users else None
+    if user_ids is None and (posts or jobs or messages):
+        # Attach content to the users that are already there
+        lo, hi = db.session.query(func.min(User.id), func.max(User.id)).one()
+        if lo is None:
+            raise SystemExit('No users to attach posts, jobs or messages to; pass --users.')
+        user_ids = (lo, hi)
+    if posts:
+        timed('posts', seed_posts, rng, posts, batch, user_ids, now)
+    if jobs:
+        timed('jobs', seed_jobs, rng, jobs, batch, user_ids, now)
+    if messages:
+        timed('messages', seed_messages, rng, messages, batch, user_ids, now)
+    return user_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', 1)[0])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--posts', type=int, default=10000)
+    parser.add_argument('--jobs', type=int, default=1000)
+    parser.add_argument('--messages', type=int, default=10000)
+    parser.add_argument('--batch', type=int, default=5000, help='rows per INSERT/COPY and per commit')
+    parser.add_argument('--password', default='password123', help='password of every seeded user')
+    parser.add_argument('--seed', type=int, default=42, help='random seed; same seed, same data')
+    args = parser.parse_args()
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        user_ids = seed(args.users, args.posts, args.jobs, args.messages, args.batch, args.password, args.seed)
+    if user_ids:
+        print(f'Seeded users are seed{user_ids[0]}..seed{user_ids[1]} with password {args.password!r}.')
+
+
+if __name__ == '__main__':
+    main()
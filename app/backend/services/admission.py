@@ -0,0 +1,88 @@
+import threading
+import time
+from flask import g, jsonify, request
+
+# Long-poll, SSE and streaming responses: open for as long as they are meant to be
+LONG_LIVED_ENDPOINTS = frozenset({'messaging.poll_messages', 'messaging.stream_messages', 'transfer.export_posts'})
+# Long-lived connections would pin admission slots; they have their own limits
+EXEMPT_ENDPOINTS = {'static', 'home', 'test', 'metrics', 'media_file', 'uploaded_file'} | LONG_LIVED_ENDPOINTS
+
+
+class AdmissionController:
+    """Per-worker concurrency cap that sheds load before it turns into queueing delay.
+
+    At most `max_concurrency` requests run at once. A request that cannot get
+    a slot within `max_queue_wait` seconds is answered 503 with Retry-After,
+    and so is one that already waited longer than that upstream (read from a
+    `X-Request-Start: t=<epoch>` header set by the proxy). Shedding early
+    keeps the latency of admitted requests bounded instead of letting every
+    request slow down together. max_concurrency=0 disables the controller.
+    """
+
+    def __init__(self, app=None):
+        self._slots = None
+        self._lock = threading.Lock()
+        self.max_concurrency = 0
+        self.max_queue_wait = 0.5
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = 0
+        self.wait_ewma = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_concurrency = app.config.get('ADMISSION_MAX_CONCURRENCY', 0)
+        self.max_queue_wait = app.config.get('ADMISSION_MAX_QUEUE_WAIT', 0.5)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency) if self.max_concurrency > 0 else None
+        app.before_request(self._admit)
+        app.teardown_request(self._release)
+        app.extensions['admission'] = self
+
+    def _upstream_wait(self):
+        header = request.headers.get('X-Request-Start', '')
+        try:
+            started = float(header[2:] if header.startswith('t=') else header)
+        except ValueError:
+            return 0.0
+        if started > 1e11:
+            # nginx sends milliseconds (or microseconds); normalise to seconds
+            started /= 1000.0 if started < 1e14 else 1000000.0
+        return max(0.0, time.time() - started)
+
+    def _reject(self):
+        with self._lock:
+            self.shed += 1
+        return jsonify({'error': 'Server is busy, please retry.'}), 503, {'Retry-After': '1'}
+
+    def _admit(self):
+        if self._slots is None or request.endpoint in EXEMPT_ENDPOINTS or request.method == 'OPTIONS':
+            return None
+        if self._upstream_wait() > self.max_queue_wait:
+            return self._reject()
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.max_queue_wait):
+            return self._reject()
+        waited = time.perf_counter() - start
+        g._admission_slot = True
+        with self._lock:
+            self.in_flight += 1
+            self.admitted += 1
+            self.wait_ewma += 0.1 * (waited - self.wait_ewma)
+        return None
+
+    def _release(self, exc=None):
+        if g.pop('_admission_slot', False):
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_concurrency': self.max_concurrency,
+                'in_flight': self.in_flight,
+                'admitted': self.admitted,
+                'shed': self.shed,
+                'queue_wait_ewma_ms': round(self.wait_ewma * 1000, 3),
+            }
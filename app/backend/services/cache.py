@@ -0,0 +1,302 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LocalChannel:
+    """Invalidation log for a single process (default, and for tests)."""
+
+    MAX_ROWS = 10000
+
+    def __init__(self):
+        self._seq = 0
+        # key -> seq of its last invalidation, in seq order; trimmed like the shared channels
+        self._log = OrderedDict()
+        self._lock = threading.Lock()
+
+    def publish(self, keys):
+        with self._lock:
+            for key in keys:
+                self._seq += 1
+                self._log.pop(key, None)
+                self._log[key] = self._seq
+            while len(self._log) > self.MAX_ROWS:
+                self._log.popitem(last=False)
+            return self._seq
+
+    def poll(self, since):
+        with self._lock:
+            rows = []
+            for key, seq in reversed(self._log.items()):
+                if seq <= since:
+                    break
+                rows.append((key, seq))
+            rows.reverse()
+            return rows
+
+
+class SQLiteChannel:
+    """Invalidation log in a SQLite file shared by every worker on the host."""
+
+    MAX_ROWS = 10000
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS cache_invalidations (seq INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def publish(self, keys):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for key in keys:
+                seq = conn.execute('INSERT INTO cache_invalidations (key) VALUES (?)', (key,)).lastrowid
+            conn.execute('DELETE FROM cache_invalidations WHERE seq <= ?', (seq - self.MAX_ROWS,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return seq
+
+    def poll(self, since):
+        rows = self._connect().execute('SELECT key, seq FROM cache_invalidations WHERE seq > ?', (since,)).fetchall()
+        return rows
+
+
+class RedisChannel:
+    """Invalidation log on any Redis-compatible client (incr/zadd/zrangebyscore)."""
+
+    SEQ_KEY = 'cache:invalidation:seq'
+    LOG_KEY = 'cache:invalidation:log'
+    MAX_ROWS = 10000
+
+    def __init__(self, client):
+        self.client = client
+
+    def publish(self, keys):
+        seq = 0
+        for key in keys:
+            seq = int(self.client.incr(self.SEQ_KEY))
+            self.client.zadd(self.LOG_KEY, {key: seq})
+        self.client.zremrangebyscore(self.LOG_KEY, '-inf', seq - self.MAX_ROWS)
+        return seq
+
+    def poll(self, since):
+        rows = self.client.zrangebyscore(self.LOG_KEY, since + 1, '+inf', withscores=True)
+        return [(key.decode() if isinstance(key, bytes) else key, int(seq)) for key, seq in rows]
+
+
+class FakeRedis:
+    """In-memory stand-in for the handful of Redis commands RedisChannel uses."""
+
+    def __init__(self):
+        self._values = {}
+        self._zsets = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name):
+        with self._lock:
+            self._values[name] = int(self._values.get(name, 0)) + 1
+            return self._values[name]
+
+    def zadd(self, name, mapping):
+        with self._lock:
+            self._zsets.setdefault(name, {}).update(mapping)
+            return len(mapping)
+
+    def zrangebyscore(self, name, min, max, withscores=False):
+        low = float(min)
+        high = float(max)
+        with self._lock:
+            items = sorted((score, member) for member, score in self._zsets.get(name, {}).items() if low <= score <= high)
+        if withscores:
+            return [(member, score) for score, member in items]
+        return [member for _, member in items]
+
+    def zremrangebyscore(self, name, min, max):
+        low = float(min)
+        high = float(max)
+        with self._lock:
+            zset = self._zsets.get(name, {})
+            doomed = [member for member, score in zset.items() if low <= score <= high]
+            for member in doomed:
+                del zset[member]
+            return len(doomed)
+
+
+class Cache:
+    """Per-worker TTL/LRU cache kept coherent across workers by an invalidation channel.
+
+    Values live in process memory; only invalidations are shared. Each key
+    carries a version (the channel sequence of its last invalidation), and a
+    value computed under an older version is never stored. Workers read the
+    channel at most every `poll_interval` seconds, which bounds staleness.
+    Versions are forgotten `version_ttl` seconds after this worker learned
+    them (or beyond `max_versions`); a forgotten key reads the highest
+    forgotten sequence, so versions never go backwards.
+    """
+
+    def __init__(self, app=None):
+        self._entries = OrderedDict()
+        # key -> (sequence, monotonic time this worker learned it), oldest first
+        self._versions = OrderedDict()
+        self._version_floor = 0
+        self._lock = threading.RLock()
+        self._last_seq = 0
+        self._last_poll = 0.0
+        self.channel = LocalChannel()
+        self.max_entries = 1024
+        self.default_ttl = 300
+        self.poll_interval = 0.5
+        self.version_ttl = 3600
+        self.max_versions = 100000
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, name='cache', max_entries=None):
+        # A second instance (own name, own cap) keeps a flood of one kind of entry from evicting the rest
+        self.max_entries = max_entries or app.config.get('CACHE_MAX_ENTRIES', 1024)
+        self.default_ttl = app.config.get('CACHE_DEFAULT_TTL', 300)
+        self.poll_interval = app.config.get('CACHE_POLL_INTERVAL', 0.5)
+        self.version_ttl = app.config.get('CACHE_VERSION_TTL', 3600)
+        self.max_versions = app.config.get('CACHE_MAX_VERSIONS', 100000)
+        self.channel = make_channel(app.config)
+        self.clear()
+        app.extensions[name] = self
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._version_floor = 0
+            self._last_seq = 0
+            self._last_poll = 0.0
+
+    def _sync(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._last_poll < self.poll_interval:
+            return
+        self._last_poll = now
+        for key, seq in self.channel.poll(self._last_seq):
+            self._learn(key, seq, now)
+            self._entries.pop(key, None)
+            self._last_seq = max(self._last_seq, seq)
+        self._prune_versions(now)
+
+    def _version(self, key):
+        entry = self._versions.get(key)
+        return entry[0] if entry is not None else self._version_floor
+
+    def _learn(self, key, seq, now):
+        if seq > self._version(key):
+            self._versions[key] = (seq, now)
+            self._versions.move_to_end(key)
+
+    def _prune_versions(self, now):
+        versions = self._versions
+        while versions:
+            key, (seq, learned) = next(iter(versions.items()))
+            if len(versions) <= self.max_versions and now - learned < self.version_ttl:
+                break
+            del versions[key]
+            self._version_floor = max(self._version_floor, seq)
+
+    def version(self, key):
+        with self._lock:
+            self._sync()
+            return self._version(key)
+
+    def invalidated_within(self, key, seconds):
+        """Whether this worker learned of an invalidation of `key` less than `seconds` ago."""
+        with self._lock:
+            self._sync()
+            entry = self._versions.get(key)
+            return entry is not None and time.monotonic() - entry[1] < seconds
+
+    def get(self, key, default=None):
+        with self._lock:
+            self._sync()
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, ttl=None, version=None):
+        with self._lock:
+            self._sync()
+            if version is not None and self._version(key) != version:
+                # Invalidated while the value was being computed
+                return False
+            expires = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def get_or_set(self, key, compute, ttl=None):
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        version = self.version(key)
+        value = compute()
+        self.set(key, value, ttl=ttl, version=version)
+        return value
+
+    def invalidate(self, *keys):
+        if not keys:
+            return
+        seq = self.channel.publish(keys)
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+            self._sync(force=True)
+            now = time.monotonic()
+            for key in keys:
+                self._learn(key, seq, now)
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+def make_channel(config):
+    backend = config.get('CACHE_BACKEND', 'local')
+    if backend == 'local':
+        return LocalChannel()
+    if backend == 'sqlite':
+        path = config.get('CACHE_SQLITE_PATH') or os.path.join(tempfile.gettempdir(), 'prok_cache.sqlite')
+        return SQLiteChannel(path)
+    if backend == 'redis':
+        client = config.get('CACHE_REDIS_CLIENT')
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError('CACHE_BACKEND=redis needs the redis package or CACHE_REDIS_CLIENT')
+            client = redis.Redis.from_url(config['CACHE_REDIS_URL'])
+        return RedisChannel(client)
+    if backend == 'fakeredis':
+        return RedisChannel(FakeRedis())
+    raise ValueError(f'Unknown CACHE_BACKEND: {backend}')
@@ -0,0 +1,113 @@
+import bisect
+import os
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+# Upper bounds (ms) of the checkout-wait histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolMetrics:
+    """Checkout-wait accounting for MeteredQueuePool, plus post-fork pool reset.
+
+    init_app() must run before db.init_app(): it installs MeteredQueuePool
+    as the engine's pool class (for databases that use a QueuePool) and
+    registers an after-fork hook that gives each Gunicorn worker a fresh
+    pool instead of the connections opened in the master.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._hook_registered = False
+        self.reset()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        uri = app.config.get('SQLALCHEMY_DATABASE_URI', '')
+        options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        url = make_url(uri)
+        # In-memory SQLite needs its single shared connection (Flask-SQLAlchemy picks StaticPool)
+        if not (url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')):
+            options.setdefault('poolclass', MeteredQueuePool)
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+        app.extensions['pool_metrics'] = self
+        if not self._hook_registered and hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=lambda: self._after_fork(app))
+            self._hook_registered = True
+
+    def _after_fork(self, app):
+        # Connections inherited from the parent belong to it; drop them without closing its sockets
+        from extensions import db
+        # A lock held by another parent thread at fork time would never be released here
+        self._lock = threading.Lock()
+        self.reset()
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def record(self, waited, timed_out=False):
+        ms = waited * 1000
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            self.buckets[bisect.bisect_left(WAIT_BUCKETS_MS, ms)] += 1
+
+    def stats(self, engines=()):
+        with self._lock:
+            data = {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_avg_ms': round(self.wait_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                'wait_max_ms': round(self.wait_max * 1000, 3),
+                # [upper bound ms, count] pairs, last bound 'inf'
+                'wait_buckets_ms': [[bound, count] for bound, count in zip(WAIT_BUCKETS_MS + ('inf',), self.buckets)],
+            }
+        pools = {}
+        for name, engine in engines:
+            pool = engine.pool
+            if isinstance(pool, QueuePool):
+                pools[name or 'default'] = {'size': pool.size(), 'checked_out': pool.checkedout(),
+                                            'overflow': pool.overflow(), 'idle': pool.checkedin()}
+        data['pools'] = pools
+        return data
+
+
+pool_metrics = PoolMetrics()
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited (including connect time for new connections)."""
+
+    _local = threading.local()
+
+    def _do_get(self):
+        # QueuePool._do_get retries by calling itself; only the outermost call is timed
+        if getattr(self._local, 'active', False):
+            return super()._do_get()
+        self._local.active = True
+        start = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        finally:
+            self._local.active = False
+        pool_metrics.record(time.perf_counter() - start)
+        return entry
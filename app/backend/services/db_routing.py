@@ -0,0 +1,107 @@
+import random
+import threading
+from collections import Counter
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Select
+from sqlalchemy.sql.dml import UpdateBase
+
+PRIMARY = 'primary'
+
+
+class RoutingSession(Session):
+    """Session that sends the SELECTs of replica-routed requests to a replica engine.
+
+    ReplicaRouter picks the replica for a request (g._db_read_bind). Anything
+    that is not a plain SELECT (flushes, DML, SELECT ... FOR UPDATE, text())
+    goes to the primary. Once a request writes, its remaining reads go there
+    too, so a request always sees its own changes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        # _db_wrote is only set while the router is active (replicas configured, inside a request)
+        if bind is None and has_request_context() and '_db_wrote' in g:
+            if self._flushing or isinstance(clause, UpdateBase) or getattr(clause, '_for_update_arg', None) is not None:
+                # A write: the rest of this request, and the client for a while, stay on the primary
+                g._db_wrote = True
+                g._db_read_bind = None
+            elif isinstance(clause, Select) and g.get('_db_read_bind') is not None:
+                router.count(g._db_read_bind)
+                return self._db.engines[g._db_read_bind]
+            router.count(PRIMARY)
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """Chooses primary or replica per request and keeps clients on the primary after they write.
+
+    Requests to `endpoints` (read-only handlers) read from a random replica
+    bind unless their client, the JWT user or else the IP, wrote within
+    `sticky_seconds`. Replication lag shorter than that window is invisible to
+    the writer. Writes are shared between workers through the cache's
+    invalidation channel: a writing request invalidates the client's sticky
+    key, and a worker pins the client for `sticky_seconds` from when it learned
+    of that (at most CACHE_POLL_INTERVAL late, so the window is never shorter
+    than configured). The cache forgets the key after CACHE_VERSION_TTL, so
+    nothing here grows with the number of clients. Without replica binds,
+    everything uses the primary.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self.replicas = []
+        self.endpoints = frozenset()
+        self.sticky_seconds = 5.0
+        self.routed = Counter()
+        self.pinned = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # Binds named replica0, replica1, ... (config.py derives them from DATABASE_REPLICA_URLS)
+        self.replicas = sorted(key for key in (app.config.get('SQLALCHEMY_BINDS') or {}) if key.startswith('replica'))
+        self.endpoints = frozenset(app.config.get('DB_REPLICA_ENDPOINTS', ()))
+        self.sticky_seconds = app.config.get('DB_REPLICA_STICKY_SECONDS', 5.0)
+        app.extensions['replica_router'] = self
+        if self.replicas:
+            app.before_request(self._route)
+            app.after_request(self._record_write)
+
+    def _client_key(self):
+        from services.rate_limit import user_or_ip_key
+        return f'db:sticky:{user_or_ip_key()}'
+
+    def _route(self):
+        g._db_wrote = False
+        if request.endpoint not in self.endpoints or request.method not in ('GET', 'HEAD'):
+            return None
+        from extensions import cache
+        if cache.invalidated_within(self._client_key(), self.sticky_seconds):
+            with self._lock:
+                self.pinned += 1
+            return None
+        g._db_read_bind = random.choice(self.replicas)
+        return None
+
+    def _record_write(self, response):
+        if g.get('_db_wrote'):
+            from extensions import cache
+            cache.invalidate(self._client_key())
+        return response
+
+    def count(self, bind):
+        with self._lock:
+            self.routed[bind] += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'replicas': self.replicas,
+                'sticky_seconds': self.sticky_seconds,
+                # Statements executed per bind, by requests the router has seen
+                'statements': dict(self.routed),
+                'pinned_requests': self.pinned,
+            }
+
+
+router = ReplicaRouter()
@@ -0,0 +1,130 @@
+import hashlib
+import os
+import tempfile
+import threading
+from flask import current_app, request, send_file, abort
+from werkzeug.security import safe_join
+from extensions import cache, upload_pool
+
+# Longest edge in pixels for each derivative
+SIZES = {'thumb': 160, 'medium': 640, 'full': 1600}
+FORMATS = {'webp': ('WEBP', 'image/webp'), 'jpg': ('JPEG', 'image/jpeg')}
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+ORIGINAL_MAX_AGE = 3600
+
+_pending_lock = threading.Lock()
+# Content hashes with a derivative job queued or running in this worker
+_pending = set()
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def derivative_path(sha256, size, fmt):
+    root = current_app.config['DERIVATIVES_FOLDER']
+    return os.path.join(root, sha256[:2], f'{sha256}_{size}.{fmt}')
+
+
+def failure_marker_path(sha256):
+    # Left by a read-triggered job that could not decode the image; content-addressed, so never retried
+    root = current_app.config['DERIVATIVES_FOLDER']
+    return os.path.join(root, sha256[:2], f'{sha256}.failed')
+
+
+def generate_derivatives(src_path, sha256):
+    """Write every size/format for one image; existing files are left alone (keyed by content)."""
+    from PIL import Image
+    with Image.open(src_path) as img:
+        img.load()
+        base = img.convert('RGB')
+    for size, edge in SIZES.items():
+        resized = None
+        for fmt, (pil_format, _) in FORMATS.items():
+            target = derivative_path(sha256, size, fmt)
+            if os.path.exists(target):
+                continue
+            if resized is None:
+                resized = base.copy()
+                resized.thumbnail((edge, edge))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix='.derivative-')
+            with os.fdopen(fd, 'wb') as out:
+                resized.save(out, pil_format, quality=82)
+            os.replace(tmp_path, target)
+
+
+def _generate_for_read(src_path, sha256):
+    try:
+        generate_derivatives(src_path, sha256)
+    except Exception:
+        marker = failure_marker_path(sha256)
+        os.makedirs(os.path.dirname(marker), exist_ok=True)
+        open(marker, 'w').close()
+        raise
+    finally:
+        with _pending_lock:
+            _pending.discard(sha256)
+
+
+def _queue_derivatives(path, sha256):
+    """Queue generation once per image per worker; never on the request thread, never for failed images."""
+    with _pending_lock:
+        if sha256 in _pending or os.path.exists(failure_marker_path(sha256)):
+            return
+        _pending.add(sha256)
+    if upload_pool.submit(_generate_for_read, path, sha256, inline=False) is None:
+        # Pool full: serve the original and let a later request queue it
+        with _pending_lock:
+            _pending.discard(sha256)
+
+
+def _content_hash(path):
+    # Hash once per file version per worker; the mtime in the key covers overwrites
+    stat = os.stat(path)
+    return cache.get_or_set(f'media:sha256:{path}:{stat.st_mtime_ns}:{stat.st_size}',
+                            lambda: file_sha256(path), ttl=24 * 3600)
+
+
+def send_media(directory, filename, sha256=None):
+    """Serve an upload, or its ?size=thumb|medium|full derivative, with validators.
+
+    Derivatives are addressed by content hash, so they get a strong ETag and
+    `Cache-Control: immutable`; a missing derivative is queued for generation
+    (at most once at a time, and not at all if the pool is full or the image
+    failed to decode before) and the original is served meanwhile. Passing
+    sha256 marks the file as content-addressed, so the original is immutable
+    too.
+    """
+    path = safe_join(directory, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    size = request.args.get('size')
+    is_image = filename.rsplit('.', 1)[-1].lower() in ('png', 'jpg', 'jpeg')
+    content_addressed = sha256 is not None
+    if sha256 is None:
+        sha256 = _content_hash(path)
+    if size in SIZES and is_image:
+        fmt = 'webp' if request.accept_mimetypes['image/webp'] else 'jpg'
+        target = derivative_path(sha256, size, fmt)
+        if os.path.exists(target):
+            response = send_file(target, mimetype=FORMATS[fmt][1], etag=f'{sha256}-{size}.{fmt}',
+                                 max_age=IMMUTABLE_MAX_AGE, conditional=True)
+            response.cache_control.public = True
+            response.cache_control.immutable = True
+            response.vary.add('Accept')
+            return response
+        _queue_derivatives(path, sha256)
+        response = send_file(path, etag=sha256, conditional=True)
+        response.cache_control.no_cache = True
+        return response
+    response = send_file(path, etag=sha256, max_age=IMMUTABLE_MAX_AGE if content_addressed else ORIGINAL_MAX_AGE,
+                         conditional=True)
+    response.cache_control.public = True
+    if content_addressed:
+        response.cache_control.immutable = True
+    return response
@@ -0,0 +1,128 @@
+import heapq
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from extensions import db, cache
+from models.follow import Follow
+from models.post import Post
+from models.timeline import Timeline
+from models.user import User
+
+
+def _timeline_size():
+    return current_app.config.get('FEED_TIMELINE_SIZE', 800)
+
+
+def _fanout_threshold():
+    return current_app.config.get('FEED_FANOUT_THRESHOLD', 1000)
+
+
+def _celebrity_cache_key(user_id):
+    return f'feed:celebrity:{user_id}'
+
+
+def fan_out(post):
+    """Push a new post onto its author's and (public posts) followers' timelines.
+
+    Authors above FEED_FANOUT_THRESHOLD followers are skipped here and merged in
+    at read time instead; their cached recent-id list is invalidated.
+    """
+    fan_out_many([post])
+
+
+def fan_out_many(posts):
+    """fan_out() for a batch of posts: one author, one follower and one timeline lookup for all of them."""
+    posts = sorted(posts, key=lambda post: post.id)
+    authors = {post.user_id for post in posts}
+    threshold = _fanout_threshold()
+    regular = set()
+    for author_id, follower_count in db.session.query(User.id, User.follower_count).filter(User.id.in_(authors)):
+        if follower_count > threshold:
+            cache.invalidate(_celebrity_cache_key(author_id))
+        else:
+            regular.add(author_id)
+    pushes = {author_id: [] for author_id in authors}
+    followers = {}
+    if regular:
+        for follower_id, followee_id in db.session.execute(
+                select(Follow.follower_id, Follow.followee_id).where(Follow.followee_id.in_(regular))):
+            followers.setdefault(followee_id, []).append(follower_id)
+    for post in posts:
+        pushes[post.user_id].append(post.id)
+        if post.public_post:
+            for follower_id in followers.get(post.user_id, ()):
+                pushes.setdefault(follower_id, []).append(post.id)
+    cap = _timeline_size()
+    # Existing timelines only; users without one rebuild on their next read
+    for timeline in Timeline.query.filter(Timeline.user_id.in_(pushes)).with_for_update().all():
+        for post_id in pushes[timeline.user_id][-cap:]:
+            timeline.push(post_id, cap)
+    db.session.commit()
+
+
+def retract(post):
+    """Take a post that stopped being public off its followers' timelines; the author's keeps it."""
+    cache.invalidate(_celebrity_cache_key(post.user_id))
+    followers = select(Follow.follower_id).where(Follow.followee_id == post.user_id)
+    for timeline in Timeline.query.filter(Timeline.user_id.in_(followers)).with_for_update().all():
+        timeline.discard(post.id)
+
+
+def drop_timeline(user_id):
+    # Follow graph changed: rebuild from the database on next read
+    Timeline.query.filter_by(user_id=user_id).delete()
+
+
+def _celebrity_post_ids(followee_id):
+    def recent():
+        rows = db.session.execute(
+            select(Post.id).where(Post.user_id == followee_id, Post.public_post.is_(True))
+            .order_by(Post.id.desc()).limit(_timeline_size())
+        )
+        return [row[0] for row in rows]
+    return cache.get_or_set(_celebrity_cache_key(followee_id), recent, ttl=60)
+
+
+def _build_timeline(user_id):
+    # Fan-out-on-read rebuild for cold or invalidated timelines
+    threshold = _fanout_threshold()
+    followees = select(Follow.followee_id).join(User, User.id == Follow.followee_id) \
+        .where(Follow.follower_id == user_id, User.follower_count <= threshold)
+    rows = db.session.execute(
+        select(Post.id)
+        .where((Post.user_id == user_id) | (Post.user_id.in_(followees) & Post.public_post.is_(True)))
+        .order_by(Post.id.desc()).limit(_timeline_size())
+    )
+    ids = [row[0] for row in rows]
+    timeline = Timeline(user_id=user_id, post_ids=Timeline.pack(ids))
+    try:
+        db.session.merge(timeline)
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent read built and stored the same timeline first
+        db.session.rollback()
+    return ids
+
+
+def feed_post_ids(user_id, before=None, limit=20):
+    """Newest-first post ids for a user's home feed, older than `before`."""
+    timeline = db.session.get(Timeline, user_id)
+    ids = timeline.ids() if timeline is not None else _build_timeline(user_id)
+    sources = [ids]
+    celebrities = db.session.execute(
+        select(Follow.followee_id).join(User, User.id == Follow.followee_id)
+        .where(Follow.follower_id == user_id, User.follower_count > _fanout_threshold())
+    ).all()
+    for (followee_id,) in celebrities:
+        sources.append(_celebrity_post_ids(followee_id))
+    merged = heapq.merge(*sources, reverse=True) if len(sources) > 1 else iter(ids)
+    page = []
+    for post_id in merged:
+        if before is not None and post_id >= before:
+            continue
+        if page and page[-1] == post_id:
+            continue
+        page.append(post_id)
+        if len(page) == limit:
+            break
+    return page
@@ -0,0 +1,123 @@
+import gzip
+import threading
+from datetime import datetime, timezone
+from functools import wraps
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional; without it only gzip is offered
+    brotli = None
+
+_seen_lock = threading.Lock()
+# cache key -> (version, when this worker first saw it)
+_seen = {}
+
+
+class ResponseCompression:
+    """Negotiated gzip/brotli for text responses at or above `min_size` bytes.
+
+    Applied in an after_request hook to 200 responses whose mimetype is in
+    `mimetypes`; streamed bodies (exports, media files) are left alone. Brotli
+    wins over gzip at equal Accept-Encoding quality when the brotli package is
+    installed. A strong ETag becomes weak, since the bytes no longer match the
+    identity encoding.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.min_size = 1024
+        self.gzip_level = 6
+        self.brotli_quality = 4
+        self.mimetypes = frozenset()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('COMPRESS_ENABLED', True)
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+        self.gzip_level = app.config.get('COMPRESS_GZIP_LEVEL', 6)
+        self.brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', 4)
+        self.mimetypes = frozenset(app.config.get('COMPRESS_MIMETYPES', ('application/json',)))
+        app.extensions['compression'] = self
+        if self.enabled:
+            app.after_request(self._compress)
+
+    def _encoding(self):
+        accepted = request.accept_encodings
+        br = accepted.quality('br') if brotli is not None else 0
+        gz = accepted.quality('gzip')
+        if br and br >= gz:
+            return 'br'
+        return 'gzip' if gz else None
+
+    def _compress(self, response):
+        if response.mimetype not in self.mimetypes:
+            return response
+        # Another request for the same URL may get a different encoding
+        response.vary.add('Accept-Encoding')
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers):
+            return response
+        data = response.get_data()
+        encoding = self._encoding() if len(data) >= self.min_size else None
+        if encoding is None:
+            return response
+        if encoding == 'br':
+            response.set_data(brotli.compress(data, quality=self.brotli_quality))
+        else:
+            response.set_data(gzip.compress(data, compresslevel=self.gzip_level, mtime=0))
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+def version_time(key, version):
+    """When this worker first saw `version` of cache key `key`, as an upper bound on its modification time.
+
+    Workers see a new version up to CACHE_POLL_INTERVAL apart, so their times
+    for it differ by about that much; a restarted worker reports its start.
+    Both only err towards "modified later", which costs a 200, never a
+    wrong 304.
+    """
+    with _seen_lock:
+        seen = _seen.get(key)
+        if seen is None or seen[0] != version:
+            seen = _seen[key] = (version, datetime.now(timezone.utc).replace(microsecond=0))
+        return seen[1]
+
+
+def _not_modified(etag, last_modified):
+    # If-None-Match takes precedence; If-Modified-Since only counts without it (RFC 9110 13.2.2)
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    since = request.if_modified_since
+    return since is not None and last_modified is not None and last_modified <= since
+
+
+def conditional(validators, cache_control='no-cache'):
+    """Answer GET/HEAD revalidations with 304 before the view runs.
+
+    `validators()` returns (weak etag value, last modified datetime or None)
+    and must be far cheaper than the view. Full responses carry both
+    validators and `cache_control` (no-cache: clients store the response but
+    revalidate every use).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag, last_modified = validators()
+            if request.method in ('GET', 'HEAD') and _not_modified(etag, last_modified):
+                response = current_app.response_class(status=304, mimetype='application/json')
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            response.last_modified = last_modified
+            response.headers['Cache-Control'] = cache_control
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,99 @@
+import threading
+from collections import namedtuple
+from flask import g
+from flask_jwt_extended import get_jwt, get_jwt_identity
+
+# What most handlers need to know about a user; small enough to embed in the access token
+Identity = namedtuple('Identity', ['id', 'username', 'avatar'])
+
+
+def identity_claims(user):
+    """Extra JWT claims for create_access_token(); read back by IdentityCache.current()."""
+    return {'username': user.username, 'avatar': user.avatar}
+
+
+def identity_cache_key(user_id):
+    return f'identity:{int(user_id)}'
+
+
+class IdentityCache:
+    """User identity lookups memoized per request (on flask.g) and per process (in the shared cache).
+
+    Process entries live `ttl` seconds and are dropped on every worker by
+    invalidate(), which profile writes call after committing. current()
+    answers from the token's claims when they are present, so read-only
+    handlers never touch the database for the caller's own identity.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self.ttl = 30
+        self.counts = {'claims': 0, 'request': 0, 'process': 0, 'miss': 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('IDENTITY_CACHE_TTL', 30)
+        app.extensions['identity_cache'] = self
+
+    def _count(self, source, n=1):
+        with self._lock:
+            self.counts[source] += n
+
+    def _memo(self):
+        memo = g.get('_identities')
+        if memo is None:
+            memo = g._identities = {}
+        return memo
+
+    def current(self, fresh=False):
+        """Identity of the JWT's subject; token claims unless `fresh`, which goes through get()."""
+        if not fresh:
+            claims = get_jwt()
+            if 'username' in claims:
+                self._count('claims')
+                return Identity(int(get_jwt_identity()), claims['username'], claims.get('avatar'))
+        return self.get(get_jwt_identity())
+
+    def get(self, user_id):
+        """Identity for one user id, or None if the user does not exist."""
+        return self.get_many([user_id]).get(int(user_id))
+
+    def get_many(self, user_ids):
+        from extensions import cache
+        from models.user import User
+        memo = self._memo()
+        found = {}
+        missing = []
+        for user_id in {int(u) for u in user_ids}:
+            if user_id in memo:
+                self._count('request')
+                found[user_id] = memo[user_id]
+                continue
+            identity = cache.get(identity_cache_key(user_id))
+            if identity is not None:
+                self._count('process')
+                found[user_id] = memo[user_id] = identity
+            else:
+                missing.append(user_id)
+        if missing:
+            self._count('miss', len(missing))
+            versions = {user_id: cache.version(identity_cache_key(user_id)) for user_id in missing}
+            rows = User.query.with_entities(User.id, User.username, User.avatar).filter(User.id.in_(missing)).all()
+            for row in rows:
+                identity = Identity(row.id, row.username, row.avatar)
+                cache.set(identity_cache_key(row.id), identity, ttl=self.ttl, version=versions[row.id])
+                found[row.id] = memo[row.id] = identity
+        return found
+
+    def invalidate(self, user_id):
+        from extensions import cache
+        g.get('_identities', {}).pop(int(user_id), None)
+        cache.invalidate(identity_cache_key(user_id))
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self.counts)
+        total = sum(counts.values())
+        counts['hit_rate'] = round((total - counts['miss']) / total, 4) if total else None
+        return counts
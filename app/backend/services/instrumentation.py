@@ -0,0 +1,234 @@
+import bisect
+import cProfile
+import hmac
+import io
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from functools import wraps
+from flask import abort, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from services.admission import LONG_LIVED_ENDPOINTS
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROFILE_LINES = 25
+
+
+class _Series:
+    __slots__ = ('buckets', 'total', 'count', 'queries', 'query_time')
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.queries = 0
+        self.query_time = 0.0
+
+
+class RequestMetrics:
+    """Per-endpoint latency histograms and SQL counts, with slow-request sampling.
+
+    Every request is timed from the first before_request hook to teardown,
+    so time spent waiting for an admission slot is included. SQLAlchemy
+    cursor events add each query's count and time to the current request
+    (queries outside a request, e.g. counter flushes, only reach the process
+    totals). Requests slower than `slow_threshold` are logged and kept in a
+    small ring buffer; a `profile_rate` fraction of requests runs under
+    cProfile (one at a time per worker) so that slow ones come with a profile.
+    Long-poll and streaming endpoints are slow by design and skip both.
+    Figures are per worker process, like the other /metrics endpoints.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._profiling = threading.Lock()
+        self._listening = False
+        self.enabled = False
+        self.slow_threshold = 0.5
+        self.profile_rate = 0.0
+        self.max_slow = 20
+        self.reset()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('METRICS_ENABLED', True)
+        self.slow_threshold = app.config.get('METRICS_SLOW_REQUEST_MS', 500) / 1000.0
+        self.profile_rate = app.config.get('METRICS_PROFILE_SAMPLE_RATE', 0.0)
+        self.max_slow = app.config.get('METRICS_SLOW_SAMPLES', 20)
+        self.slow = deque(self.slow, maxlen=self.max_slow)
+        self.logger = app.logger
+        app.extensions['request_metrics'] = self
+        if not self.enabled:
+            return
+        # Registered before the limiter and admission hooks so their time is counted too
+        app.before_request(self._start)
+        app.after_request(self._status)
+        app.teardown_request(self._finish)
+        if not self._listening:
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor)
+            event.listen(Engine, 'handle_error', self._query_failed)
+            self._listening = True
+
+    def reset(self):
+        with self._lock:
+            self.series = {}
+            self.statuses = {}
+            self.slow = deque(maxlen=self.max_slow)
+            self.slow_count = 0
+            self.queries = 0
+            self.query_time = 0.0
+
+    def _before_cursor(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_query_start', []).append(time.perf_counter())
+
+    def _after_cursor(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['_query_start'].pop()
+        with self._lock:
+            self.queries += 1
+            self.query_time += elapsed
+        state = g.get('_metrics') if has_request_context() else None
+        if state is not None:
+            state[1] += 1
+            state[2] += elapsed
+
+    def _query_failed(self, context):
+        # after_cursor_execute does not fire for a failed statement
+        starts = context.connection.info.get('_query_start') if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+    def _start(self):
+        # [start, queries, query seconds, status]
+        g._metrics = [time.perf_counter(), 0, 0.0, None]
+        # A long poll would hold the one profiling slot for its whole wait
+        if (self.profile_rate and request.endpoint not in LONG_LIVED_ENDPOINTS
+                and random.random() < self.profile_rate and self._profiling.acquire(blocking=False)):
+            profiler = cProfile.Profile()
+            g._profiler = profiler
+            profiler.enable()
+
+    def _status(self, response):
+        state = g.get('_metrics')
+        if state is not None:
+            state[3] = response.status_code
+        return response
+
+    def _finish(self, exc=None):
+        state = g.pop('_metrics', None)
+        if state is None:
+            return
+        elapsed = time.perf_counter() - state[0]
+        profiler = g.pop('_profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            self._profiling.release()
+        endpoint = request.endpoint or 'unmatched'
+        status = state[3] or 500
+        with self._lock:
+            series = self.series.get((endpoint, request.method))
+            if series is None:
+                series = self.series[(endpoint, request.method)] = _Series()
+            series.buckets[bisect.bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+            series.total += elapsed
+            series.count += 1
+            series.queries += state[1]
+            series.query_time += state[2]
+            key = (endpoint, request.method, status)
+            self.statuses[key] = self.statuses.get(key, 0) + 1
+        if elapsed >= self.slow_threshold and endpoint not in LONG_LIVED_ENDPOINTS:
+            self._record_slow(endpoint, status, elapsed, state, profiler)
+
+    def _record_slow(self, endpoint, status, elapsed, state, profiler):
+        sample = {
+            'endpoint': endpoint,
+            'method': request.method,
+            'path': request.path,
+            'status': status,
+            'duration_ms': round(elapsed * 1000, 1),
+            'queries': state[1],
+            'query_ms': round(state[2] * 1000, 1),
+            'at': time.time(),
+        }
+        if profiler is not None:
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(PROFILE_LINES)
+            sample['profile'] = out.getvalue()
+        with self._lock:
+            self.slow_count += 1
+            self.slow.append(sample)
+        self.logger.warning('Slow request %s %s %s: %.0fms, %d queries (%.0fms SQL)',
+                            request.method, request.path, status, elapsed * 1000, state[1], state[2] * 1000)
+
+    def slow_samples(self):
+        with self._lock:
+            return list(self.slow)
+
+    def exposition(self, extra=()):
+        """Prometheus text format for the request metrics, followed by the `extra` families.
+
+        Each family is (name, type, help, samples) with samples as (labels, value) pairs.
+        """
+        with self._lock:
+            durations, queries, query_time = [], [], []
+            for (endpoint, method), series in sorted(self.series.items()):
+                labels = {'endpoint': endpoint, 'method': method}
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), series.buckets):
+                    cumulative += count
+                    durations.append(('_bucket', dict(labels, le=str(bound)), cumulative))
+                durations.append(('_sum', labels, series.total))
+                durations.append(('_count', labels, series.count))
+                queries.append(('', labels, series.queries))
+                query_time.append(('', labels, series.query_time))
+            statuses = [('', {'endpoint': e, 'method': m, 'status': str(s)}, n)
+                        for (e, m, s), n in sorted(self.statuses.items())]
+            families = [
+                ('http_request_duration_seconds', 'histogram', 'Request latency by endpoint.', durations),
+                ('http_requests_total', 'counter', 'Requests by endpoint and status.', statuses),
+                ('http_request_db_queries_total', 'counter', 'SQL statements run by requests, by endpoint.', queries),
+                ('http_request_db_seconds_total', 'counter', 'Time spent in SQL by requests, by endpoint.', query_time),
+                ('http_slow_requests_total', 'counter', 'Requests slower than the slow-request threshold.',
+                 [('', {}, self.slow_count)]),
+                ('db_queries_total', 'counter', 'SQL statements run by this worker.', [('', {}, self.queries)]),
+                ('db_query_seconds_total', 'counter', 'Time spent in SQL by this worker.', [('', {}, self.query_time)]),
+            ]
+        lines = []
+        families += [(name, kind, help_text, [('', labels, value) for labels, value in samples])
+                     for name, kind, help_text, samples in extra]
+        for name, kind, help_text, samples in families:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for suffix, labels, value in samples:
+                lines.append(f'{name}{suffix}{_labels(labels)} {_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def metrics_auth(view):
+    """Serve `view` only to requests bearing METRICS_TOKEN; without a configured token it does not exist (404)."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = current_app.config.get('METRICS_TOKEN')
+        supplied = request.headers.get('Authorization', '')
+        if not token or not hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+            abort(404)
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for v in labels.values())
+    return '{' + ','.join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + '}'
+
+
+def _value(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(int(value))
@@ -0,0 +1,150 @@
+import bisect
+import heapq
+import threading
+from collections import Counter, defaultdict
+from flask import current_app
+from sqlalchemy import select
+from extensions import db
+from models.job import Job
+from services.search import tokenize
+
+FACETS = ('location', 'company')
+
+
+class JobIndex:
+    """In-process facet and title index over the job table.
+
+    Facet postings (value -> job ids) and title terms are updated as jobs are
+    inserted; other workers' inserts are picked up incrementally by id. Facet
+    counts are read off these postings instead of running GROUP BY per request.
+    """
+    MAX_PREFIX_TERMS = 32
+    SORT_THRESHOLD = 5000
+    FACET_MEMO_SIZE = 256
+
+    def __init__(self):
+        self._terms = defaultdict(set)
+        self._term_list = []
+        self._facets = {facet: defaultdict(set) for facet in FACETS}
+        self._docs = {}
+        self._order = []
+        self._last_id = 0
+        self._unions = {}
+        self._facet_memo = {}
+        self._lock = threading.RLock()
+
+    def add(self, job_id, title, company, location, posted_at):
+        with self._lock:
+            if job_id in self._docs:
+                return
+            self._docs[job_id] = (location, company, posted_at)
+            self._unions.clear()
+            self._facet_memo.clear()
+            self._facets['location'][location].add(job_id)
+            self._facets['company'][company].add(job_id)
+            for term in set(tokenize(title)) | set(tokenize(company)):
+                postings = self._terms[term]
+                if not postings:
+                    bisect.insort(self._term_list, term)
+                postings.add(job_id)
+            bisect.insort(self._order, (posted_at, job_id))
+            self._last_id = max(self._last_id, job_id)
+
+    def catch_up(self):
+        with self._lock:
+            rows = db.session.execute(
+                select(Job.id, Job.title, Job.company, Job.location, Job.posted_at)
+                .where(Job.id > self._last_id).order_by(Job.id)
+            ).all()
+            for row in rows:
+                self.add(*row)
+
+    def _term_matches(self, term):
+        start = bisect.bisect_left(self._term_list, term)
+        end = bisect.bisect_left(self._term_list, term + '\uffff')
+        matches = self._term_list[start:end]
+        if len(matches) > self.MAX_PREFIX_TERMS:
+            matches = heapq.nlargest(self.MAX_PREFIX_TERMS, matches, key=lambda t: (t == term, len(self._terms[t])))
+        return matches
+
+    def _term_union(self, term):
+        # Prefix expansions are memoized until the next insert
+        union = self._unions.get(term)
+        if union is None:
+            union = set()
+            for match in self._term_matches(term):
+                union |= self._terms[match]
+            self._unions[term] = union
+        return union
+
+    def candidates(self, text=None, filters=None, exclude=None):
+        """Ids matching the text and facet filters; None means every job."""
+        facet_sets = [self._facets[facet].get(value, set())
+                      for facet, value in (filters or {}).items() if value and facet != exclude]
+        term_groups = [[self._terms[m] for m in self._term_matches(term)] for term in tokenize(text or '')]
+        if facet_sets:
+            # Start from the narrowest facet and test term membership instead of building term unions
+            facet_sets.sort(key=len)
+            result = set(facet_sets[0])
+            for other in facet_sets[1:]:
+                result &= other
+            for group in term_groups:
+                result = {job_id for job_id in result if any(job_id in postings for postings in group)}
+            return result
+        if not term_groups:
+            return None
+        unions = [self._term_union(term) for term in tokenize(text or '')]
+        unions.sort(key=len)
+        result = set(unions[0])
+        for other in unions[1:]:
+            result &= other
+        return result
+
+    def facet_counts(self, text=None, filters=None, limit=20):
+        # Disjunctive facets: each facet's counts ignore its own filter
+        with self._lock:
+            facets = {}
+            for position, facet in enumerate(FACETS):
+                # Counts depend only on the other facets' filters; memoized until the next insert
+                key = (facet, tuple(tokenize(text or '')),
+                       tuple(sorted((f, v) for f, v in (filters or {}).items() if v and f != facet)))
+                counts = self._facet_memo.get(key)
+                if counts is None:
+                    ids = self.candidates(text, filters, exclude=facet)
+                    if ids is None:
+                        counts = {value: len(ids) for value, ids in self._facets[facet].items() if ids}
+                    else:
+                        counts = Counter(self._docs[job_id][position] for job_id in ids)
+                    if len(self._facet_memo) >= self.FACET_MEMO_SIZE:
+                        self._facet_memo.pop(next(iter(self._facet_memo)))
+                    self._facet_memo[key] = counts
+                top = heapq.nlargest(limit, counts.items(), key=lambda item: (item[1], item[0] or ''))
+                facets[facet] = [{'value': value, 'count': count} for value, count in top if value]
+            return facets
+
+    def page(self, ids, after=None, per_page=20):
+        """Newest-first (posted_at, id) keys from `ids`, strictly after the `after` key."""
+        with self._lock:
+            if len(ids) <= self.SORT_THRESHOLD:
+                keys = ((self._docs[job_id][2], job_id) for job_id in ids)
+                if after is not None:
+                    keys = (key for key in keys if key < after)
+                return heapq.nlargest(per_page + 1, keys)
+            # Broad match: walk the global order from the cursor and keep members
+            end = bisect.bisect_left(self._order, after) if after is not None else len(self._order)
+            keys = []
+            for index in range(end - 1, -1, -1):
+                key = self._order[index]
+                if key[1] in ids:
+                    keys.append(key)
+                    if len(keys) > per_page:
+                        break
+            return keys
+
+
+def get_job_index():
+    index = current_app.extensions.get('job_index')
+    if index is None:
+        index = current_app.extensions['job_index'] = JobIndex()
+    index.catch_up()
+    return index
@@ -0,0 +1,152 @@
+import os
+import re
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models.media import MediaBlob
+from services.uploads import stream_to_temp, publish, discard
+
+MEDIA_URL_PREFIX = '/media/'
+_MEDIA_NAME_RE = re.compile(r'^([0-9a-f]{64})\.([a-z0-9]+)$')
+
+
+class MediaStore:
+    """Storage interface for uploaded media shared by posts and profile images.
+
+    put() returns (blob, unverified) and takes one reference on the blob
+    inside the caller's transaction; release() drops one. Unreferenced blobs
+    are removed by gc(). `unverified` stays true until mark_verified(): new
+    files, and files whose check failed (reject() deletes them) or never ran.
+    """
+
+    def put(self, stream, allowed, max_bytes):
+        raise NotImplementedError
+
+    def mark_verified(self, sha256):
+        raise NotImplementedError
+
+    def reject(self, sha256):
+        raise NotImplementedError
+
+    def path(self, filename):
+        raise NotImplementedError
+
+    def release(self, sha256):
+        raise NotImplementedError
+
+    def gc(self, grace_seconds=3600):
+        raise NotImplementedError
+
+    @staticmethod
+    def url(blob):
+        return f'{MEDIA_URL_PREFIX}{blob.filename}'
+
+    @staticmethod
+    def parse_url(url):
+        # (sha256, ext) for store URLs, None for legacy /uploads/... paths
+        if not url or not url.startswith(MEDIA_URL_PREFIX):
+            return None
+        match = _MEDIA_NAME_RE.match(url[len(MEDIA_URL_PREFIX):])
+        return match.groups() if match else None
+
+    def release_url(self, url):
+        parsed = self.parse_url(url)
+        if parsed:
+            self.release(parsed[0])
+
+
+class LocalContentStore(MediaStore):
+    """Files live at <root>/<sha[:2]>/<sha[2:4]>/<sha>.<ext>; identical uploads share one file."""
+
+    def __init__(self, root):
+        self.root = root
+        self.tmp_dir = os.path.join(root, 'tmp')
+
+    def path(self, filename):
+        match = _MEDIA_NAME_RE.match(filename)
+        if not match:
+            return None
+        sha256 = match.group(1)
+        return os.path.join(self.root, sha256[:2], sha256[2:4], filename)
+
+    def put(self, stream, allowed, max_bytes):
+        stored = stream_to_temp(stream, self.tmp_dir, allowed, max_bytes)
+        blob = db.session.get(MediaBlob, stored.sha256)
+        final_path = self.path(f'{stored.sha256}.{stored.kind}')
+        if blob is None or not os.path.exists(final_path):
+            publish(stored, final_path)
+        else:
+            # Duplicate: drop the temp copy before it is ever fsynced
+            discard(stored)
+        if blob is None:
+            try:
+                with db.session.begin_nested():
+                    blob = MediaBlob(sha256=stored.sha256, ext=stored.kind, size=stored.size, ref_count=1)
+                    db.session.add(blob)
+                return blob, True
+            except IntegrityError:
+                # A concurrent upload of the same bytes inserted the row first
+                blob = db.session.get(MediaBlob, stored.sha256)
+        unverified = not blob.verified
+        blob.ref_count = MediaBlob.ref_count + 1
+        return blob, unverified
+
+    def mark_verified(self, sha256):
+        MediaBlob.query.filter_by(sha256=sha256).update({MediaBlob.verified: True}, synchronize_session=False)
+
+    def reject(self, sha256):
+        # The row keeps its references; the bytes are never served again, and a re-upload republishes
+        # and re-verifies them
+        blob = db.session.get(MediaBlob, sha256)
+        if blob is None:
+            return
+        blob.verified = False
+        path = self.path(blob.filename)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def release(self, sha256):
+        MediaBlob.query.filter_by(sha256=sha256).update(
+            {MediaBlob.ref_count: MediaBlob.ref_count - 1, MediaBlob.updated_at: datetime.utcnow()},
+            synchronize_session=False)
+
+    def gc(self, grace_seconds=3600):
+        """Delete unreferenced blobs and stray files older than the grace period."""
+        cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+        removed = 0
+        for blob in MediaBlob.query.filter(MediaBlob.ref_count <= 0, MediaBlob.updated_at < cutoff).all():
+            path = self.path(blob.filename)
+            if path and os.path.exists(path):
+                os.remove(path)
+            db.session.delete(blob)
+            removed += 1
+        db.session.commit()
+        # Files with no row (crash between publish and commit) and abandoned temp files
+        known = None
+        cutoff_ts = time.time() - grace_seconds
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                if os.path.getmtime(path) >= cutoff_ts:
+                    continue
+                match = _MEDIA_NAME_RE.match(name)
+                if match:
+                    if known is None:
+                        known = {sha for (sha,) in db.session.query(MediaBlob.sha256)}
+                    if match.group(1) in known:
+                        continue
+                elif dirpath != self.tmp_dir:
+                    continue
+                os.remove(path)
+                removed += 1
+        return removed
+
+
+def get_media_store():
+    store = current_app.extensions.get('media_store')
+    if store is None:
+        store = LocalContentStore(current_app.config['MEDIA_STORE_FOLDER'])
+        current_app.extensions['media_store'] = store
+    return store
@@ -0,0 +1,69 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class HasherBusy(RuntimeError):
+    """Every hashing slot is taken; the caller should answer 503 and let the client retry."""
+
+
+class PasswordHasher:
+    """Password hashing on a small, bounded thread pool.
+
+    hashlib's scrypt/pbkdf2 release the GIL, so `max_workers` caps how many
+    cores a worker spends on hashing no matter how many requests arrive.
+    At most `max_workers + max_pending` hashes may be in flight; past that
+    hash()/verify() raise HasherBusy instead of queueing without bound.
+    With max_workers=0 hashing runs inline on the request thread.
+    """
+
+    def __init__(self, app=None):
+        self._executor = None
+        self._slots = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._method_prefix = None
+        self.method = 'scrypt:32768:8:1'
+        self.max_workers = 2
+        self.max_pending = 16
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+        self.max_workers = app.config.get('PASSWORD_HASH_WORKERS', 2)
+        self.max_pending = app.config.get('PASSWORD_HASH_MAX_PENDING', 16)
+        self._method_prefix = None
+        app.extensions['password_hasher'] = self
+
+    def _ensure_executor(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='hash')
+                self._slots = threading.BoundedSemaphore(self.max_workers + self.max_pending)
+
+    def _call(self, fn, *args):
+        if self.max_workers <= 0:
+            return fn(*args)
+        self._ensure_executor()
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy('Password hashing is saturated.')
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._call(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._call(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True when the stored hash was made with other parameters than the configured method."""
+        if self._method_prefix is None:
+            # Werkzeug fills in defaults ("pbkdf2" -> "pbkdf2:sha256:<iterations>"), so compare canonical forms
+            self._method_prefix = generate_password_hash('', self.method).split('$', 1)[0]
+        return password_hash.split('$', 1)[0] != self._method_prefix
@@ -0,0 +1,87 @@
+from collections import Counter
+from sqlalchemy import bindparam
+from sqlalchemy.exc import IntegrityError
+from extensions import db, cache
+from models.category import Category
+from models.post import Post
+from models.tag import Tag
+
+POPULAR_TAGS_LIMIT = 20
+
+# Bumped by post writes and counter flushes; its version is in the post list ETag, its value the newest post
+POSTS_CACHE_KEY = 'posts:list'
+CATEGORIES_CACHE_KEY = 'posts:categories'
+TAGS_CACHE_KEY = 'posts:popular-tags'
+
+
+def invalidate_post_caches():
+    # Reaches every worker through the cache's invalidation channel
+    cache.invalidate(POSTS_CACHE_KEY, CATEGORIES_CACHE_KEY, TAGS_CACHE_KEY)
+
+
+def _bump_category(name, delta):
+    updated = Category.query.filter_by(name=name).update(
+        {Category.post_count: Category.post_count + delta}, synchronize_session=False)
+    if updated or delta < 0:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.add(Category(name=name, post_count=delta))
+    except IntegrityError:
+        # Another writer created the row first
+        Category.query.filter_by(name=name).update(
+            {Category.post_count: Category.post_count + delta}, synchronize_session=False)
+
+
+def record_post_change(old_tags=(), old_category=None, new_tags=(), new_category=None):
+    """Apply the counter delta for a post going from (old tags, category) to (new ...).
+
+    Tags are Tag rows (flushed, so they have ids). Runs inside the caller's
+    transaction as atomic `count = count + n` updates; nothing is recomputed.
+    """
+    delta = Counter(tag.id for tag in new_tags)
+    delta.subtract(tag.id for tag in old_tags)
+    for tag_id, change in delta.items():
+        if change:
+            Tag.query.filter_by(id=tag_id).update(
+                {Tag.post_count: Tag.post_count + change}, synchronize_session=False)
+    if old_category != new_category:
+        if old_category:
+            _bump_category(old_category, -1)
+        if new_category:
+            _bump_category(new_category, 1)
+
+
+def record_posts_added(tag_ids, categories):
+    """Counter delta for a batch of new posts, given every post's tag ids and categories.
+
+    One executemany for the tags and one update per distinct category.
+    """
+    tags = Counter(tag_ids)
+    categories = Counter(name for name in categories if name)
+    if tags:
+        table = Tag.__table__
+        db.session.execute(table.update().where(table.c.id == bindparam('_id'))
+                           .values(post_count=table.c.post_count + bindparam('_delta')),
+                           [{'_id': tag_id, '_delta': count} for tag_id, count in tags.items()])
+    for name, count in categories.items():
+        _bump_category(name, count)
+
+
+def popular_tags(limit=POPULAR_TAGS_LIMIT):
+    # Top-k read off the post_count index
+    rows = db.session.query(Tag.name).filter(Tag.post_count > 0) \
+        .order_by(Tag.post_count.desc(), Tag.name).limit(limit).all()
+    return [name for (name,) in rows]
+
+
+def newest_post():
+    """(max id, max created_at) of all posts, each read off an index end; (None, None) when there are none."""
+    # Two scalar subqueries: SQLite only uses its min/max index shortcut for a lone aggregate
+    return db.session.execute(db.select(db.select(db.func.max(Post.id)).scalar_subquery(),
+                                        db.select(db.func.max(Post.created_at)).scalar_subquery())).one()
+
+
+def categories():
+    rows = db.session.query(Category.name).filter(Category.post_count > 0).order_by(Category.name).all()
+    return [name for (name,) in rows]
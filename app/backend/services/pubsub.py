@@ -0,0 +1,70 @@
+import threading
+from collections import defaultdict, deque
+
+
+class Subscription:
+    def __init__(self, bus, channel, maxlen=100):
+        self.bus = bus
+        self.channel = channel
+        self._events = deque(maxlen=maxlen)
+        self._cond = threading.Condition()
+
+    def put(self, event):
+        with self._cond:
+            self._events.append(event)
+            self._cond.notify()
+
+    def get(self, timeout):
+        """Block until at least one event arrives or timeout; return all pending events."""
+        with self._cond:
+            if not self._events:
+                self._cond.wait(timeout)
+            events = list(self._events)
+            self._events.clear()
+            return events
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MessageBus:
+    """In-process pub/sub that wakes long-poll and SSE waiters in this worker.
+
+    Subscribers in other workers are not notified; they fall back to a
+    periodic database check (MESSAGING_POLL_SLICE).
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(event)
+        return len(subscribers)
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subs) for subs in self._subscribers.values())
@@ -0,0 +1,120 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from flask import request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from limits.storage import Storage
+
+
+class SQLiteStorage(Storage):
+    """Fixed-window counters in a SQLite file, shared by every worker on the host.
+
+    Registered for ``sqlite:///path`` storage URIs (``sqlite://`` alone uses a
+    file in the temp directory). Supports the fixed-window strategies only.
+    """
+
+    STORAGE_SCHEME = ['sqlite']
+    PURGE_EVERY = 1000
+
+    def __init__(self, uri=None, wrap_exceptions=False, **options):
+        # Same convention as SQLAlchemy: sqlite:///relative.db, sqlite:////absolute.db
+        path = uri[len('sqlite:///'):] if uri and uri.startswith('sqlite:///') else ''
+        self.path = path or os.path.join(tempfile.gettempdir(), 'prok_ratelimit.sqlite')
+        self._local = threading.local()
+        self._writes = 0
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self._connect().execute(
+            'CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires REAL NOT NULL)')
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def incr(self, key, expiry, amount=1):
+        now = time.time()
+        # A single statement: an expired window restarts at `amount`, a live one is incremented
+        row = self._connect().execute(
+            'INSERT INTO rate_limits (key, value, expires) VALUES (?, ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET '
+            'value = CASE WHEN expires <= ? THEN excluded.value ELSE value + excluded.value END, '
+            'expires = CASE WHEN expires <= ? THEN excluded.expires ELSE expires END '
+            'RETURNING value',
+            (key, amount, now + expiry, now, now),
+        ).fetchone()
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            self.purge_expired()
+        return row[0]
+
+    def get(self, key):
+        row = self._connect().execute(
+            'SELECT value FROM rate_limits WHERE key = ? AND expires > ?', (key, time.time())).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        row = self._connect().execute(
+            'SELECT expires FROM rate_limits WHERE key = ? AND expires > ?', (key, time.time())).fetchone()
+        return row[0] if row else time.time()
+
+    def check(self):
+        try:
+            self._connect().execute('SELECT 1')
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        return self._connect().execute('DELETE FROM rate_limits').rowcount
+
+    def clear(self, key):
+        self._connect().execute('DELETE FROM rate_limits WHERE key = ?', (key,))
+
+    def purge_expired(self):
+        return self._connect().execute('DELETE FROM rate_limits WHERE expires <= ?', (time.time(),)).rowcount
+
+
+def client_ip():
+    # ProxyFix (or the server) is responsible for making remote_addr the real client
+    return request.remote_addr or 'unknown'
+
+
+def ip_key():
+    return f'ip:{client_ip()}'
+
+
+def user_or_ip_key():
+    """Authenticated requests are limited per user, anonymous ones per IP."""
+    try:
+        verify_jwt_in_request(optional=True)
+        user_id = get_jwt_identity()
+    except Exception:
+        user_id = None
+    return f'user:{user_id}' if user_id else ip_key()
+
+
+def login_username_key():
+    # Credential-stuffing guard: attempts against one username from any number of IPs
+    data = request.get_json(silent=True) or {}
+    username = data.get('username') if isinstance(data, dict) else None
+    return f'login:{str(username)[:80]}' if username else ip_key()
+
+
+def config_limit(name):
+    """Limit string read from app config at request time, so deployments can tune it by env."""
+    from flask import current_app
+    return lambda: current_app.config[name]
+
+
+def is_not_search():
+    return not request.args.get('search', '').strip()
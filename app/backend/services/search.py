@@ -0,0 +1,256 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+from collections import defaultdict
+from flask import current_app
+from sqlalchemy import case, false, func, literal_column, select
+from sqlalchemy.dialects.mysql import match
+from extensions import db
+from models.post import Post
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    return [t.lower() for t in _TOKEN_RE.findall(text or '')]
+
+
+class SearchBackend:
+    """Filters a Post query by a free-text search string.
+
+    apply() returns (query, rank) where rank is an ORDER BY expression for
+    relevance sorting (higher is better) or None; backends may skip building
+    it unless with_rank is set.
+    """
+    name = 'base'
+
+    def apply(self, query, text, with_rank=False):
+        raise NotImplementedError
+
+    def index_post(self, post):
+        pass
+
+    def update_post(self, post):
+        # An edit of an already indexed post
+        self.index_post(post)
+
+    def remove_post(self, post_id):
+        pass
+
+
+class LikeSearchBackend(SearchBackend):
+    # Original ILIKE scan; kept as an explicit opt-out
+    name = 'like'
+
+    def apply(self, query, text, with_rank=False):
+        return query.filter((Post.title.ilike(f'%{text}%')) | (Post.content.ilike(f'%{text}%'))), None
+
+
+class MySQLFullTextBackend(SearchBackend):
+    # Needs the FULLTEXT(title, content) index from migration m003
+    name = 'mysql'
+
+    def apply(self, query, text, with_rank=False):
+        terms = tokenize(text)
+        if not terms:
+            return query, None
+        against = ' '.join(f'+{term}*' for term in terms)
+        score = match(Post.title, Post.content, against=against).in_boolean_mode()
+        return query.filter(score > 0), score
+
+
+class PostgresFullTextBackend(SearchBackend):
+    # Expression must match the GIN index created by migration m003
+    name = 'postgres'
+
+    @staticmethod
+    def document():
+        return func.to_tsvector(
+            literal_column("'simple'::regconfig"),
+            func.coalesce(Post.title, '') + literal_column("' '") + func.coalesce(Post.content, ''),
+        )
+
+    def apply(self, query, text, with_rank=False):
+        terms = tokenize(text)
+        if not terms:
+            return query, None
+        tsquery = func.to_tsquery(literal_column("'simple'::regconfig"), ' & '.join(f'{term}:*' for term in terms))
+        document = self.document()
+        return query.filter(document.op('@@')(tsquery)), func.ts_rank(document, tsquery)
+
+
+class InMemorySearchBackend(SearchBackend):
+    """In-process inverted index for SQLite dev and tests.
+
+    Postings map term -> {post_id: weight}; a sorted term list serves prefix
+    lookups with bisect. New rows are picked up incrementally by id, so other
+    workers' inserts become visible on the next search. Edits and deletes are
+    published on the cache invalidation channel (search:post:<id>) and every
+    worker re-reads those posts before its next search; if more changes than
+    the channel keeps went by, the index is rebuilt. Results are capped at
+    MAX_RESULTS.
+    """
+    name = 'memory'
+    TITLE_WEIGHT = 2
+    MAX_RESULTS = 1000
+    MAX_PREFIX_TERMS = 32
+    CHANGE_PREFIX = 'search:post:'
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._channel_seq = None
+        self._reset()
+
+    def _reset(self):
+        self._postings = defaultdict(dict)
+        self._terms = []
+        self._doc_terms = {}
+        self._last_id = 0
+
+    def _add(self, post_id, title, content):
+        weights = defaultdict(int)
+        for term in tokenize(title):
+            weights[term] += self.TITLE_WEIGHT
+        for term in tokenize(content):
+            weights[term] += 1
+        self._doc_terms[post_id] = list(weights)
+        for term, weight in weights.items():
+            postings = self._postings[term]
+            if not postings:
+                bisect.insort(self._terms, term)
+            postings[post_id] = weight
+
+    def _apply_changes(self):
+        from extensions import cache
+        changes = cache.channel.poll(self._channel_seq or 0)
+        if changes:
+            head = max(seq for _, seq in changes)
+        if self._channel_seq is None or len(changes) >= cache.channel.MAX_ROWS:
+            # First load, or changes may have been trimmed from the log: (re)build from the table
+            self._channel_seq = head if changes else 0
+            if self._last_id:
+                self._reset()
+            return
+        if not changes:
+            return
+        self._channel_seq = head
+        changed = {int(key[len(self.CHANGE_PREFIX):]) for key, _ in changes if key.startswith(self.CHANGE_PREFIX)}
+        changed = [post_id for post_id in changed if post_id <= self._last_id]
+        if not changed:
+            return
+        rows = db.session.execute(select(Post.id, Post.title, Post.content).where(Post.id.in_(changed))).all()
+        for post_id in changed:
+            self._remove(post_id)
+        for post_id, title, content in rows:
+            self._add(post_id, title, content)
+
+    def _catch_up(self):
+        # Channel first: an edit published while the new rows are read is applied on the next search
+        self._apply_changes()
+        rows = db.session.execute(
+            select(Post.id, Post.title, Post.content).where(Post.id > self._last_id).order_by(Post.id)
+        ).all()
+        for post_id, title, content in rows:
+            if post_id not in self._doc_terms:
+                self._add(post_id, title, content)
+        if rows:
+            self._last_id = max(self._last_id, rows[-1][0])
+
+    def index_post(self, post):
+        with self._lock:
+            self._remove(post.id)
+            self._add(post.id, post.title, post.content)
+
+    def _publish(self, post_id):
+        from extensions import cache
+        cache.invalidate(f'{self.CHANGE_PREFIX}{int(post_id)}')
+
+    def update_post(self, post):
+        self.index_post(post)
+        self._publish(post.id)
+
+    def remove_post(self, post_id):
+        self._remove(post_id)
+        self._publish(post_id)
+
+    def _remove(self, post_id):
+        with self._lock:
+            for term in self._doc_terms.pop(post_id, []):
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                postings.pop(post_id, None)
+                if not postings:
+                    del self._postings[term]
+                    index = bisect.bisect_left(self._terms, term)
+                    if index < len(self._terms) and self._terms[index] == term:
+                        del self._terms[index]
+
+    def _prefix_matches(self, prefix):
+        start = bisect.bisect_left(self._terms, prefix)
+        end = bisect.bisect_left(self._terms, prefix + '\uffff')
+        matches = self._terms[start:end]
+        if len(matches) <= self.MAX_PREFIX_TERMS:
+            return matches
+        # Short prefixes: keep the exact term plus the most frequent expansions
+        return heapq.nlargest(self.MAX_PREFIX_TERMS, matches, key=lambda t: (t == prefix, len(self._postings[t])))
+
+    def search(self, text):
+        """Return post ids ranked by tf-idf, every term matched as a prefix."""
+        terms = tokenize(text)
+        if not terms:
+            return []
+        with self._lock:
+            self._catch_up()
+            total = max(len(self._doc_terms), 1)
+            scores = None
+            for term in terms:
+                term_scores = defaultdict(float)
+                for match_term in self._prefix_matches(term):
+                    postings = self._postings[match_term]
+                    idf = math.log(1 + total / len(postings))
+                    for post_id, weight in postings.items():
+                        term_scores[post_id] += weight * idf
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {pid: score + term_scores[pid] for pid, score in scores.items() if pid in term_scores}
+                if not scores:
+                    return []
+        ranked = heapq.nlargest(self.MAX_RESULTS, scores.items(), key=lambda item: (item[1], item[0]))
+        return [post_id for post_id, _ in ranked]
+
+    def apply(self, query, text, with_rank=False):
+        if not tokenize(text):
+            return query, None
+        ids = self.search(text)
+        if not ids:
+            return query.filter(false()), None
+        rank = None
+        if with_rank:
+            rank = case({post_id: len(ids) - position for position, post_id in enumerate(ids)}, value=Post.id, else_=0)
+        return query.filter(Post.id.in_(ids)), rank
+
+
+BACKENDS = {
+    'like': LikeSearchBackend,
+    'mysql': MySQLFullTextBackend,
+    'postgres': PostgresFullTextBackend,
+    'memory': InMemorySearchBackend,
+}
+
+
+def get_search_backend():
+    backend = current_app.extensions.get('search_backend')
+    if backend is None:
+        name = current_app.config.get('SEARCH_BACKEND', 'auto')
+        if name == 'auto':
+            # SQLite gets the in-memory index, which ranks at most InMemorySearchBackend.MAX_RESULTS
+            # matches: later offset pages of a broader search come back empty
+            dialect = db.engine.dialect.name
+            name = {'mysql': 'mysql', 'mariadb': 'mysql', 'postgresql': 'postgres'}.get(dialect, 'memory')
+        backend = BACKENDS[name]()
+        current_app.extensions['search_backend'] = backend
+    return backend
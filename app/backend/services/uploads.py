@@ -0,0 +1,162 @@
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+CHUNK_SIZE = 64 * 1024
+
+# extension -> predicate over the first bytes of the stream
+MAGIC_SIGNATURES = {
+    'png': lambda head: head.startswith(b'\x89PNG\r\n\x1a\n'),
+    'jpg': lambda head: head.startswith(b'\xff\xd8\xff'),
+    'jpeg': lambda head: head.startswith(b'\xff\xd8\xff'),
+    'mp4': lambda head: head[4:8] == b'ftyp',
+}
+IMAGE_KINDS = {'png', 'jpg', 'jpeg'}
+
+
+class UploadError(Exception):
+    pass
+
+
+class StoredUpload:
+    def __init__(self, path, sha256, size, kind):
+        self.path = path
+        self.sha256 = sha256
+        self.size = size
+        self.kind = kind
+
+    @property
+    def filename(self):
+        return os.path.basename(self.path)
+
+
+def sniff_kind(head, allowed):
+    for kind in allowed:
+        check = MAGIC_SIGNATURES.get(kind)
+        if check and check(head):
+            return 'jpg' if kind == 'jpeg' else kind
+    return None
+
+
+def stream_to_temp(stream, dest_dir, allowed, max_bytes):
+    """Copy an upload into a temp file in dest_dir in chunks, hashing and sniffing as it goes.
+
+    The type check runs on the first chunk, so a bad file is rejected before
+    the rest is read. Nothing is fsynced yet: callers either publish() the
+    file or drop it (e.g. a duplicate). Raises UploadError on a bad type or size.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    kind = None
+    fd, tmp_path = tempfile.mkstemp(dir=dest_dir, prefix='.upload-')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            head = b''
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                if kind is None:
+                    head += chunk
+                    if len(head) < 12:
+                        continue
+                    kind = sniff_kind(head, allowed)
+                    if kind is None:
+                        raise UploadError('Invalid file type.')
+                    chunk, head = head, b''
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadError('File too large.')
+                digest.update(chunk)
+                out.write(chunk)
+            if kind is None:
+                raise UploadError('Invalid file type.')
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return StoredUpload(tmp_path, digest.hexdigest(), size, kind)
+
+
+def publish(stored, final_path):
+    # fsync, then atomically move the temp file under its final name
+    with open(stored.path, 'rb+') as f:
+        os.fsync(f.fileno())
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    os.replace(stored.path, final_path)
+    stored.path = final_path
+    return stored
+
+
+def discard(stored):
+    if os.path.exists(stored.path):
+        os.remove(stored.path)
+
+
+class ProcessingPool:
+    """Bounded thread pool for Pillow decoding and other post-upload work.
+
+    At most `max_workers * queue_factor` jobs may be queued; past that the
+    submitting request runs the job itself, which pushes back on uploaders
+    instead of growing an unbounded backlog. Read paths pass inline=False:
+    their job is dropped instead and submit() returns None.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._executor = None
+        self._slots = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.max_workers = 2
+        self.queue_factor = 4
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.max_workers = app.config.get('UPLOAD_WORKERS', 2)
+        self.queue_factor = app.config.get('UPLOAD_QUEUE_FACTOR', 4)
+        app.extensions['upload_pool'] = self
+
+    def _ensure_executor(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='upload')
+                self._slots = threading.BoundedSemaphore(self.max_workers * self.queue_factor)
+
+    def _run(self, fn, args):
+        try:
+            with self.app.app_context():
+                return fn(*args)
+        except Exception:
+            self.app.logger.exception('Upload processing job failed')
+
+    def submit(self, fn, *args, inline=True):
+        if not self.app.config.get('UPLOAD_ASYNC_PROCESSING', True):
+            return self._run(fn, args)
+        self._ensure_executor()
+        if not self._slots.acquire(blocking=False):
+            return self._run(fn, args) if inline else None
+
+        def job():
+            try:
+                return self._run(fn, args)
+            finally:
+                self._slots.release()
+        return self._executor.submit(job)
+
+
+def verify_image(path):
+    # Pillow is only needed by the processing pool, not at import time
+    from PIL import Image
+    try:
+        with Image.open(path) as img:
+            img.verify()
+            return (img.format or '').lower() in ('png', 'jpeg')
+    except Exception:
+        return False
@@ -0,0 +1,64 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import tuple_
+
+
+MAX_PER_PAGE = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def per_page_arg(args, default, maximum=MAX_PER_PAGE):
+    """`per_page` from the query string clamped to 1..maximum; missing or non-numeric gives the default."""
+    return max(1, min(args.get('per_page', default, type=int), maximum))
+
+
+def encode_cursor(sort_value, row_id):
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, is_datetime=False):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if is_datetime:
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, int(row_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidCursor('Invalid cursor.')
+
+
+def keyset_filter(sort_col, id_col, sort_value, row_id, descending=True):
+    # Row-value comparison lets SQLite/MySQL/Postgres turn it into a range scan on the composite index
+    if descending:
+        return tuple_(sort_col, id_col) < tuple_(sort_value, row_id)
+    return tuple_(sort_col, id_col) > tuple_(sort_value, row_id)
+
+
+def keyset_page(query, sort_col, id_col, after=None, per_page=10, descending=True):
+    """Fetch one page ordered by (sort_col, id) without OFFSET or COUNT.
+
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    """
+    per_page = max(1, per_page)
+    is_datetime = getattr(sort_col.type, 'python_type', None) is datetime
+    if after:
+        sort_value, row_id = decode_cursor(after, is_datetime=is_datetime)
+        query = query.filter(keyset_filter(sort_col, id_col, sort_value, row_id, descending))
+    if descending:
+        query = query.order_by(sort_col.desc(), id_col.desc())
+    else:
+        query = query.order_by(sort_col.asc(), id_col.asc())
+    rows = query.limit(per_page + 1).all()
+    items = rows[:per_page]
+    next_cursor = None
+    if len(rows) > per_page:
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, sort_col.key), getattr(last, id_col.key))
+    return items, next_cursor
@@ -0,0 +1,75 @@
+import json
+from datetime import date
+from flask import current_app
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder produces the same JSON, just slower
+    orjson = None
+
+
+def split_csv(value):
+    return value.split(',') if value else []
+
+
+class Schema:
+    """Output key -> model column mapping shared by the endpoints that return a model.
+
+    Fields are given as key=Column or key=(Column, transform). List endpoints
+    select only these columns with load() and serialize the rows with
+    dump_many(); single objects (ORM instances or rows) go through dump().
+    Datetimes are left to the JSON encoder, which writes ISO 8601.
+    """
+
+    def __init__(self, **fields):
+        self.columns = []
+        self.keys = []
+        self.attrs = []
+        self.transforms = []
+        for key, spec in fields.items():
+            column, transform = spec if isinstance(spec, tuple) else (spec, None)
+            self.columns.append(column)
+            self.keys.append(key)
+            self.attrs.append(column.key)
+            if transform is not None:
+                self.transforms.append((key, transform))
+
+    def load(self, query):
+        # Column-only select: rows come back as tuples, no identity map or attribute instrumentation
+        return query.with_entities(*self.columns)
+
+    def dump(self, obj):
+        data = {key: getattr(obj, attr) for key, attr in zip(self.keys, self.attrs)}
+        for key, transform in self.transforms:
+            data[key] = transform(data[key])
+        return data
+
+    def dump_many(self, rows):
+        """Serialize rows from load(); relies on their column order."""
+        keys = self.keys
+        items = [dict(zip(keys, row)) for row in rows]
+        for key, transform in self.transforms:
+            for item in items:
+                item[key] = transform(item[key])
+        return items
+
+
+def _default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(payload):
+    if orjson is not None and current_app.config.get('FAST_JSON', True):
+        return orjson.dumps(payload)
+    return json.dumps(payload, default=_default, separators=(',', ':'))
+
+
+def loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def json_response(payload, status=200):
+    """jsonify() replacement for schema output: orjson when installed, ISO 8601 datetimes either way."""
+    return current_app.response_class(dumps(payload), status=status, mimetype='application/json')
@@ -0,0 +1,49 @@
+"""Export posts to NDJSON or import them from it, directly against DATABASE_URL.
+
+    python posts_ndjson.py export [--user ID] [--after ID] [-o posts.ndjson]
+    python posts_ndjson.py import posts.ndjson [--user ID] [--batch 500]
+
+Same format and code path as GET/POST /api/posts/export and /api/posts/import.
+Without --user, import keeps each record's user_id (restoring a full export);
+with it, every post is owned by that user. '-' reads stdin / writes stdout.
+"""
+import argparse
+import json
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app', 'backend'))
+from app import create_app
+from api.transfer import import_ndjson, export_ndjson
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk post export/import (NDJSON).')
+    commands = parser.add_subparsers(dest='command', required=True)
+    export = commands.add_parser('export')
+    export.add_argument('--user', type=int, help='only this user\'s posts')
+    export.add_argument('--after', type=int, help='resume after this post id')
+    export.add_argument('-o', '--output', default='-')
+    imports = commands.add_parser('import')
+    imports.add_argument('input')
+    imports.add_argument('--user', type=int, help='owner of every imported post')
+    imports.add_argument('--batch', type=int, help='posts per transaction (default POST_IMPORT_BATCH_SIZE)')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.command == 'export':
+            out = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+            with out:
+                for chunk in export_ndjson(args.user, args.after, app.config['POST_EXPORT_CHUNK_SIZE']):
+                    out.write(chunk)
+        else:
+            source = sys.stdin.buffer if args.input == '-' else open(args.input, 'rb')
+            with source:
+                summary = import_ndjson(source, args.user, args.batch or app.config['POST_IMPORT_BATCH_SIZE'])
+            print(json.dumps(summary, indent=2), file=sys.stderr)
+            if summary['failed']:
+                sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,14 @@
+import os
 import sys
-sys.path.insert(0, './app/backend')
-from app.backend.app import create_app
-from app.backend.extensions import db
-from app.backend.models.user import User
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app', 'backend'))
+from app import create_app
+from extensions import db
+from migrations import run_migrations
 
-app = create_app()
+# Rebuild from scratch; the startup schema check is skipped since the tables are dropped right after
+app = create_app(SCHEMA_AUTO_CREATE=False)
 with app.app_context():
     db.drop_all()
     db.create_all()
-print('Database reset complete.') 
\ No newline at end of file
+run_migrations(app)
+print('Database reset complete.')